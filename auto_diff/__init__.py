@@ -1,9 +1,18 @@
+import importlib
 from .sess import *
 from .op import *
 from .simple import *
-import auto_diff.inits as inits
 import auto_diff.acts as acts
-import auto_diff.losses as losses
-import auto_diff.layers as layers
-import auto_diff.optims as optims
-import auto_diff.models as models
+
+#: The submodules that are imported when they are accessed for the first time.
+_LAZY_MODULES = ('inits', 'losses', 'layers', 'optims', 'models')
+
+
+def __getattr__(name: str):
+    if name in _LAZY_MODULES:
+        return importlib.import_module('.' + name, __name__)
+    raise AttributeError('module %r has no attribute %r' % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_MODULES))
@@ -40,5 +40,5 @@ def softmax(x: ad.Operation) -> ad.Operation:
 
 
 def sigmoid(x: ad.Operation) -> ad.Operation:
-    """Sigmoid"""
-    return 1.0 / (1.0 + ad.exp(-x))
+    """Sigmoid, see :class:`OpSigmoid`."""
+    return ad.sigmoid(x)
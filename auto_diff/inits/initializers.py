@@ -1,6 +1,6 @@
+import math
+from functools import partial
 import numpy as np
-import scipy.stats
-import auto_diff as ad
 
 
 __all__ = [
@@ -20,35 +20,54 @@ def ones(shape) -> np.ndarray:
     return np.ones(shape)
 
 
+# The parameterized initializers are partial functions instead of closures, so that they could be pickled.
+
+def _constants(shape, value) -> np.ndarray:
+    return np.ones(shape) * value
+
+
 def constants(value=0):
-    def _constants(shape) -> np.ndarray:
-        return np.ones(shape) * value
-    return _constants
+    return partial(_constants, value=value)
+
+
+def _random_normal(shape, mean, stddev) -> np.ndarray:
+    return np.random.normal(loc=mean, scale=stddev, size=shape)
 
 
 def random_normal(mean=0.0, stddev=0.05):
-    def _random_normal(shape):
-        return np.random.normal(loc=mean, scale=stddev, size=shape)
-    return _random_normal
+    return partial(_random_normal, mean=mean, stddev=stddev)
+
+
+def _random_uniform(shape, low, high) -> np.ndarray:
+    return np.random.uniform(low=low, high=high, size=shape)
 
 
 def random_uniform(low=-0.05, high=0.05):
-    def _random_uniform(shape):
-        return np.random.uniform(low=low, high=high, size=shape)
-    return _random_uniform
+    return partial(_random_uniform, low=low, high=high)
 
 
-def truncated_normal(loc, scale, lower, upper):
-    def _truncated_normal(shape) -> np.ndarray:
-        weights = scipy.stats.truncnorm.rvs(
-            (lower - loc) / scale,
-            (upper - loc) / scale,
-            loc=loc,
-            scale=scale,
-            size=np.prod(shape),
-        )
+def _truncated_normal(shape, loc, scale, lower, upper) -> np.ndarray:
+    """Sample from the normal distribution and redraw the samples that are out of the bounds.
+
+    If only a small part of the distribution is within the bounds, the samples are drawn with `scipy` instead.
+    """
+    a, b = (lower - loc) / scale, (upper - loc) / scale
+    acceptance = 0.5 * (math.erf(b / math.sqrt(2.0)) - math.erf(a / math.sqrt(2.0)))
+    size = int(np.prod(shape))
+    if acceptance < 0.1:
+        import scipy.stats
+        weights = scipy.stats.truncnorm.rvs(a, b, loc=loc, scale=scale, size=size)
         return np.reshape(weights, newshape=shape)
-    return _truncated_normal
+    weights = np.random.normal(size=size)
+    invalid = np.flatnonzero((weights < a) | (weights > b))
+    while invalid.size > 0:
+        weights[invalid] = np.random.normal(size=invalid.size)
+        invalid = invalid[(weights[invalid] < a) | (weights[invalid] > b)]
+    return np.reshape(weights * scale + loc, newshape=shape)
+
+
+def truncated_normal(loc, scale, lower, upper):
+    return partial(_truncated_normal, loc=loc, scale=scale, lower=lower, upper=upper)
 
 
 def glorot_normal(shape) -> np.ndarray:
@@ -2,6 +2,7 @@ from .layer import Layer
 from .input import Input
 from .dense import Dense
 from .conv import Conv2D
+from .pool import MaxPool2D, AveragePooling2D, GlobalMaxPool2D, GlobalAveragePooling2D
 from .recurrent import LSTM, GRU
 from .dropout import Dropout
 from .batch_norm import BatchNorm
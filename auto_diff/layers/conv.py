@@ -80,31 +80,16 @@ class Conv2D(Layer):
         return batch_size, new_height, new_width, self.filters
 
     def call(self, inputs, **kwargs):
-        padded = ad.pad(inputs, ((0,), (self.pad_width[0],), (self.pad_width[1],), (0,)))
-        batch_size = ad.shape(inputs)[0]
-        reshaped = ad.map_fn(lambda i: self.call_batch(padded, i), ad.arange(batch_size))
-        y = ad.dot(reshaped, self.w)
+        y = ad.conv2d(
+            inputs,
+            self.w,
+            kernel_size=self.kernel_size,
+            strides=self.strides,
+            dilation_rate=self.dilation_rate,
+            pad_width=self.pad_width,
+        )
         if self.use_bias:
             y += self.b
         if self.activation is not None:
             y = self.activation(y)
         return y
-
-    def call_batch(self, padded: ad.Operation, i: int):
-        height = ad.shape(padded)[1]
-        new_height = (height - self.dilated_kernel_size[0]) // self.strides[0] + 1
-        return ad.map_fn(lambda r: self.call_row(padded, i, r), ad.arange(new_height))
-
-    def call_row(self, padded: ad.Operation, i: int, r: int):
-        width = ad.shape(padded)[2]
-        new_width = (width - self.dilated_kernel_size[1]) // self.strides[1] + 1
-        return ad.map_fn(lambda c: self.call_column(padded, i, r, c), ad.arange(new_width))
-
-    def call_column(self, padded: ad.Operation, i: int, r: int, c: int):
-        block = padded[
-            i,
-            r * self.strides[0]:r * self.strides[0] + self.dilated_kernel_size[0]:self.dilation_rate[0],
-            c * self.strides[1]:c * self.strides[1] + self.dilated_kernel_size[1]:self.dilation_rate[1],
-            :,
-        ]
-        return block.flatten()
@@ -4,7 +4,11 @@ import auto_diff as ad
 
 class Layer(object):
 
-    def __init__(self, **kwargs):
+    def __init__(self, checkpoint: bool = False, **kwargs):
+        """
+        :param checkpoint: Whether to keep the output for the backward pass when gradient checkpointing is enabled.
+        """
+        self.checkpoint = checkpoint
         self._built = False
         self._trainable_weights = []
         self._non_trainable_weights = []
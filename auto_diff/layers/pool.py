@@ -0,0 +1,75 @@
+from typing import Union, Sequence, Optional
+import auto_diff as ad
+from .layer import Layer
+
+
+class _Pool2D(Layer):
+
+    def __init__(self,
+                 pool_size: Union[int, Sequence] = 2,
+                 strides: Optional[Union[int, Sequence]] = None,
+                 padding='valid',
+                 **kwargs):
+        super(_Pool2D, self).__init__(**kwargs)
+        if isinstance(pool_size, int):
+            self.pool_size = (pool_size, pool_size)
+        else:
+            self.pool_size = tuple(pool_size)
+        if strides is None:
+            self.strides = self.pool_size
+        elif isinstance(strides, int):
+            self.strides = (strides, strides)
+        else:
+            self.strides = tuple(strides)
+        self.padding = padding
+        if padding == 'valid':
+            self.pad_width = (0, 0)
+        elif padding == 'same':
+            self.pad_width = (
+                self.pool_size[0] // 2,
+                self.pool_size[1] // 2,
+            )
+        else:
+            raise NotImplementedError('Unknown padding: %s' % str(padding))
+
+    def compute_output_shape(self, input_shape):
+        batch_size, height, width, channels = input_shape
+        if height is None:
+            new_height = None
+        else:
+            new_height = (height + 2 * self.pad_width[0] - self.pool_size[0]) // self.strides[0] + 1
+        if width is None:
+            new_width = None
+        else:
+            new_width = (width + 2 * self.pad_width[1] - self.pool_size[1]) // self.strides[1] + 1
+        return batch_size, new_height, new_width, channels
+
+
+class MaxPool2D(_Pool2D):
+
+    def call(self, inputs, **kwargs):
+        return ad.max_pool2d(inputs, self.pool_size, self.strides, self.pad_width)
+
+
+class AveragePooling2D(_Pool2D):
+
+    def call(self, inputs, **kwargs):
+        return ad.avg_pool2d(inputs, self.pool_size, self.strides, self.pad_width)
+
+
+class GlobalMaxPool2D(Layer):
+
+    def compute_output_shape(self, input_shape):
+        return input_shape[0], input_shape[3]
+
+    def call(self, inputs, **kwargs):
+        return ad.max(inputs, axis=(1, 2))
+
+
+class GlobalAveragePooling2D(Layer):
+
+    def compute_output_shape(self, input_shape):
+        return input_shape[0], input_shape[3]
+
+    def call(self, inputs, **kwargs):
+        return ad.mean(inputs, axis=(1, 2))
@@ -1,7 +1,13 @@
+from functools import partial
 import auto_diff as ad
 from .layer import Layer
 
 
+def _less_than_length(length: ad.Operation, body_inputs):
+    """The condition of the loops over time steps, the first loop variable is the index."""
+    return ad.less(body_inputs[0], length)
+
+
 class LSTM(Layer):
 
     def __init__(self,
@@ -49,9 +55,10 @@ class LSTM(Layer):
 
     def call(self, inputs, **kwargs):
         initial_val = ad.dot(ad.zeros_like(inputs)[:, 0, :], ad.zeros_like(self.wx[:, :self.units]))
+        length = ad.shape(inputs)[1]
         outputs = ad.while_loop(
-            lambda body_inputs: ad.less(body_inputs[0], ad.shape(inputs)[1]),
-            lambda x: self.step(inputs, x),
+            partial(_less_than_length, length),
+            partial(self.step, inputs),
             [ad.variable(0.0), initial_val, initial_val],
             output_index=-1,
         )
@@ -120,9 +127,11 @@ class GRU(Layer):
 
     def call(self, inputs, **kwargs):
         initial_val = ad.dot(ad.zeros_like(inputs)[:, 0, :], ad.zeros_like(self.wx[:, :self.units]))
+        length = ad.shape(inputs)[1]
+        weights = self.split_weights()
         outputs = ad.while_loop(
-            lambda body_inputs: ad.less(body_inputs[0], ad.shape(inputs)[1]),
-            lambda x: self.step(inputs, x),
+            partial(_less_than_length, length),
+            partial(self.step, inputs, weights=weights),
             [ad.variable(0.0), initial_val],
             output_index=-1,
         )
@@ -130,16 +139,28 @@ class GRU(Layer):
             return outputs.transpose(axes=[1, 0, 2])
         return outputs[-1]
 
-    def step(self, inputs, body_inputs):
+    def split_weights(self):
+        """Split the weights into the parts of the gates and the inner output, so that they are sliced once."""
+        weights = [
+            self.wx[:, :self.units * 2], self.wx[:, self.units * 2:],
+            self.wh[:, :self.units * 2], self.wh[:, self.units * 2:],
+        ]
+        if self.use_bias:
+            weights += [self.b[:self.units * 2], self.b[self.units * 2:]]
+        return weights
+
+    def step(self, inputs, body_inputs, weights=None):
+        if weights is None:
+            weights = self.split_weights()
         index, output = body_inputs
-        linear_sum = ad.dot(inputs[:, index], self.wx[:, :self.units * 2]) + ad.dot(output, self.wh[:, :self.units * 2])
+        step_inputs = inputs[:, index]
+        linear_sum = ad.dot(step_inputs, weights[0]) + ad.dot(output, weights[2])
         if self.use_bias:
-            linear_sum += self.b[:self.units * 2]
+            linear_sum += weights[4]
         update_gate = ad.acts.sigmoid(linear_sum[:, :self.units])
         reset_gate = ad.acts.sigmoid(linear_sum[:, self.units:self.units * 2])
-        output_inner = ad.dot(inputs[:, index], self.wx[:, self.units * 2:]) +\
-            ad.dot(reset_gate * output, self.wh[:, self.units * 2:])
+        output_inner = ad.dot(step_inputs, weights[1]) + ad.dot(reset_gate * output, weights[3])
         if self.use_bias:
-            output_inner += self.b[self.units * 2:]
+            output_inner += weights[5]
         new_output = (1.0 - update_gate) * output + update_gate * ad.tanh(output_inner)
         return index + 1.0, new_output
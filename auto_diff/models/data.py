@@ -0,0 +1,133 @@
+import queue
+import threading
+from typing import Union, List, Optional, Iterable, Iterator, Any
+import numpy as np
+from auto_diff.sess.trace import trace_span
+
+
+__all__ = ['is_arrays', 'num_samples', 'slice_arrays', 'iterate_batches', 'Prefetcher']
+
+
+def is_arrays(values: Any) -> bool:
+    """Whether the values are an array or a list of arrays instead of a generator of batches."""
+    if isinstance(values, np.ndarray):
+        return True
+    return isinstance(values, list) and all(isinstance(value, np.ndarray) for value in values)
+
+
+def num_samples(values: Union[np.ndarray, List[np.ndarray]]) -> int:
+    """The size of the first axis."""
+    if isinstance(values, list):
+        return len(values[0])
+    return len(values)
+
+
+def slice_arrays(values: Union[None, np.ndarray, List[np.ndarray]], index) -> Union[None, np.ndarray, List[np.ndarray]]:
+    if values is None:
+        return None
+    if isinstance(values, list):
+        return [value[index] for value in values]
+    return values[index]
+
+
+def iterate_batches(x: Union[np.ndarray, List[np.ndarray]],
+                    y: Union[None, np.ndarray, List[np.ndarray]],
+                    batch_size: int,
+                    indices: Optional[np.ndarray] = None) -> Iterator[tuple]:
+    """Split the arrays into batches.
+
+    :param x: The inputs.
+    :param y: The outputs, only the inputs are yielded if it is None.
+    :param batch_size: The maximum number of samples in a batch.
+    :param indices: The order of the samples, e.g. a permutation for shuffling.
+    :return: The batches of the inputs and the outputs.
+    """
+    total = num_samples(x)
+    for begin in range(0, total, batch_size):
+        if indices is None:
+            index = slice(begin, begin + batch_size)
+        else:
+            index = indices[begin:begin + batch_size]
+        if y is None:
+            yield slice_arrays(x, index)
+        else:
+            yield slice_arrays(x, index), slice_arrays(y, index)
+
+
+class Prefetcher(object):
+    """Iterates the batches in a background thread.
+
+    At most `buffer_size` batches are prepared ahead of the consumer, so that slicing the arrays or running a generator
+    overlaps with the computation of the current step. The exceptions raised by the source are raised by `next`.
+    """
+
+    #: Marks the end of the source.
+    _END = object()
+
+    def __init__(self, source: Iterable, buffer_size: int = 1):
+        """
+        :param source: The batches.
+        :param buffer_size: The maximum number of prepared batches, the batches are prepared in the current thread if
+                            it is zero.
+        """
+        self.source = iter(source)
+        self.buffer_size = buffer_size
+        self._queue = None
+        self._thread = None
+        self._stopped = threading.Event()
+        if buffer_size > 0:
+            self._queue = queue.Queue(maxsize=buffer_size)
+            self._thread = threading.Thread(target=self._produce, name='auto_diff_prefetch', daemon=True)
+            self._thread.start()
+
+    def _put(self, item) -> bool:
+        while not self._stopped.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def _produce(self):
+        try:
+            while True:
+                with trace_span('prefetch', 'data'):
+                    batch = next(self.source, self._END)
+                if batch is self._END:
+                    break
+                if not self._put((True, batch)):
+                    return
+        except BaseException as e:
+            self._put((False, e))
+            return
+        self._put((True, self._END))
+
+    def __iter__(self) -> 'Prefetcher':
+        return self
+
+    def __next__(self):
+        if self._queue is None:
+            return next(self.source)
+        if self._stopped.is_set():
+            raise StopIteration
+        success, item = self._queue.get()
+        if not success:
+            self._stopped.set()
+            raise item
+        if item is self._END:
+            self._stopped.set()
+            raise StopIteration
+        return item
+
+    def close(self):
+        """Stop the background thread, the remaining batches are dropped."""
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'Prefetcher':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
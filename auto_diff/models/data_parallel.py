@@ -0,0 +1,223 @@
+import multiprocessing
+from typing import Union, List
+import numpy as np
+
+
+class DataParallel(object):
+    """Trains the replicas of a model in multiple processes.
+
+    The batch is split into one shard for each process, the current process trains the first shard and the forked
+    workers train the others. The weights and the gradients are exchanged through shared memory: the weights are
+    written by the current process before each step, the gradients of the shards are written by their processes and
+    then summed in parallel, each process reduces one segment of the flat gradients. As the losses are summed over the
+    samples, the reduced gradients are the same as the gradients of the whole batch as long as the samples are
+    independent. The layers that use the statistics of the batch (e.g. :class:`BatchNorm`) normalize each shard with
+    its own statistics, so their outputs and gradients differ from the ones of the whole batch, just like training
+    with smaller batches.
+
+    The optimizer only runs in the current process, so the weights of the replicas are always the same. The values of
+    the updates (e.g. the moving averages of :class:`BatchNorm`) are averaged over the shards by their sizes.
+
+    The weights are initialized by the first step, which runs serially in the current process, so the same seed gives
+    the same weights as serial training, including the weights created lazily in the bodies of recurrent layers.
+
+    The workers are forked when the model is built, before the threads of the session or the prefetcher are started,
+    since forking a process with running threads could leave locks held by the threads locked in the children. After
+    :meth:`close`, the workers are forked again in the next step, which should not run while other threads are busy.
+    """
+
+    def __init__(self, model, num_workers: int):
+        """
+        :param model: The model to be trained, :meth:`start` should be called once it is built.
+        :param num_workers: The number of processes, including the current one.
+        """
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise NotImplementedError('Data parallel training requires the `fork` start method')
+        self.model = model
+        self.num_workers = num_workers
+        self._weights = None
+        self._offsets = None
+        self._shared_weights = None
+        self._shared_gradients = None
+        self._reduced = None
+        self._processes = []
+        self._connections = []
+        self._seeded = False
+
+    def __getstate__(self) -> dict:
+        """The workers and the shared memory are not kept, they are created again in the first step."""
+        state = self.__dict__.copy()
+        state.update(_shared_weights=None, _shared_gradients=None, _reduced=None, _processes=[], _connections=[],
+                     _seeded=False)
+        return state
+
+    @property
+    def started(self) -> bool:
+        return self._shared_weights is not None
+
+    def start(self):
+        """Allocate the shared memory and fork the workers.
+
+        The weights are not initialized here, the sizes of the shared memory are derived from their shapes.
+        """
+        if self.started:
+            return
+        self._weights = self.model.trainable_weights + self.model.non_trainable_weights
+        self._offsets = [0]
+        for weight in self._weights:
+            self._offsets.append(self._offsets[-1] + int(np.prod(weight.shape, dtype=np.int64)))
+        num_trainable = len(self.model.trainable_weights)
+        total, grad_total = self._offsets[-1], self._offsets[num_trainable]
+        context = multiprocessing.get_context('fork')
+        self._shared_weights = np.frombuffer(context.RawArray('d', max(1, total)), dtype=np.float64)
+        self._shared_gradients = np.frombuffer(
+            context.RawArray('d', max(1, self.num_workers * grad_total)), dtype=np.float64,
+        )[:self.num_workers * grad_total].reshape((self.num_workers, grad_total))
+        self._reduced = np.frombuffer(context.RawArray('d', max(1, grad_total)), dtype=np.float64)[:grad_total]
+        for rank in range(1, self.num_workers):
+            parent, child = context.Pipe()
+            process = context.Process(target=self._work, args=(rank, child), daemon=True)
+            process.start()
+            child.close()
+            self._processes.append(process)
+            self._connections.append(parent)
+
+    def close(self):
+        """Stop the workers."""
+        for connection in self._connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self._processes:
+            process.join()
+        self._processes, self._connections = [], []
+        self._seeded = False
+        self._shared_weights = self._shared_gradients = self._reduced = None
+
+    def _work(self, rank: int, connection):
+        """The loop of a worker process."""
+        self.model._session._executor = None
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            try:
+                if message[0] == 'step':
+                    result = self._step(rank, *message[1:])
+                elif message[0] == 'seed':
+                    result = np.random.seed(message[1])
+                else:
+                    result = self._reduce(rank, *message[1:])
+            except Exception as e:
+                connection.send(('error', e))
+            else:
+                connection.send(('ok', result))
+        connection.close()
+
+    def _step(self,
+              rank: int,
+              x: Union[np.ndarray, List[np.ndarray]],
+              y: Union[np.ndarray, List[np.ndarray]],
+              loss_scale: float) -> List[np.ndarray]:
+        """Load the shared weights, run the forward and backward passes of a shard and write its gradients."""
+        if rank > 0:
+            for weight, begin, end in zip(self._weights, self._offsets[:-1], self._offsets[1:]):
+                if weight.isscalar():
+                    weight.x = float(self._shared_weights[begin])
+                else:
+                    weight.x = self._shared_weights[begin:end].reshape(weight.shape).astype(weight.dtype)
+        outputs = self.model._forward_backward(x, y, loss_scale)
+        gradients = self._shared_gradients[rank]
+        for weight, begin, end in zip(self.model.trainable_weights, self._offsets[:-1], self._offsets[1:]):
+            if weight.gradient is None:
+                gradients[begin:end] = 0.0
+            else:
+                gradients[begin:end] = np.ravel(weight.gradient)
+        return outputs
+
+    def _reduce(self, rank: int, num_shards: int) -> None:
+        """Sum a segment of the gradients of the shards."""
+        begin, end = self._segment(rank)
+        np.sum(self._shared_gradients[:num_shards, begin:end], axis=0, out=self._reduced[begin:end])
+
+    def _segment(self, rank: int):
+        total = self._shared_gradients.shape[1]
+        return total * rank // self.num_workers, total * (rank + 1) // self.num_workers
+
+    @staticmethod
+    def _gather(connections, raise_error: bool = True) -> list:
+        """Receive the results of the workers, the first error is raised after all the workers replied."""
+        results, error = [], None
+        for connection in connections:
+            status, result = connection.recv()
+            if status == 'error' and error is None:
+                error = result
+            results.append(result)
+        if error is not None and raise_error:
+            raise error
+        return results
+
+    @staticmethod
+    def _split(values: Union[np.ndarray, List[np.ndarray]], num_shards: int) -> list:
+        if isinstance(values, list):
+            return list(zip(*[np.array_split(value, num_shards) for value in values]))
+        return np.array_split(values, num_shards)
+
+    def forward_backward(self,
+                         x: Union[np.ndarray, List[np.ndarray]],
+                         y: Union[np.ndarray, List[np.ndarray]],
+                         loss_scale: float = 1.0) -> List[np.ndarray]:
+        """Run a training step on the shards and set the reduced gradients to the weights of the current process.
+
+        If some weights are not initialized yet, the step runs on the whole batch in the current process, so that the
+        weights are initialized in the same order and with the same random numbers as serial training.
+
+        :return: The losses of the batch and the averaged values of the updates.
+        """
+        self.start()
+        if any(weight.x is None for weight in self._weights):
+            outputs = self.model._forward_backward(x, y, loss_scale)
+            for weight in self._weights:
+                if weight.x is None:
+                    weight._forward({})
+            return outputs
+        if not self._seeded:
+            # The seeds are drawn after the initialization so that the weights are the same as serial training
+            seeds = np.random.randint(0, 2 ** 31 - 1, self.num_workers)
+            for rank, connection in enumerate(self._connections, start=1):
+                connection.send(('seed', int(seeds[rank])))
+            self._gather(self._connections)
+            self._seeded = True
+        for weight, begin, end in zip(self._weights, self._offsets[:-1], self._offsets[1:]):
+            self._shared_weights[begin:end] = np.ravel(weight.x)
+        batch_size = len(y[0] if isinstance(y, list) else y)
+        num_shards = max(1, min(self.num_workers, batch_size))
+        xs, ys = self._split(x, num_shards), self._split(y, num_shards)
+        if isinstance(x, list):
+            xs = [list(shard) for shard in xs]
+        if isinstance(y, list):
+            ys = [list(shard) for shard in ys]
+        workers = self._connections[:num_shards - 1]
+        for rank, connection in enumerate(workers, start=1):
+            connection.send(('step', xs[rank], ys[rank], loss_scale))
+        try:
+            outputs = [self._step(0, xs[0], ys[0], loss_scale)]
+        except Exception:
+            self._gather(workers, raise_error=False)
+            raise
+        outputs += self._gather(workers)
+        for connection in self._connections:
+            connection.send(('reduce', num_shards))
+        self._reduce(0, num_shards)
+        self._gather(self._connections)
+        for weight, begin, end in zip(self.model.trainable_weights, self._offsets[:-1], self._offsets[1:]):
+            gradient = self._reduced[begin:end].reshape(np.shape(weight.x))
+            dtype = weight.dtype if weight.gradient is None else np.asarray(weight.gradient).dtype
+            weight.gradient = gradient.astype(dtype)
+        sizes = [len(y_shard[0] if isinstance(y_shard, list) else y_shard) for y_shard in ys]
+        merged = [np.concatenate([np.atleast_1d(output[0]) for output in outputs])]
+        for i in range(1, len(outputs[0])):
+            merged.append(np.average(np.stack([output[i] for output in outputs]), axis=0, weights=sizes))
+        return merged
@@ -1,6 +1,10 @@
-from typing import Union, List
+import time
+import itertools
+from typing import Union, List, Optional, Iterable
 import numpy as np
 import auto_diff as ad
+from .data import is_arrays, num_samples, iterate_batches, Prefetcher
+from .data_parallel import DataParallel
 
 
 class Model(ad.layers.Layer):
@@ -19,14 +23,53 @@ class Model(ad.layers.Layer):
         self._updates = []
         self._output_placeholders = None
         self._session = ad.sess.Session()
+        self._parallel = None
+        #: The float type of the operations created in `build`, it is the float type when the model is created.
+        self.dtype = ad.floatx()
+        #: The float type of the weights, see :func:`ad.set_floatx`.
+        self.variable_dtype = ad.variable_floatx()
 
     def compute_output_shape(self, input_shape):
         if isinstance(self._outputs, list):
             return [output.output_shapes for output in self._outputs]
         return self._outputs.output_shapes
 
-    def build(self, optimizer: ad.optims.Optimizer, losses):
+    def build(self,
+              optimizer: ad.optims.Optimizer,
+              losses,
+              plan_memory: bool = False,
+              checkpoint: Union[None, bool, str, int] = None,
+              loss_scale: Union[None, str, float] = None,
+              num_threads: int = 0,
+              num_workers: int = 0):
+        """
+        :param optimizer: The optimizer for updating trainable weights.
+        :param losses: The loss function.
+        :param plan_memory: Whether to release intermediate results once they are no longer needed.
+        :param checkpoint: Gradient checkpointing. If it is `'layers'`, the outputs of all the layers are kept for the
+                           backward pass; if it is True, only the layers created with `checkpoint=True` are kept;
+                           if it is an integer k, one output in every k operations is kept besides the checkpoint
+                           layers. The dropped outputs are recomputed in the backward pass.
+        :param loss_scale: Loss scaling for mixed precision training. If it is `'dynamic'`, the scale is adjusted when
+                           the gradients overflow; if it is a number, the scale is fixed.
+        :param num_threads: The number of worker threads for evaluating the independent operations (e.g. the branches
+                            of multiple inputs) in parallel, see :class:`ad.Session`.
+        :param num_workers: The number of processes for data parallel training, the batches of `fit_on_batch` are
+                            split into shards and trained by the replicas of the model, see :class:`DataParallel`.
+                            The processes are forked here, so the model should be built before starting threads.
+        """
         if not self._built:
+            self._session.plan_memory = plan_memory or bool(checkpoint)
+            self._session.num_threads = num_threads
+            if num_workers > 1:
+                self._parallel = DataParallel(self, num_workers)
+            if loss_scale == 'dynamic':
+                optimizer = ad.optims.LossScaleOptimizer(optimizer)
+            elif loss_scale is not None:
+                optimizer = ad.optims.LossScaleOptimizer(optimizer, initial_scale=loss_scale, dynamic=False)
+            if isinstance(optimizer, ad.optims.LossScaleOptimizer) and optimizer.max_scale is None:
+                # The initial gradient of the loss has the compute type, larger scales would overflow in every step
+                optimizer.max_scale = ad.optims.LossScaleOptimizer.max_scale_of(self.dtype)
             self._optimizer = optimizer
             self._losses = losses
             self._layers = {}
@@ -54,67 +97,247 @@ class Model(ad.layers.Layer):
                 self._non_trainable_weights += layer.non_trainable_weights
                 self._updates += layer.updates
 
-            self._loss = 0.0
-            if isinstance(self.outputs, list):
-                self._output_placeholders = []
-                for i, output in enumerate(self.outputs):
-                    output_shapes = output.output_shapes
+            if checkpoint:
+                checkpoints = []
+                for layer in self._layers.values():
+                    if checkpoint == 'layers' or layer.checkpoint:
+                        if isinstance(layer.outputs, list):
+                            checkpoints += layer.outputs
+                        else:
+                            checkpoints.append(layer.outputs)
+                self._session.checkpoints = checkpoints
+                if not isinstance(checkpoint, bool) and isinstance(checkpoint, int):
+                    self._session.checkpoint_every = checkpoint
+
+            with ad.dtype_scope(self.dtype, self.variable_dtype):
+                self._loss = 0.0
+                if isinstance(self.outputs, list):
+                    self._output_placeholders = []
+                    for i, output in enumerate(self.outputs):
+                        output_shapes = output.output_shapes
+                        if isinstance(output_shapes, list):
+                            self._output_placeholders.append([])
+                            for j, output_shape in enumerate(output_shapes):
+                                output_placeholder = ad.OpPlaceholder(output_shape)
+                                self._output_placeholders[-1].append(output_placeholder)
+                                self._loss = self._loss + losses(output_placeholder, self.outputs[i].outputs[j])
+                        else:
+                            output_placeholder = ad.OpPlaceholder(output_shapes)
+                            self._output_placeholders.append(output_placeholder)
+                            self._loss = self._loss + losses(output_placeholder, self.outputs[i].outputs)
+                else:
+                    output_shapes = self.outputs.output_shapes
                     if isinstance(output_shapes, list):
-                        self._output_placeholders.append([])
-                        for j, output_shape in enumerate(output_shapes):
-                            output_placeholder = ad.OpPlaceholder(output_shape)
-                            self._output_placeholders[-1].append(output_placeholder)
-                            self._loss = self._loss + losses(output_placeholder, self.outputs[i].outputs[j])
+                        self._output_placeholders = []
+                        for i, output_shape in enumerate(output_shapes):
+                            output_placeholder = ad.OpPlaceholder(output_shapes)
+                            self._output_placeholders.append(output_placeholder)
+                            self._loss = self._loss + losses(output_placeholder, self.outputs.outputs[i])
                     else:
                         output_placeholder = ad.OpPlaceholder(output_shapes)
-                        self._output_placeholders.append(output_placeholder)
-                        self._loss = self._loss + losses(output_placeholder, self.outputs[i].outputs)
-            else:
-                output_shapes = self.outputs.output_shapes
-                if isinstance(output_shapes, list):
-                    self._output_placeholders = []
-                    for i, output_shape in enumerate(output_shapes):
-                        output_placeholder = ad.OpPlaceholder(output_shapes)
-                        self._output_placeholders.append(output_placeholder)
-                        self._loss = self._loss + losses(output_placeholder, self.outputs.outputs[i])
-                else:
-                    output_placeholder = ad.OpPlaceholder(output_shapes)
-                    self._output_placeholders = output_placeholder
-                    self._loss = self._loss + losses(output_placeholder, self.outputs.outputs)
+                        self._output_placeholders = output_placeholder
+                        self._loss = self._loss + losses(output_placeholder, self.outputs.outputs)
 
+            if self._parallel is not None:
+                self._parallel.start()
         super(Model, self).build(None)
 
     def call(self, inputs, **kwargs):
         return self.outputs
 
-    def fit_on_batch(self,
-                     x: Union[np.ndarray, List[np.ndarray]],
-                     y: Union[np.ndarray, List[np.ndarray]]):
+    def _feed_dict(self,
+                   x: Union[np.ndarray, List[np.ndarray]],
+                   y: Union[None, np.ndarray, List[np.ndarray]],
+                   training: bool) -> dict:
         # TODO: Multiple outputs
-        feed_dict = {ad.Operation.KEY_TRAINING: True}
+        feed_dict = {ad.Operation.KEY_TRAINING: training}
         if isinstance(x, list):
             for i, input_val in enumerate(x):
                 feed_dict[self._inputs[i].placeholder] = input_val
         else:
             feed_dict[self._inputs.placeholder] = x
-        feed_dict[self._output_placeholders] = y
+        if y is not None:
+            feed_dict[self._output_placeholders] = y
+        return feed_dict
+
+    def _forward_backward(self,
+                          x: Union[np.ndarray, List[np.ndarray]],
+                          y: Union[np.ndarray, List[np.ndarray]],
+                          loss_scale: float = 1.0) -> List[np.ndarray]:
+        """Compute the gradients of the trainable weights.
+
+        :return: The losses and the values of the updates.
+        """
+        feed_dict = self._feed_dict(x, y, training=True)
         self._session.prepare()
-        self._session.run(self._loss, feed_dict=feed_dict)
-        self._loss.backward()
-        for var, update in self.updates:
-            var.update(update.forward(feed_dict=feed_dict))
-        self._optimizer.update(self.trainable_weights, self._session)
+        outputs = self._session.run([self._loss] + [update for _, update in self.updates], feed_dict=feed_dict)
+        if loss_scale == 1.0:
+            self._loss.backward(wrt=self.trainable_weights)
+        else:
+            self._loss.backward(wrt=self.trainable_weights, gradient=np.full_like(outputs[0], loss_scale))
+        return outputs
+
+    def fit_on_batch(self,
+                     x: Union[np.ndarray, List[np.ndarray]],
+                     y: Union[np.ndarray, List[np.ndarray]],
+                     trace_file: Optional[str] = None) -> float:
+        """Train on one batch.
+
+        :param x: The inputs.
+        :param y: The outputs.
+        :param trace_file: Write the timeline of the step to the file if it is not None, see :class:`ad.Tracer`.
+        :return: The mean loss of the batch before the update.
+        """
+        loss_scale = self._optimizer.loss_scale
+        with ad.sess.trace.tracing(trace_file), ad.trace_span('fit_on_batch', 'model'):
+            with self._session.profiling():
+                if self._parallel is None:
+                    outputs = self._forward_backward(x, y, loss_scale)
+                else:
+                    outputs = self._parallel.forward_backward(x, y, loss_scale)
+            for (var, _), value in zip(self.updates, outputs[1:]):
+                var.update(value)
+            with ad.trace_span('update', 'optimizer'):
+                self._optimizer.update(self.trainable_weights, self._session)
+        return float(np.mean(outputs[0]))
+
+    def profile(self, enable: bool = True) -> Optional[ad.Profiler]:
+        """Measure the operations in the following steps, see :class:`ad.Profiler`.
+
+        :param enable: Whether to enable profiling, the measurements are kept if it is already enabled.
+        :return: The profiler, None if profiling is disabled.
+        """
+        if not enable:
+            self._session.profiler = None
+        elif self._session.profiler is None:
+            self._session.profiler = ad.Profiler()
+        return self._session.profiler
+
+    def close(self):
+        """Stop the worker threads and processes, they are started again when needed."""
+        self._session.close()
+        if self._parallel is not None:
+            self._parallel.close()
+
+    def evaluate_on_batch(self,
+                          x: Union[np.ndarray, List[np.ndarray]],
+                          y: Union[np.ndarray, List[np.ndarray]]) -> float:
+        """Compute the mean loss of one batch in the prediction phase, in a new execution context."""
+        feed_dict = self._feed_dict(x, y, training=False)
+        with ad.ExecutionContext():
+            self._session.prepare()
+            return float(np.mean(self._session.run(self._loss, feed_dict=feed_dict)))
 
     def predict_on_batch(self, x: Union[np.ndarray, List[np.ndarray]]) -> Union[np.ndarray, List[np.ndarray]]:
-        feed_dict = {ad.Operation.KEY_TRAINING: False}
-        if isinstance(x, list):
-            for i, input_val in enumerate(x):
-                feed_dict[self._inputs[i].placeholder] = input_val
+        """Predict in a new execution context, so that it could be called by multiple threads at the same time."""
+        feed_dict = self._feed_dict(x, None, training=False)
+        with ad.ExecutionContext():
+            self._session.prepare()
+            if isinstance(self._outputs, list):
+                outputs = [self._session.run(output.outputs, feed_dict=feed_dict) for output in self._outputs]
+            else:
+                outputs = self._session.run(self._outputs.outputs, feed_dict=feed_dict)
+        return outputs
+
+    @staticmethod
+    def _batches(x, y, batch_size: int, steps: Optional[int], shuffle: bool = False) -> Iterable:
+        """The batches of the arrays or the next `steps` batches of the generator."""
+        if is_arrays(x):
+            indices = np.random.permutation(num_samples(x)) if shuffle else None
+            batches = iterate_batches(x, y, batch_size, indices)
         else:
-            feed_dict[self._inputs.placeholder] = x
-        self._session.prepare()
+            batches = x
+        if steps is not None:
+            batches = itertools.islice(batches, steps)
+        return batches
+
+    def fit(self,
+            x: Union[np.ndarray, List[np.ndarray], Iterable],
+            y: Union[None, np.ndarray, List[np.ndarray]] = None,
+            batch_size: int = 32,
+            epochs: int = 1,
+            shuffle: bool = True,
+            steps_per_epoch: Optional[int] = None,
+            prefetch: int = 1,
+            verbose: bool = False) -> List[dict]:
+        """Train with batches.
+
+        :param x: The inputs, or a generator of `(x, y)` batches.
+        :param y: The outputs, it should be None if `x` is a generator.
+        :param batch_size: The number of samples in a batch, the last batch could be smaller.
+        :param epochs: The number of epochs.
+        :param shuffle: Whether to shuffle the samples in each epoch, the generators are not shuffled.
+        :param steps_per_epoch: The number of batches in an epoch, all the batches are used if it is None. A generator
+                                is shared by the epochs, so it should be given when there are multiple epochs.
+        :param prefetch: The number of batches prepared in a background thread while the current batch is trained.
+        :param verbose: Whether to print the summary of each epoch.
+        :return: The mean loss, the number of samples, the duration and the throughput (`samples_per_second`) of
+                 each epoch.
+        """
+        if not is_arrays(x):
+            x = iter(x)
+        history = []
+        for epoch in range(epochs):
+            total_loss, total_samples = 0.0, 0
+            start = time.time()
+            with Prefetcher(self._batches(x, y, batch_size, steps_per_epoch, shuffle), prefetch) as batches:
+                for x_batch, y_batch in batches:
+                    samples = num_samples(y_batch)
+                    total_loss += self.fit_on_batch(x_batch, y_batch) * samples
+                    total_samples += samples
+            seconds = time.time() - start
+            history.append({
+                'loss': total_loss / max(1, total_samples),
+                'samples': total_samples,
+                'seconds': seconds,
+                'samples_per_second': total_samples / seconds if seconds > 0.0 else 0.0,
+            })
+            if verbose:
+                print('Epoch %d/%d - loss: %.4f - %d samples - %.3fs - %.1f samples/s' % (
+                    epoch + 1, epochs, history[-1]['loss'], total_samples, seconds,
+                    history[-1]['samples_per_second']))
+        return history
+
+    def evaluate(self,
+                 x: Union[np.ndarray, List[np.ndarray], Iterable],
+                 y: Union[None, np.ndarray, List[np.ndarray]] = None,
+                 batch_size: int = 32,
+                 steps: Optional[int] = None,
+                 prefetch: int = 1) -> float:
+        """Compute the mean loss of all the samples.
+
+        :param x: The inputs, or a generator of `(x, y)` batches.
+        :param y: The outputs, it should be None if `x` is a generator.
+        :param batch_size: The number of samples in a batch.
+        :param steps: The number of batches, all the batches are used if it is None.
+        :param prefetch: The number of batches prepared in a background thread.
+        :return: The mean loss.
+        """
+        total_loss, total_samples = 0.0, 0
+        with Prefetcher(self._batches(x, y, batch_size, steps), prefetch) as batches:
+            for x_batch, y_batch in batches:
+                samples = num_samples(y_batch)
+                total_loss += self.evaluate_on_batch(x_batch, y_batch) * samples
+                total_samples += samples
+        return total_loss / max(1, total_samples)
+
+    def predict(self,
+                x: Union[np.ndarray, List[np.ndarray], Iterable],
+                batch_size: int = 32,
+                steps: Optional[int] = None,
+                prefetch: int = 1) -> Union[np.ndarray, List[np.ndarray]]:
+        """Predict with batches.
+
+        :param x: The inputs, or a generator of the batches of inputs.
+        :param batch_size: The number of samples in a batch.
+        :param steps: The number of batches, all the batches are used if it is None.
+        :param prefetch: The number of batches prepared in a background thread.
+        :return: The concatenated outputs of the batches.
+        """
+        outputs = []
+        with Prefetcher(self._batches(x, None, batch_size, steps), prefetch) as batches:
+            for x_batch in batches:
+                outputs.append(self.predict_on_batch(x_batch))
         if isinstance(self._outputs, list):
-            outputs = [self._session.run(output.outputs, feed_dict=feed_dict) for output in self._outputs]
-        else:
-            outputs = self._session.run(self._outputs.outputs, feed_dict=feed_dict)
-        return outputs
+            return [np.concatenate(output) for output in zip(*outputs)]
+        return np.concatenate(outputs)
@@ -1,3 +1,5 @@
+from .dtype import *
+from .context import *
 from .operation import Operation
 
 from .op_constant import OpConstant
@@ -0,0 +1,152 @@
+import threading
+import itertools
+from typing import Any, Callable, Optional
+
+__all__ = ['ExecutionContext', 'current_context', 'next_step', 'run_in_context']
+
+#: The active contexts of the threads.
+_LOCAL = threading.local()
+#: Generates unique steps for all the threads.
+_STEPS = itertools.count(1)
+#: The attributes of operations that are redirected to the active contexts.
+_RUN_STATES = []
+#: The number of active contexts in all the threads, the redirections are only installed when it is positive.
+_ACTIVE = [0]
+_LOCK = threading.Lock()
+
+
+def next_step() -> int:
+    """A step that has never been returned before, it is safe to be called from multiple threads."""
+    return next(_STEPS)
+
+
+def current_context() -> Optional['ExecutionContext']:
+    """The execution context that is active in the current thread, None if there is no one."""
+    return getattr(_LOCAL, 'context', None)
+
+
+def run_in_context(context: Optional['ExecutionContext'], func: Callable, *args) -> Any:
+    """Call the function with the context active in the current thread.
+
+    The context is lent to the current thread without being entered, it is used by the workers of the parallel
+    executor to evaluate the operations in the context of the thread that started the run. The context should be
+    active in the thread that lends it.
+
+    :param context: The context to be used, the function is called without a context if it is None.
+    :param func: The function to be called.
+    :return: The result of the function.
+    """
+    previous = getattr(_LOCAL, 'context', None)
+    _LOCAL.context = context
+    try:
+        return func(*args)
+    finally:
+        _LOCAL.context = previous
+
+
+class RunState(object):
+    """Redirects a slot of operations that holds the result of runs to the active execution context.
+
+    The values are read from and written to the slot if there is no active context in the current thread.
+    """
+
+    __slots__ = ('owner', 'name', 'member', 'default')
+
+    def __init__(self, owner: type, name: str, default: Any):
+        """
+        :param owner: The class that declares the slot.
+        :param name: The name of the slot.
+        :param default: The value of the operations that are not evaluated in the context yet.
+        """
+        self.owner = owner
+        self.name = name
+        self.member = owner.__dict__[name]
+        self.default = default
+
+    def install(self) -> None:
+        setattr(self.owner, self.name, self)
+
+    def uninstall(self) -> None:
+        setattr(self.owner, self.name, self.member)
+
+    def __get__(self, op, owner: type = None) -> Any:
+        if op is None:
+            return self
+        context = getattr(_LOCAL, 'context', None)
+        if context is None:
+            return self.member.__get__(op, owner)
+        states = context.states.get(op)
+        if states is None:
+            return self.default
+        return states.get(self.name, self.default)
+
+    def __set__(self, op, value: Any) -> None:
+        context = getattr(_LOCAL, 'context', None)
+        if context is None:
+            self.member.__set__(op, value)
+            return
+        states = context.states.get(op)
+        if states is None:
+            states = context.states[op] = {}
+        states[self.name] = value
+
+
+def register_run_states(owner: type, defaults: dict) -> list:
+    """Store the slots of the class in the active contexts.
+
+    :param owner: The class that declares the slots.
+    :param defaults: The names of the slots and their default values.
+    :return: The slot descriptors and the default values.
+    """
+    members = []
+    with _LOCK:
+        for name, default in defaults.items():
+            state = RunState(owner, name, default)
+            _RUN_STATES.append(state)
+            members.append((state.member, default))
+            if _ACTIVE[0] > 0:
+                state.install()
+    return members
+
+
+class ExecutionContext(object):
+    """Holds the results of the operations (inputs, outputs, gradients and caches) for runs in one thread.
+
+    Without an active context, the results are stored in the operations themselves. With a context activated by
+    `with context:`, the results are stored in the context instead, so that the same graph could be evaluated by
+    multiple threads at the same time, each thread with its own context. The contexts could be nested, the innermost
+    one is used. A context should not be entered by two threads at the same time, the parallel executor of
+    :class:`Session` lends the context to its workers with :func:`run_in_context` instead.
+
+    The attributes are redirected only when there are active contexts, so the runs without contexts are not slowed
+    down when no context is used.
+    """
+
+    def __init__(self):
+        #: The results of the operations, each operation has a dictionary of its attributes.
+        self.states = {}
+        #: The current step of the session in this context.
+        self.step = next_step()
+        self._parents = []
+
+    def __enter__(self) -> 'ExecutionContext':
+        with _LOCK:
+            if _ACTIVE[0] == 0:
+                for state in _RUN_STATES:
+                    state.install()
+            _ACTIVE[0] += 1
+        self._parents.append(current_context())
+        _LOCAL.context = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        _LOCAL.context = self._parents.pop()
+        with _LOCK:
+            _ACTIVE[0] -= 1
+            if _ACTIVE[0] == 0:
+                for state in _RUN_STATES:
+                    state.uninstall()
+
+    def clear(self) -> None:
+        """Release all the results held by the context."""
+        self.states = {}
@@ -0,0 +1,61 @@
+from typing import Union, Optional
+from contextlib import contextmanager
+import numpy as np
+
+__all__ = ['floatx', 'variable_floatx', 'set_floatx', 'dtype_scope']
+
+#: The stack of default float types and variable float types, the last one is used.
+_FLOATX = [(np.dtype(np.float64), np.dtype(np.float64))]
+
+
+def _to_float_dtype(dtype: Union[str, type, np.dtype]) -> np.dtype:
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError('Expect a float type, found %s' % str(dtype))
+    return dtype
+
+
+def _to_float_dtypes(dtype: Union[str, type, np.dtype],
+                     variable_dtype: Optional[Union[str, type, np.dtype]] = None):
+    dtype = _to_float_dtype(dtype)
+    if variable_dtype is None:
+        return dtype, dtype
+    return dtype, _to_float_dtype(variable_dtype)
+
+
+def floatx() -> np.dtype:
+    """The float type of the operations that are created now."""
+    return _FLOATX[-1][0]
+
+
+def variable_floatx() -> np.dtype:
+    """The float type of the weights stored in the variables that are created now."""
+    return _FLOATX[-1][1]
+
+
+def set_floatx(dtype: Union[str, type, np.dtype], variable_dtype: Optional[Union[str, type, np.dtype]] = None) -> None:
+    """Set the default float type.
+
+    The operations record the float type when they are created. Placeholders cast the fed floats, variables and
+    constants store their values, and the operations that generate values (e.g. :class:`OpOnes`) create values with
+    the recorded type. Other operations follow the types of their inputs.
+
+    :param dtype: A float type, e.g. `'float32'`.
+    :param variable_dtype: The float type of the weights stored in variables, the weights are casted to `dtype` in
+                           forward passes (mixed precision). It is the same as `dtype` if it is None.
+    """
+    _FLOATX[-1] = _to_float_dtypes(dtype, variable_dtype)
+
+
+@contextmanager
+def dtype_scope(dtype: Union[str, type, np.dtype], variable_dtype: Optional[Union[str, type, np.dtype]] = None):
+    """Use the float type for the operations created in the scope.
+
+    :param dtype: A float type, e.g. `'float32'`.
+    :param variable_dtype: The float type of the weights stored in variables, see :func:`set_floatx`.
+    """
+    _FLOATX.append(_to_float_dtypes(dtype, variable_dtype))
+    try:
+        yield
+    finally:
+        _FLOATX.pop()
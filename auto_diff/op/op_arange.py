@@ -8,6 +8,10 @@ from .op_constant import OpConstant
 class OpArange(Operation):
     """Get evenly spaced values within a given interval."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+
     def __init__(self,
                  start: [Union[int, float, Operation]],
                  stop: Optional[Union[int, float, Operation]] = None,
@@ -36,7 +40,7 @@ class OpArange(Operation):
                 values[i] = values[i].forward(feed_dict)
         if values[0] is None:
             values[0], values[1] = values[1], None
-        return np.arange(*values, dtype=np.float64)
+        return np.arange(*values, dtype=self.dtype)
 
     def _backward(self, gradient: np.ndarray) -> None:
         pass
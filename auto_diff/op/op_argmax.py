@@ -7,6 +7,8 @@ from .op_placeholder import OpPlaceholder
 class OpArgmax(Operation):
     """Returns the indices of the maximum values along an axis."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, axis: Optional[int] = None, **kwargs):
         self.inputs = [x]
         self.params = {
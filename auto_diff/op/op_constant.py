@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpConstant(Operation):
     """Contains a constant."""
 
+    __slots__ = ('x',)
+
+    backward_uses_values = False
+
     def __init__(self, x: Union[int, float, list, np.ndarray], **kwargs):
         """
         :param x: The constant value.
@@ -16,18 +20,20 @@ class OpConstant(Operation):
             self.x = float(x)
             self.shape = ()
         else:
-            self.x = np.array(x, dtype=np.float64)
+            self.x = np.array(x)
             self.shape = self.x.shape
             self.params = {
                 'shape': self.shape,
             }
         super(OpConstant, self).__init__(**kwargs)
+        if not np.isscalar(self.x) and np.issubdtype(self.x.dtype, np.floating):
+            # Only the float arrays follow the float type, the indices and the masks are kept as they are
+            self.x = self.x.astype(self.dtype, copy=False)
 
-    @property
-    def name(self) -> str:
+    def _build_name(self, names: Mapping[Operation, str]) -> str:
         if np.isscalar(self.x):
             return str(self.x)
-        return super(OpConstant, self).name
+        return super(OpConstant, self)._build_name(names)
 
     def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
         """Returns the constant."""
@@ -0,0 +1,142 @@
+from typing import Mapping, Union, Sequence, Tuple
+import numpy as np
+from numpy.lib.stride_tricks import as_strided
+from .operation import Operation
+from .op_placeholder import OpPlaceholder
+
+
+def _pair(value: Union[int, Sequence[int]]) -> Tuple[int, int]:
+    if isinstance(value, int):
+        return value, value
+    return tuple(value)
+
+
+def _output_size(size: int, kernel_size: int, stride: int, dilation_rate: int, pad_width: int) -> int:
+    return (size + 2 * pad_width - (dilation_rate * (kernel_size - 1) + 1)) // stride + 1
+
+
+def _pad_images(x: np.ndarray, pad_width: Tuple[int, int], constant_values: float = 0.0) -> np.ndarray:
+    """Pad both sides of the rows and the columns of images in the `(batch, height, width, channels)` layout."""
+    if pad_width == (0, 0):
+        return x
+    return np.pad(x, ((0, 0), (pad_width[0],) * 2, (pad_width[1],) * 2, (0, 0)),
+                  mode='constant', constant_values=constant_values)
+
+
+def _windows(padded: np.ndarray,
+             kernel_size: Tuple[int, int],
+             strides: Tuple[int, int],
+             dilation_rate: Tuple[int, int]) -> np.ndarray:
+    """The read-only strided view of the windows with shape
+    `(batch, rows, columns, kernel_height, kernel_width, channels)`, no data is copied."""
+    batch_size, height, width, channels = padded.shape
+    new_height = _output_size(height, kernel_size[0], strides[0], dilation_rate[0], 0)
+    new_width = _output_size(width, kernel_size[1], strides[1], dilation_rate[1], 0)
+    s_batch, s_height, s_width, s_channel = padded.strides
+    return as_strided(
+        padded,
+        shape=(batch_size, new_height, new_width, kernel_size[0], kernel_size[1], channels),
+        strides=(s_batch, s_height * strides[0], s_width * strides[1],
+                 s_height * dilation_rate[0], s_width * dilation_rate[1], s_channel),
+        writeable=False,
+    )
+
+
+def _scatter_windows(window_gradient: np.ndarray,
+                     padded_shape: Tuple[int, ...],
+                     strides: Tuple[int, int],
+                     dilation_rate: Tuple[int, int]) -> np.ndarray:
+    """The inverse of :func:`_windows` (col2im): sum the gradients of the windows into the padded images with one
+    strided addition for each position in the kernel."""
+    _, new_height, new_width, kernel_height, kernel_width, _ = window_gradient.shape
+    padded_gradient = np.zeros(padded_shape, dtype=window_gradient.dtype)
+    for i in range(kernel_height):
+        top = i * dilation_rate[0]
+        rows = slice(top, top + strides[0] * (new_height - 1) + 1, strides[0])
+        for j in range(kernel_width):
+            left = j * dilation_rate[1]
+            columns = slice(left, left + strides[1] * (new_width - 1) + 1, strides[1])
+            padded_gradient[:, rows, columns, :] += window_gradient[:, :, :, i, j, :]
+    return padded_gradient
+
+
+def _crop_images(padded: np.ndarray, pad_width: Tuple[int, int], height: int, width: int) -> np.ndarray:
+    return padded[:, pad_width[0]:pad_width[0] + height, pad_width[1]:pad_width[1] + width, :]
+
+
+class OpConv2D(Operation):
+    """2-D convolution of images in the `(batch, height, width, channels)` layout.
+
+    The images are padded with zeros, the patches of the padded images are gathered with a strided view (im2col) and
+    multiplied with the kernel in a single matrix multiplication. The kernel has the shape
+    `(kernel_height * kernel_width * channels, filters)`, the rows are in the order of the flattened patches.
+
+    The gradient of the kernel is the product of the transposed patches and the gradient of the output, the gradient
+    of the patches is scattered back to the padded images (col2im) with one strided addition for each position in the
+    kernel.
+    """
+
+    __slots__ = ('kernel_size', 'strides', 'dilation_rate', 'pad_width')
+
+    def __init__(self,
+                 x: Operation,
+                 kernel: Operation,
+                 kernel_size: Union[int, Sequence[int]],
+                 strides: Union[int, Sequence[int]] = 1,
+                 dilation_rate: Union[int, Sequence[int]] = 1,
+                 pad_width: Union[int, Sequence[int]] = 0,
+                 **kwargs):
+        """
+        :param x: The images with shape `(batch, height, width, channels)`.
+        :param kernel: The kernel with shape `(kernel_height * kernel_width * channels, filters)`.
+        :param kernel_size: The height and width of the kernel.
+        :param strides: The strides of the rows and the columns.
+        :param dilation_rate: The spacing between the elements of the kernel.
+        :param pad_width: The number of zeros padded to both sides of the rows and the columns.
+        """
+        self.inputs = [x, kernel]
+        self.kernel_size = _pair(kernel_size)
+        self.strides = _pair(strides)
+        self.dilation_rate = _pair(dilation_rate)
+        self.pad_width = _pair(pad_width)
+        self.params = {
+            'kernel_size': self.kernel_size,
+            'strides': self.strides,
+            'dilation_rate': self.dilation_rate,
+            'pad_width': self.pad_width,
+        }
+        if x.dim != 4:
+            raise ValueError('The input should be a 4-D tensor, found shape %s' % str(x.shape))
+        if kernel.dim != 2:
+            raise ValueError('The kernel should be a 2-D tensor, found shape %s' % str(kernel.shape))
+        rows = self.kernel_size[0] * self.kernel_size[1] * x.shape[-1] if x.shape[-1] is not None else None
+        if rows is not None and kernel.shape[0] is not None and rows != kernel.shape[0]:
+            raise ValueError('The first dimension of the kernel should be %d, found shape %s'
+                             % (rows, str(kernel.shape)))
+        self.shape = (x.shape[0],) + tuple(
+            _output_size(x.shape[1 + i], self.kernel_size[i], self.strides[i], self.dilation_rate[i], self.pad_width[i])
+            if x.shape[1 + i] is not None else None
+            for i in range(2)
+        ) + (kernel.shape[1],)
+        super(OpConv2D, self).__init__(**kwargs)
+
+    def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
+        x, kernel = self.values
+        patches = _windows(_pad_images(np.asarray(x), self.pad_width),
+                           self.kernel_size, self.strides, self.dilation_rate)
+        columns = patches.reshape((-1, kernel.shape[0]))
+        return np.dot(columns, kernel).reshape(patches.shape[:3] + (kernel.shape[1],))
+
+    def _backward(self, gradient: np.ndarray) -> None:
+        x, kernel = self.values
+        padded = _pad_images(np.asarray(x), self.pad_width)
+        flat_gradient = gradient.reshape((-1, kernel.shape[1]))
+        self.gradients = [None, None]
+        if self._requires_grad(1):
+            patches = _windows(padded, self.kernel_size, self.strides, self.dilation_rate)
+            self.gradients[1] = np.dot(patches.reshape((-1, kernel.shape[0])).T, flat_gradient)
+        if self._requires_grad(0):
+            patch_gradient = np.dot(flat_gradient, kernel.T).reshape(
+                gradient.shape[:3] + self.kernel_size + (padded.shape[-1],))
+            padded_gradient = _scatter_windows(patch_gradient, padded.shape, self.strides, self.dilation_rate)
+            self.gradients[0] = _crop_images(padded_gradient, self.pad_width, *np.shape(x)[1:3])
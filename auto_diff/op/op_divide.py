@@ -7,6 +7,8 @@ from .op_placeholder import OpPlaceholder
 class OpDivide(Operation):
     """Element-wise divide."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, y: Operation, **kwargs):
         self.inputs = [x, y]
         self._broadcast_shape(x, y)
@@ -18,6 +20,6 @@ class OpDivide(Operation):
     def _backward(self, gradient: np.ndarray) -> None:
         x, y = self.values
         self.gradients = [
-            self._broadcast_backward(gradient / y, np.shape(x)),
-            self._broadcast_backward(-gradient * x / np.square(y), np.shape(y)),
+            self._broadcast_backward(gradient / y, np.shape(x)) if self._requires_grad(0) else None,
+            self._broadcast_backward(-gradient * x / np.square(y), np.shape(y)) if self._requires_grad(1) else None,
         ]
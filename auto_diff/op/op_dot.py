@@ -77,6 +77,8 @@ class OpDot(Operation):
 
     """
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, y: Operation, **kwargs):
         self.inputs = [x, y]
         if x.isscalar():
@@ -110,44 +112,48 @@ class OpDot(Operation):
 
     def _backward(self, gradient: Operation) -> None:
         x, y = self.values
+        requires_x, requires_y = self._requires_grad(0), self._requires_grad(1)
         if np.isscalar(x):
             self.gradients = [
-                np.sum(gradient * y),
-                gradient * x,
+                np.sum(gradient * y) if requires_x else None,
+                gradient * x if requires_y else None,
             ]
         elif np.isscalar(y):
             self.gradients = [
-                gradient * y,
-                np.sum(gradient * x),
+                gradient * y if requires_x else None,
+                np.sum(gradient * x) if requires_y else None,
             ]
         elif np.ndim(x) == 1 and np.ndim(y) == 1:
             self.gradients = [
-                gradient * y,
-                gradient * x,
+                gradient * y if requires_x else None,
+                gradient * x if requires_y else None,
             ]
         elif np.ndim(x) == 2 and np.ndim(y) == 2:
             self.gradients = [
-                np.dot(gradient, np.transpose(y)),
-                np.dot(np.transpose(x), gradient),
+                np.dot(gradient, np.transpose(y)) if requires_x else None,
+                np.dot(np.transpose(x), gradient) if requires_y else None,
             ]
         elif np.ndim(y) == 1:
             self.gradients = [
-                np.dot(np.expand_dims(gradient, axis=-1), np.expand_dims(y, axis=0)),
-                np.sum(x * np.expand_dims(gradient, axis=-1), axis=tuple(range(np.ndim(x) - 1))),
+                np.dot(np.expand_dims(gradient, axis=-1), np.expand_dims(y, axis=0)) if requires_x else None,
+                np.sum(x * np.expand_dims(gradient, axis=-1), axis=tuple(range(np.ndim(x) - 1)))
+                if requires_y else None,
             ]
         else:
             x_pre_shape, y_pre_shape = x.shape[:-1], y.shape[:-2]
             x_pre_dims = np.prod(x_pre_shape, dtype=np.int)
-            x_reshaped = np.reshape(x, (-1, x.shape[-1]))
-            y_reshaped = np.reshape(y, (-1, y.shape[-2], y.shape[-1])).transpose((1, 0, 2)).reshape((y.shape[-2], -1))
             g_reshaped = gradient.reshape((x_pre_dims, -1))
-            self.gradients = [
-                np.dot(
+            self.gradients = [None, None]
+            if requires_x:
+                y_reshaped = np.reshape(y, (-1, y.shape[-2], y.shape[-1])).transpose((1, 0, 2))\
+                    .reshape((y.shape[-2], -1))
+                self.gradients[0] = np.dot(
                     g_reshaped,
                     y_reshaped.transpose()
-                ).reshape(x.shape),
-                np.dot(
+                ).reshape(x.shape)
+            if requires_y:
+                x_reshaped = np.reshape(x, (-1, x.shape[-1]))
+                self.gradients[1] = np.dot(
                     x_reshaped.transpose(),
                     g_reshaped,
-                ).reshape((y.shape[-2], -1, y.shape[-1])).transpose((1, 0, 2)).reshape(y.shape),
-            ]
+                ).reshape((y.shape[-2], -1, y.shape[-1])).transpose((1, 0, 2)).reshape(y.shape)
@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpExpandDims(Operation):
     """Expand the dimensions of the tensor."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+
     def __init__(self, x: Operation, axis: Optional[int] = None, **kwargs):
         self.inputs = [x]
         if axis is None:
@@ -6,6 +6,8 @@ from .operation import Operation
 class OpFlatten(Operation):
     """Flatten the tensor to 1-D array."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, **kwargs):
         self.inputs = [x]
         if any(map(lambda x: x is None, np.shape(x))):
@@ -0,0 +1,142 @@
+from typing import Mapping, Union, Sequence, Tuple, List, Optional
+import numpy as np
+from .operation import Operation
+from .op_placeholder import OpPlaceholder
+
+
+def _sigmoid(x, out=None):
+    out = np.multiply(x, 0.5, out=out)
+    np.tanh(out, out=out)
+    np.add(out, 1.0, out=out)
+    return np.multiply(out, 0.5, out=out)
+
+
+class OpFused(Operation):
+    """Element-wise operations fused into one operation.
+
+    The fused operations are stored as a sequence of instructions, each instruction is a pair of the kind of the
+    operation and the arguments. An integer argument :math:`i` refers to the :math:`i`-th input if :math:`i < n`,
+    otherwise it refers to the result of the :math:`(i - n)`-th instruction, where :math:`n` is the number of inputs.
+    A float argument is a scalar constant. The result of the last instruction is the output.
+
+    The intermediate results are written into buffers that are reused across steps, and the backward pass of all the
+    instructions is done in a single operation, so that no intermediate node is created in the graph.
+    """
+
+    __slots__ = ('_buffers', '_results')
+
+    _run_slots = {
+        '_buffers': None,
+        '_results': (),
+    }
+
+    #: The forward functions of the supported kinds, all of them accept an `out` argument.
+    FORWARDS = {
+        'add': np.add,
+        'subtract': np.subtract,
+        'multiply': np.multiply,
+        'divide': np.divide,
+        'negative': np.negative,
+        'exp': np.exp,
+        'log': np.log,
+        'tanh': np.tanh,
+        'sqrt': np.sqrt,
+        'square': np.square,
+        'sigmoid': _sigmoid,
+        'maximum': np.maximum,
+        'minimum': np.minimum,
+    }
+
+    #: The partial gradients of the arguments, the functions accept the gradient, the result and the arguments.
+    BACKWARDS = {
+        'add': (lambda g, z, x, y: g, lambda g, z, x, y: g),
+        'subtract': (lambda g, z, x, y: g, lambda g, z, x, y: -g),
+        'multiply': (lambda g, z, x, y: g * y, lambda g, z, x, y: g * x),
+        'divide': (lambda g, z, x, y: g / y, lambda g, z, x, y: -g * x / np.square(y)),
+        'negative': (lambda g, z, x: -g,),
+        'exp': (lambda g, z, x: g * z,),
+        'log': (lambda g, z, x: g / x,),
+        'tanh': (lambda g, z, x: g * (1.0 - np.square(z)),),
+        'sqrt': (lambda g, z, x: g / (2.0 * z),),
+        'square': (lambda g, z, x: 2.0 * x * g,),
+        'sigmoid': (lambda g, z, x: g * z * (1.0 - z),),
+        'maximum': (lambda g, z, x, y: np.equal(z, x) * g, lambda g, z, x, y: np.equal(z, y) * g),
+        'minimum': (lambda g, z, x, y: np.equal(z, x) * g, lambda g, z, x, y: np.equal(z, y) * g),
+    }
+
+    def __init__(self,
+                 inputs: Sequence[Operation],
+                 instructions: Sequence[Tuple[str, Tuple[Union[int, float], ...]]],
+                 shape: Sequence[Optional[int]],
+                 **kwargs):
+        """
+        :param inputs: The inputs of the fused operations.
+        :param instructions: The kinds and the arguments of the fused operations in topological order.
+        :param shape: The shape of the output.
+        :param kwargs: Arguments for parent.
+        """
+        for kind, args in instructions:
+            if kind not in self.FORWARDS:
+                raise NotImplementedError('Operation %s could not be fused' % kind)
+        self.inputs = list(inputs)
+        self.params = {
+            'instructions': tuple((kind, tuple(args)) for kind, args in instructions),
+        }
+        self.shape = tuple(shape)
+        super(OpFused, self).__init__(**kwargs)
+
+    def _build_name(self, names: Mapping[Operation, str]) -> str:
+        """The name is the same as the name of the operations before fusion."""
+        slots = [names[inp] for inp in self.inputs]
+        for kind, args in self.params['instructions']:
+            slots.append(kind + '(%s)' % ', '.join(slots[arg] if isinstance(arg, int) else str(arg) for arg in args))
+        return slots[-1]
+
+    def _buffer(self, index: int, operands: List) -> Optional[np.ndarray]:
+        shape = np.broadcast_shapes(*[np.shape(operand) for operand in operands])
+        if shape == ():
+            return None
+        dtype = np.result_type(*operands)
+        if not np.issubdtype(dtype, np.inexact):
+            # The types of the results of the integers depend on the kinds, e.g. `exp` and `divide`
+            return None
+        buffers = self._buffers
+        if buffers is None:
+            buffers = self._buffers = [None] * len(self.params['instructions'])
+        buffer = buffers[index]
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = buffers[index] = np.empty(shape, dtype=dtype)
+        return buffer
+
+    def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
+        """Evaluate the instructions, only the output is allocated in every step."""
+        slots = list(self.values)
+        instructions = self.params['instructions']
+        last = len(instructions) - 1
+        for index, (kind, args) in enumerate(instructions):
+            operands = [slots[arg] if isinstance(arg, int) else arg for arg in args]
+            out = self._buffer(index, operands) if index < last else None
+            slots.append(self.FORWARDS[kind](*operands, out=out))
+        self._results = slots
+        return slots[-1]
+
+    def _backward(self, gradient: np.ndarray) -> None:
+        """Propagate the gradient through the instructions in reverse order."""
+        slots, instructions = self._results, self.params['instructions']
+        num = len(self.inputs)
+        contributes = [self._requires_grad(i) for i in range(num)]
+        for kind, args in instructions:
+            contributes.append(any(contributes[arg] for arg in args if isinstance(arg, int)))
+        gradients = [None] * len(slots)
+        gradients[-1] = gradient
+        for index in reversed(range(len(instructions))):
+            g = gradients[num + index]
+            if g is None:
+                continue
+            kind, args = instructions[index]
+            operands = [slots[arg] if isinstance(arg, int) else arg for arg in args]
+            for arg, operand, partial in zip(args, operands, self.BACKWARDS[kind]):
+                if isinstance(arg, int) and contributes[arg]:
+                    g_arg = self._broadcast_backward(partial(g, slots[num + index], *operands), np.shape(operand))
+                    gradients[arg] = g_arg if gradients[arg] is None else gradients[arg] + g_arg
+        self.gradients = gradients[:num]
@@ -7,6 +7,12 @@ from .op_placeholder import OpPlaceholder
 class OpGetitem(Operation):
     """Get item based on indexing"""
 
+    __slots__ = ('item_forward', '_static_item')
+
+    _run_slots = {
+        'item_forward': None,
+    }
+
     def __init__(self, x: Operation, item, **kwargs):
         self.inputs = [x]
         self.params = {
@@ -15,17 +21,24 @@ class OpGetitem(Operation):
         shape = []
         if isinstance(item, (int, slice, Operation)):
             item = (item,)
+        static = True
         for i, s in enumerate(item):
+            if isinstance(s, Operation) or \
+                    isinstance(s, slice) and any(isinstance(v, Operation) for v in [s.start, s.stop, s.step]):
+                static = False
             if isinstance(s, slice):
                 if x.shape[i] is None or any(map(lambda x: isinstance(x, Operation), [s.start, s.stop, s.step])):
                     shape.append(None)
                 else:
                     shape.append(len(range(*s.indices(x.shape[i]))))
         self.shape = tuple(shape) + x.shape[len(item):]
-        self.item_forward = None
+        #: The resolved item if it does not contain operations, so that it is resolved only once.
+        self._static_item = tuple(s for s in item if isinstance(s, (int, slice))) if static else None
         super(OpGetitem, self).__init__(**kwargs)
 
     def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
+        if self._static_item is not None:
+            return self.values[0][self._static_item]
         self.item_forward = []
         item = self.params['item']
         if isinstance(item, (int, slice, Operation)):
@@ -46,5 +59,5 @@ class OpGetitem(Operation):
 
     def _backward(self, gradient: np.ndarray) -> None:
         holder = np.zeros_like(self.values[0])
-        holder[self.item_forward] = gradient
+        holder[self._static_item if self._static_item is not None else self.item_forward] = gradient
         self.gradients = [holder]
@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpGreater(Operation):
     """Element-wise less."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+
     def __init__(self, x: Operation, y: Operation, **kwargs):
         self.inputs = [x, y]
         self._broadcast_shape(x, y)
@@ -17,7 +21,7 @@ class OpGreater(Operation):
         if np.isscalar(result):
             result = float(result)
         else:
-            result = result.astype(np.float64)
+            result = result.astype(self.dtype)
         return result
 
     def _backward(self, gradient: np.ndarray) -> None:
@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpInTrainPhase(Operation):
     """Whether it is in training phase."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+
     def __init__(self, **kwargs):
         self.inputs = []
         self.params = {}
@@ -16,7 +20,7 @@ class OpInTrainPhase(Operation):
 
     def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
         """Find training information from feed dictionary."""
-        return np.array(Operation.KEY_TRAINING in feed_dict and feed_dict[Operation.KEY_TRAINING], dtype=np.float64)
+        return np.array(Operation.KEY_TRAINING in feed_dict and feed_dict[Operation.KEY_TRAINING], dtype=self.dtype)
 
     def _backward(self, gradient: np.ndarray) -> None:
         """No backward operation needed."""
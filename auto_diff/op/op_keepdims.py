@@ -5,6 +5,8 @@ from .operation import Operation
 class OpKeepdims(Operation):
     """Common operations for keepdims."""
 
+    __slots__ = ('_wrapped',)
+
     def __init__(self,
                  base_op: type,
                  x: Operation,
@@ -34,9 +36,16 @@ class OpKeepdims(Operation):
                     del shape[a]
             self.shape = tuple(shape)
 
+        self._wrapped = False
         if x.isscalar():
             self.params['keepdims'] = False
         elif not keepdims:
-            self.inputs[0] = base_op(self.inputs[0], axis=self.params['axis'], keepdims=True).\
-                squeeze(axis=axis, name=self.inputs[0].name)
+            self.inputs[0] = base_op(self.inputs[0], axis=self.params['axis'], keepdims=True).squeeze(axis=axis)
+            self._wrapped = True
         super(OpKeepdims, self).__init__(**kwargs)
+
+    def _name_inputs(self) -> Sequence[Operation]:
+        """The wrapped reduction and squeeze are hidden in the name."""
+        if self._wrapped:
+            return self.inputs[0].inputs[0].inputs
+        return self.inputs
@@ -7,6 +7,11 @@ from .op_placeholder import OpPlaceholder
 class OpMapFn(Operation):
     """Mapping with function."""
 
+    __slots__ = ('is_seq_input', 'is_seq_output', 'fn_output_num')
+
+    dynamic = True
+    backward_uses_values = False
+
     def __init__(self, fn: Callable, elems: Union[Operation, Sequence[Operation]], **kwargs):
         self.inputs = []
         self.params = {
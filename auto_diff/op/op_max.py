@@ -8,6 +8,8 @@ from .op_keepdims import OpKeepdims
 class OpMax(OpKeepdims):
     """Calculate the maximum of elements."""
 
+    __slots__ = ()
+
     def __init__(self,
                  x: Operation,
                  axis: Optional[Union[int, Sequence[int]]] = None,
@@ -24,4 +26,4 @@ class OpMax(OpKeepdims):
         if not self.params['keepdims']:
             self.gradients = [gradient]
             return
-        self.gradients = [np.equal(self.output, self.values[0]).astype(np.float64) * gradient]
+        self.gradients = [np.equal(self.output, self.values[0]) * gradient]
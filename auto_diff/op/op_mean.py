@@ -8,6 +8,8 @@ from .op_keepdims import OpKeepdims
 class OpMean(OpKeepdims):
     """Calculate the mean of elements."""
 
+    __slots__ = ()
+
     def __init__(self,
                  x: Operation,
                  axis: Optional[Union[int, Sequence[int]]] = None,
@@ -7,6 +7,8 @@ from .op_placeholder import OpPlaceholder
 class OpMinimum(Operation):
     """Element-wise minimum."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, y: Operation, **kwargs):
         self.inputs = [x, y]
         self._broadcast_shape(x, y)
@@ -17,6 +19,8 @@ class OpMinimum(Operation):
 
     def _backward(self, gradient: np.ndarray) -> None:
         self.gradients = [
-            self._broadcast_backward(np.equal(self.output, self.values[0]) * gradient, np.shape(self.values[0])),
-            self._broadcast_backward(np.equal(self.output, self.values[1]) * gradient, np.shape(self.values[1])),
+            self._broadcast_backward(np.equal(self.output, self.values[0]) * gradient, np.shape(self.values[0]))
+            if self._requires_grad(0) else None,
+            self._broadcast_backward(np.equal(self.output, self.values[1]) * gradient, np.shape(self.values[1]))
+            if self._requires_grad(1) else None,
         ]
@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpNegative(Operation):
     """Element-wise numerical negative."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+
     def __init__(self, x: Operation, **kwargs):
         self.inputs = [x]
         self.shape = x.shape
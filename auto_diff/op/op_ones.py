@@ -6,6 +6,10 @@ from .operation import Operation
 class OpOnes(Operation):
     """Constant tensor filled with ones."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+
     def __init__(self, shape: Union[int, Sequence[int]], **kwargs):
         self.params = {
             'shape': shape,
@@ -17,7 +21,7 @@ class OpOnes(Operation):
 
     def _forward(self, feed_dict: Mapping[Union[str, Operation], np.ndarray]) -> np.ndarray:
         """Generate and returns the constant."""
-        return np.ones(self.shape)
+        return np.ones(self.shape, dtype=self.dtype)
 
     def _backward(self, gradient: np.ndarray) -> None:
         """No backward operation needed."""
@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpPad(Operation):
     """Pad with zeros."""
 
+    __slots__ = ('slices',)
+
+    backward_uses_values = False
+
     def __init__(self, x: Operation, pad_width: Union[int, Sequence[int], Sequence[Sequence[int]]], **kwargs):
         self.inputs = [x]
         shape, slices = [], []
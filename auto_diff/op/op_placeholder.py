@@ -6,6 +6,10 @@ from .operation import Operation
 class OpPlaceholder(Operation):
     """The placeholder that represents values to be feed."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+
     def __init__(self, shape: Sequence[int], **kwargs):
         """
         :param shape: Shape of the value.
@@ -18,8 +22,11 @@ class OpPlaceholder(Operation):
         super(OpPlaceholder, self).__init__(**kwargs)
 
     def _forward(self, feed_dict: Mapping[Union[str, 'OpPlaceholder'], np.ndarray]):
-        """Finds and returns the value in feed dictionary."""
-        return feed_dict[self]
+        """Finds and returns the value in feed dictionary, the floats are casted to the float type."""
+        value = feed_dict[self]
+        if isinstance(value, np.ndarray) and np.issubdtype(value.dtype, np.floating) and value.dtype != self.dtype:
+            value = value.astype(self.dtype)
+        return value
 
     def _backward(self, gradient: np.ndarray) -> None:
         """No backward operation needed."""
@@ -0,0 +1,113 @@
+from typing import Mapping, Union, Sequence
+import numpy as np
+from .operation import Operation
+from .op_placeholder import OpPlaceholder
+from .op_conv2d import _pair, _output_size, _pad_images, _windows, _scatter_windows, _crop_images
+
+
+class OpPool2D(Operation):
+    """The base of the pooling operations of images in the `(batch, height, width, channels)` layout.
+
+    The windows are strided views of the padded images, the padded positions are ignored by the pooling.
+    """
+
+    __slots__ = ('pool_size', 'strides', 'pad_width')
+
+    def __init__(self,
+                 x: Operation,
+                 pool_size: Union[int, Sequence[int]],
+                 strides: Union[int, Sequence[int], None] = None,
+                 pad_width: Union[int, Sequence[int]] = 0,
+                 **kwargs):
+        """
+        :param x: The images with shape `(batch, height, width, channels)`.
+        :param pool_size: The height and width of the windows.
+        :param strides: The strides of the rows and the columns, the same as the pool size if it is None.
+        :param pad_width: The number of positions padded to both sides of the rows and the columns.
+        """
+        self.inputs = [x]
+        self.pool_size = _pair(pool_size)
+        self.strides = self.pool_size if strides is None else _pair(strides)
+        self.pad_width = _pair(pad_width)
+        self.params = {
+            'pool_size': self.pool_size,
+            'strides': self.strides,
+            'pad_width': self.pad_width,
+        }
+        if x.dim != 4:
+            raise ValueError('The input should be a 4-D tensor, found shape %s' % str(x.shape))
+        if self.pad_width[0] >= self.pool_size[0] or self.pad_width[1] >= self.pool_size[1]:
+            raise ValueError('The padding should be smaller than the pool size, found %s and %s'
+                             % (str(self.pad_width), str(self.pool_size)))
+        self.shape = (x.shape[0],) + tuple(
+            _output_size(x.shape[1 + i], self.pool_size[i], self.strides[i], 1, self.pad_width[i])
+            if x.shape[1 + i] is not None else None
+            for i in range(2)
+        ) + (x.shape[3],)
+        super(OpPool2D, self).__init__(**kwargs)
+
+    def _windows(self, x: np.ndarray, constant_values: float = 0.0) -> np.ndarray:
+        return _windows(_pad_images(x, self.pad_width, constant_values), self.pool_size, self.strides, (1, 1))
+
+    def _scatter(self, window_gradient: np.ndarray, x: np.ndarray) -> np.ndarray:
+        padded_shape = (x.shape[0], x.shape[1] + 2 * self.pad_width[0], x.shape[2] + 2 * self.pad_width[1], x.shape[3])
+        padded_gradient = _scatter_windows(window_gradient, padded_shape, self.strides, (1, 1))
+        return _crop_images(padded_gradient, self.pad_width, x.shape[1], x.shape[2])
+
+
+class OpMaxPool2D(OpPool2D):
+    """The maximum of each window.
+
+    The positions of the maximums are kept by the forward pass, the gradient of each window is added only to the
+    position of its maximum.
+    """
+
+    __slots__ = ('argmax',)
+
+    _run_slots = {
+        'argmax': None,
+    }
+
+    def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
+        x = np.asarray(self.values[0])
+        # The padded positions should never be the maximums, the integers have no infinity
+        minimum = np.iinfo(x.dtype).min if np.issubdtype(x.dtype, np.integer) else -np.inf
+        windows = self._windows(x, minimum)
+        batch_size, new_height, new_width, pool_height, pool_width, channels = windows.shape
+        flattened = windows.reshape((batch_size, new_height, new_width, pool_height * pool_width, channels))
+        self.argmax = np.argmax(flattened, axis=3)
+        return np.take_along_axis(flattened, np.expand_dims(self.argmax, axis=3), axis=3).squeeze(axis=3)
+
+    def _backward(self, gradient: np.ndarray) -> None:
+        x = np.asarray(self.values[0])
+        batch_size, new_height, new_width, channels = gradient.shape
+        window_gradient = np.zeros((batch_size, new_height, new_width, self.pool_size[0] * self.pool_size[1], channels),
+                                   dtype=gradient.dtype)
+        np.put_along_axis(window_gradient, np.expand_dims(self.argmax, axis=3), np.expand_dims(gradient, axis=3),
+                          axis=3)
+        window_gradient = window_gradient.reshape(gradient.shape[:3] + self.pool_size + (channels,))
+        self.gradients = [self._scatter(window_gradient, x)]
+
+
+class OpAvgPool2D(OpPool2D):
+    """The average of each window, the padded positions are not counted."""
+
+    __slots__ = ()
+
+    def _counts(self, x: np.ndarray) -> np.ndarray:
+        """The number of positions that are not padded in each window."""
+        if self.pad_width == (0, 0):
+            return np.array(self.pool_size[0] * self.pool_size[1], dtype=x.dtype)
+        ones = np.ones((1,) + x.shape[1:3] + (1,), dtype=x.dtype)
+        return np.sum(self._windows(ones), axis=(3, 4))
+
+    def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
+        x = np.asarray(self.values[0])
+        return np.sum(self._windows(x), axis=(3, 4)) / self._counts(x)
+
+    def _backward(self, gradient: np.ndarray) -> None:
+        x = np.asarray(self.values[0])
+        averaged = gradient / self._counts(x)
+        window_gradient = np.broadcast_to(averaged[:, :, :, np.newaxis, np.newaxis, :],
+                                          gradient.shape[:3] + self.pool_size + (gradient.shape[3],))
+        self.gradients = [self._scatter(window_gradient, x)]
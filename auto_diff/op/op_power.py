@@ -7,6 +7,8 @@ from .op_placeholder import OpPlaceholder
 class OpPower(Operation):
     """Element-wise power."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, y: Operation, **kwargs):
         self.inputs = [x, y]
         self._broadcast_shape(x, y)
@@ -16,9 +18,10 @@ class OpPower(Operation):
         return np.power(self.values[0], self.values[1])
 
     def _backward(self, gradient: np.ndarray) -> None:
-        gradient_x = self.values[1] * np.power(self.values[0], self.values[1] - 1.0)
-        gradient_y = np.log(self.values[0]) * self.output
-        self.gradients = [
-            self._broadcast_backward(gradient * gradient_x, np.shape(self.values[0])),
-            self._broadcast_backward(gradient * gradient_y, np.shape(self.values[1])),
-        ]
+        self.gradients = [None, None]
+        if self._requires_grad(0):
+            gradient_x = self.values[1] * np.power(self.values[0], self.values[1] - 1.0)
+            self.gradients[0] = self._broadcast_backward(gradient * gradient_x, np.shape(self.values[0]))
+        if self._requires_grad(1):
+            gradient_y = np.log(self.values[0]) * self.output
+            self.gradients[1] = self._broadcast_backward(gradient * gradient_y, np.shape(self.values[1]))
@@ -7,6 +7,11 @@ from .op_shape import OpShape
 class OpRandom(Operation):
     """Constant tensor filled with random values."""
 
+    __slots__ = ()
+
+    backward_uses_values = False
+    deterministic = False
+
     def __init__(self, shape: Union[int, Sequence[int], OpShape], **kwargs):
         if isinstance(shape, OpShape):
             self.shape = shape.inputs[0].shape
@@ -25,7 +30,7 @@ class OpRandom(Operation):
             shape = self.params['shape'].forward(feed_dict)
         else:
             shape = self.shape
-        return np.random.random(shape)
+        return np.random.random(shape).astype(self.dtype, copy=False)
 
     def _backward(self, gradient: np.ndarray) -> None:
         """No backward operation needed."""
@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpReshape(Operation):
     """Reshape the tensor to a given shape."""
 
+    __slots__ = ('old_shape',)
+
+    backward_uses_values = False
+
     def __init__(self, x: Operation, shape: Sequence[int], **kwargs):
         self.inputs = [x]
         self.params = {
@@ -7,6 +7,8 @@ from .op_placeholder import OpPlaceholder
 class OpSetitem(Operation):
     """Get item based on indexing"""
 
+    __slots__ = ('key',)
+
     def __init__(self, x: Operation, key, value: Operation, **kwargs):
         self.inputs = [x, value]
         self.key = key
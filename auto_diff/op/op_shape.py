@@ -7,6 +7,8 @@ from .op_placeholder import OpPlaceholder
 class OpShape(Operation):
     """Get shape of the operation."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, **kwargs):
         self.inputs = [x]
         self.shape = (x.dim,)
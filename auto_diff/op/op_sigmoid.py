@@ -0,0 +1,30 @@
+from typing import Mapping, Union
+import numpy as np
+from .operation import Operation
+from .op_placeholder import OpPlaceholder
+
+
+class OpSigmoid(Operation):
+    """Element-wise sigmoid.
+
+    .. math::
+       y = \\frac{1}{1 + e^{-x}} = \\frac{1 + \\tanh(x / 2)}{2}
+
+    The tanh form is used since it would not overflow.
+
+    .. math::
+       \\frac{\\partial L}{\\partial x} = \\frac{\\partial L}{\\partial y} \\cdot y \\cdot (1 - y)
+    """
+
+    __slots__ = ()
+
+    def __init__(self, x: Operation, **kwargs):
+        self.inputs = [x]
+        self.shape = x.shape
+        super(OpSigmoid, self).__init__(**kwargs)
+
+    def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
+        return 0.5 * (np.tanh(0.5 * self.values[0]) + 1.0)
+
+    def _backward(self, gradient: np.ndarray) -> None:
+        self.gradients = [self.output * (1.0 - self.output) * gradient]
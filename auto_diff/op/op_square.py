@@ -7,6 +7,8 @@ from .op_placeholder import OpPlaceholder
 class OpSquare(Operation):
     """Element-wise square."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, **kwargs):
         self.inputs = [x]
         self.shape = x.shape
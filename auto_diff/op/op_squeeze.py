@@ -7,6 +7,10 @@ from .op_placeholder import OpPlaceholder
 class OpSqueeze(Operation):
     """Flatten the tensor to 1-D array."""
 
+    __slots__ = ('backward_axis',)
+
+    backward_uses_values = False
+
     def __init__(self, x: Operation, axis: Optional[Union[int, Sequence[int]]] = None, **kwargs):
         self.inputs = [x]
         if axis is None:
@@ -8,6 +8,8 @@ from .op_keepdims import OpKeepdims
 class OpSum(OpKeepdims):
     """Sum of elements over a given axis."""
 
+    __slots__ = ()
+
     def __init__(self,
                  x: Operation,
                  axis: Optional[Union[int, Sequence[int]]] = None,
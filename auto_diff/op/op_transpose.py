@@ -40,6 +40,10 @@ class OpTranspose(Operation):
     operation with inverse mapping function :math:`f^{-1}`.
     """
 
+    __slots__ = ('inverse_axes',)
+
+    backward_uses_values = False
+
     def __init__(self, x: Operation, axes: Optional[Sequence[int]] = None, **kwargs):
         """
         :param x: Input operation.
@@ -1,12 +1,26 @@
+import threading
 from typing import Mapping, Union, Callable, Optional
 import numpy as np
 from .operation import Operation
 from .op_placeholder import OpPlaceholder
+from .dtype import variable_floatx
+
+
+#: Makes sure that the weights are initialized only once when the variables are evaluated by multiple threads.
+_INIT_LOCK = threading.Lock()
 
 
 class OpVariable(Operation):
     """Contains weights that could be updated."""
 
+    __slots__ = ('x', 'initializer', 'gradient', 'compute_dtype')
+
+    _run_slots = {
+        'gradient': None,
+    }
+
+    backward_uses_values = False
+
     def __init__(self,
                  initializer: Union[Callable, int, float, list, np.ndarray],
                  shape: Optional[Union[int, tuple]] = None,
@@ -25,14 +39,19 @@ class OpVariable(Operation):
             self.x = float(initializer)
             shape = ()
         else:
-            self.x = np.array(initializer, dtype=np.float64)
+            self.x = np.array(initializer)
             shape = self.x.shape
         self.params = {
             'shape': shape,
         }
         self.shape = shape
-        self.gradient = None
         super(OpVariable, self).__init__(**kwargs)
+        #: The float type of the output, the weights are stored with :attr:`dtype`.
+        self.compute_dtype = self.dtype
+        if kwargs.get('dtype') is None:
+            self.dtype = variable_floatx()
+        if self.x is not None and not np.isscalar(self.x):
+            self.x = self.x.astype(self.dtype, copy=False)
 
     def update(self, value: Union[int, float, list, np.ndarray]) -> None:
         if self.isscalar():
@@ -40,7 +59,7 @@ class OpVariable(Operation):
                 raise ValueError('Expect a scalar, found value with shape %s' % str(np.array(value).shape))
             self.x = value
             return
-        value = np.array(value)
+        value = np.array(value, dtype=self.dtype)
         if self.x.shape != value.shape:
             raise ValueError('The shape of two tensors should be equal, '
                              'got %s and %s' % (str(self.x.shape), str(value.shape)))
@@ -54,7 +73,11 @@ class OpVariable(Operation):
     def _forward(self, feed_dict: Mapping[Union[str, OpPlaceholder], np.ndarray]) -> np.ndarray:
         """Returns the contained weights."""
         if self.x is None:
-            self.x = self.initializer(self.shape)
+            with _INIT_LOCK:
+                if self.x is None:
+                    self.x = np.asarray(self.initializer(self.shape), dtype=self.dtype)
+        if self.compute_dtype != self.dtype and isinstance(self.x, np.ndarray):
+            return self.x.astype(self.compute_dtype)
         return self.x
 
     def _backward(self, gradient: np.ndarray) -> None:
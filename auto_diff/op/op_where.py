@@ -8,6 +8,12 @@ from .op_constant import OpConstant
 class OpWhere(Operation):
     """Conditional selection."""
 
+    __slots__ = ('output_condition',)
+
+    _run_slots = {
+        'output_condition': None,
+    }
+
     def __init__(self, condition: Operation, x: Optional[Operation] = None, y: Optional[Operation] = None, **kwargs):
         if x is None:
             x = OpConstant(1.0)
@@ -17,7 +23,6 @@ class OpWhere(Operation):
         self.params = {
             'condition': condition,
         }
-        self.output_condition = None
         self._broadcast_shape(condition, x, y)
         super(OpWhere, self).__init__(**kwargs)
 
@@ -27,6 +32,8 @@ class OpWhere(Operation):
 
     def _backward(self, gradient: np.ndarray) -> None:
         self.gradients = [
-            self._broadcast_backward(np.where(self.output_condition, gradient, 0.0), np.shape(self.values[0])),
-            self._broadcast_backward(np.where(self.output_condition, 0.0, gradient), np.shape(self.values[1])),
+            self._broadcast_backward(np.where(self.output_condition, gradient, 0.0), np.shape(self.values[0]))
+            if self._requires_grad(0) else None,
+            self._broadcast_backward(np.where(self.output_condition, 0.0, gradient), np.shape(self.values[1]))
+            if self._requires_grad(1) else None,
         ]
@@ -7,6 +7,15 @@ from .op_placeholder import OpPlaceholder
 class OpWhileLoop(Operation):
     """While loop."""
 
+    __slots__ = ('loop_states',)
+
+    _run_slots = {
+        'loop_states': (),
+    }
+
+    dynamic = True
+    backward_uses_values = False
+
     def __init__(self,
                  cond: Callable,
                  body: callable,
@@ -27,11 +36,13 @@ class OpWhileLoop(Operation):
         outputs = []
         cond, body, loop_vars = self.params['cond'], self.params['body'], self.params['loop_vars']
         output_index = self.params['output_index']
-        self.inputs = []
+        inputs, self.loop_states = [], []
         while cond(loop_vars).forward(feed_dict):
             loop_vars = body(loop_vars)
-            self.inputs.append(loop_vars[output_index])
-            outputs.append(self.inputs[-1].forward(feed_dict))
+            self.loop_states.append(loop_vars)
+            inputs.append(loop_vars[output_index])
+            outputs.append(inputs[-1].forward(feed_dict))
+        self.inputs = inputs
         return np.stack(outputs)
 
     def _backward(self, gradient: np.ndarray) -> None:
@@ -6,6 +6,8 @@ from .operation import Operation
 class OpZerosLike(Operation):
     """Constant tensor filled with zeros."""
 
+    __slots__ = ()
+
     def __init__(self, x: Operation, **kwargs):
         self.inputs = [x]
         self.shape = x.shape
@@ -1,58 +1,198 @@
-from typing import Union, Mapping, Optional, Sequence
+from typing import Union, Mapping, Optional, Sequence, List, Tuple
+from functools import lru_cache
 import numpy as np
+from .dtype import floatx
+from .context import register_run_states
+
+
+@lru_cache(maxsize=1024)
+def _reduction_axes(gradient_shape: Tuple[int, ...], target_shape: Tuple[int, ...]):
+    """The axes to be summed and the leading axes to be squeezed when reducing a broadcasted gradient."""
+    expand_dim = len(gradient_shape) - len(target_shape)
+    axis = list(range(expand_dim))
+    for i, dim in enumerate(target_shape):
+        if target_shape[i] == 1 and (gradient_shape[i + expand_dim] is None or gradient_shape[i + expand_dim] > 1):
+            axis.append(expand_dim + i)
+    if len(axis) == 1:
+        axis = axis[0]
+    else:
+        axis = tuple(axis)
+    return axis, tuple(range(expand_dim))
 
 
 class Operation(object):
-    """Abstract operation for building computing graph."""
+    """Abstract operation for building computing graph.
+
+    The operations use ``__slots__``, so the subclasses should declare the names of their own attributes in
+    ``__slots__`` as well to keep the nodes compact.
+    """
+
+    __slots__ = ('_name', '_cached_name', '_inputs', 'shape', 'dtype', 'params', 'values', 'output', 'gradients',
+                 'grad_mask', '_op_index', '_last_step', '_last_forward', '_enable_cache', '_plan', '_dynamic_inputs')
+
+    #: The slots that hold the results of runs and their initial values, they are stored in the active execution
+    #: context if there is one (see :class:`ExecutionContext`). The subclasses could declare their own ones.
+    _run_slots = {
+        'values': (),
+        'output': None,
+        'gradients': None,
+        'grad_mask': None,
+        '_last_step': -1,
+        '_last_forward': None,
+        '_dynamic_inputs': (),
+    }
 
     #: The counter for giving each operation a unique index.
     __op_counter = [0]
+    #: Increased when the inputs or the name of an existing operation are changed, which invalidates cached names.
+    __graph_version = [0]
+    #: The function names derived from the class names.
+    __func_names = {}
+    #: The attributes that are only valid within a step or a process, they are not serialized.
+    __transient = frozenset(['_op_index', '_cached_name', '_plan'])
+
+    def __init_subclass__(cls, **kwargs):
+        super(Operation, cls).__init_subclass__(**kwargs)
+        if '_run_slots' in cls.__dict__:
+            cls._run_members = cls._run_members + register_run_states(cls, cls._run_slots)
 
     #: The key for extracting step information from session.
     KEY_STEP = '__step__'
     #: The key that indicates whether it is training.
     KEY_TRAINING = '__training__'
 
+    #: Whether the inputs are rebuilt in every forward pass (e.g. :class:`OpWhileLoop`).
+    dynamic = False
+    #: Whether the input values and the output are needed by the backward pass.
+    backward_uses_values = True
+    #: Whether the output could be recomputed from the same inputs.
+    deterministic = True
+
+    def __new__(cls, *args, **kwargs):
+        """The unique index is assigned first, so that the operation could be hashed during initialization."""
+        op = super(Operation, cls).__new__(cls)
+        op._assign_index()
+        return op
+
     def __init__(self, **kwargs):
-        if not hasattr(self, 'name'):
-            self._name = None
-            if 'name' in kwargs:
-                self._name = kwargs['name']
+        self._name: Optional[str] = kwargs.get('name', None)
+        self._cached_name = None
         if not hasattr(self, 'shape'):
             self.shape: Sequence[Optional[int]] = None
             raise NotImplementedError('Shape not defined')
+        #: The float type of the generated values, see :func:`set_floatx`.
+        self.dtype: np.dtype = np.dtype(kwargs['dtype']) if kwargs.get('dtype') is not None else floatx()
         if not hasattr(self, 'inputs'):
             self.inputs: Sequence['Operation'] = []
         if not hasattr(self, 'params'):
             self.params: dict = {}
-        self.values: Sequence[np.ndarray] = []
-        self.output: Optional[np.ndarray] = None
-        self.gradients: Optional[Sequence[np.ndarray]] = None
+        self._reset_run_slots()
+        self._enable_cache = True
+        self._plan = None
+
+    def _reset_run_slots(self) -> None:
+        """Set the initial values of the run slots in the operation, the active contexts are not affected."""
+        for member, default in self._run_members:
+            member.__set__(self, default)
+
+    def _assign_index(self) -> None:
         self._op_index = self.__op_counter[0]
         self.__op_counter[0] += 1
-        self._last_step = -1
-        self._last_forward = None
-        self._enable_cache = True
+
+    def __getstate__(self) -> dict:
+        """The attributes except the results of runs, the inputs of dynamic operations are rebuilt."""
+        state, mro = {}, type(self).__mro__
+        transient = self.__transient.union(*[cls.__dict__.get('_run_slots', ()) for cls in mro])
+        for cls in mro:
+            for name in getattr(cls, '__slots__', ()):
+                if name not in transient and hasattr(self, name):
+                    state[name] = getattr(self, name)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        for name, value in state.items():
+            setattr(self, name, value)
+        self._reset_run_slots()
+        self._cached_name = None
+        self._plan = None
+
+    @property
+    def inputs(self) -> Sequence['Operation']:
+        if self.dynamic:
+            return self._dynamic_inputs
+        return self._inputs
+
+    @inputs.setter
+    def inputs(self, inputs: Sequence['Operation']):
+        if self.dynamic:
+            self._dynamic_inputs = inputs
+            return
+        if hasattr(self, '_inputs'):
+            self.__graph_version[0] += 1
+        self._inputs = inputs
 
     @property
     def name(self) -> str:
+        """The given name, or a name built from the names of the inputs and the parameters.
+
+        The built name is cached until the inputs or the name of any operation is changed. The subgraph is traversed
+        without recursions, and only the name of this operation is kept.
+        """
         if self._name is not None:
             return self._name
-        class_name = self.__class__.__name__[2:]
-        func_name = ''
-        for c in class_name:
-            if c.isupper():
-                if func_name:
-                    func_name += '_'
-                c = c.lower()
-            func_name += c
-        args = [str(inp) for inp in self.inputs] +\
-               ['%s=%s' % (str(key), str(value)) for key, value in self.params.items() if value is not None]
-        return func_name + '(%s)' % ', '.join(args)
+        version = self.__graph_version[0]
+        if self._cached_name is not None and self._cached_name[0] == version:
+            return self._cached_name[1]
+        names, visited = {}, {self}
+        stack = [(self, iter(self._name_dependencies()))]
+        while stack:
+            op, dependencies = stack[-1]
+            for dependency in dependencies:
+                if dependency not in visited:
+                    visited.add(dependency)
+                    cached = dependency._cached_name
+                    if dependency._name is not None or (cached is not None and cached[0] == version):
+                        names[dependency] = dependency.name
+                        continue
+                    stack.append((dependency, iter(dependency._name_dependencies())))
+                    break
+            else:
+                stack.pop()
+                names[op] = op._build_name(names)
+        self._cached_name = (version, names[self])
+        return names[self]
 
     @name.setter
     def name(self, new_name: str):
         self._name = new_name
+        self.__graph_version[0] += 1
+
+    def _name_inputs(self) -> Sequence['Operation']:
+        """The inputs shown in the built name."""
+        return self.inputs
+
+    def _name_dependencies(self) -> List['Operation']:
+        return list(self._name_inputs()) + [value for value in self.params.values() if isinstance(value, Operation)]
+
+    def _build_name(self, names: Mapping['Operation', str]) -> str:
+        """Build the name with the names of the inputs and the operations in the parameters.
+
+        :param names: The names of the operations returned by :meth:`_name_dependencies`.
+        """
+        func_name = self.__func_names.get(self.__class__)
+        if func_name is None:
+            func_name = ''
+            for c in self.__class__.__name__[2:]:
+                if c.isupper():
+                    if func_name:
+                        func_name += '_'
+                    c = c.lower()
+                func_name += c
+            self.__func_names[self.__class__] = func_name
+        args = [names[inp] for inp in self._name_inputs()] +\
+               ['%s=%s' % (str(key), names[value] if isinstance(value, Operation) else str(value))
+                for key, value in self.params.items() if value is not None]
+        return func_name + '(%s)' % ', '.join(args)
 
     @property
     def dim(self) -> int:
@@ -61,6 +201,27 @@ class Operation(object):
     def isscalar(self) -> bool:
         return self.shape == ()
 
+    @property
+    def dependencies(self) -> List['Operation']:
+        """The operations that should be evaluated before this operation.
+
+        Includes the inputs and the operations referred by parameters (e.g. the indices of :class:`OpGetitem`).
+        The inputs of a dynamic operation are excluded since they are rebuilt during its forward pass.
+        """
+        dependencies = [] if self.dynamic else list(self.inputs)
+
+        def _collect(value):
+            if isinstance(value, Operation):
+                dependencies.append(value)
+            elif isinstance(value, (list, tuple)):
+                for v in value:
+                    _collect(v)
+            elif isinstance(value, slice):
+                _collect([value.start, value.stop, value.step])
+
+        _collect(list(self.params.values()))
+        return dependencies
+
     def forward(self, feed_dict: Mapping[Union[str, 'Operation'], np.ndarray] = None) -> np.ndarray:
         """Do the calculations to get the output of the operations.
 
@@ -71,7 +232,8 @@ class Operation(object):
             feed_dict = {}
         if self._enable_cache and self.KEY_STEP in feed_dict and feed_dict[self.KEY_STEP] == self._last_step:
             return self._last_forward
-        self.values = [inp.forward(feed_dict) for inp in self.inputs]
+        if not self.dynamic:
+            self.values = [inp.forward(feed_dict) for inp in self.inputs]
         self.output = self._forward(feed_dict)
         if self._enable_cache and self.KEY_STEP in feed_dict:
             self._last_step = feed_dict[self.KEY_STEP]
@@ -82,47 +244,30 @@ class Operation(object):
         """Forward operation to be implemented."""
         raise NotImplementedError('Forward operation not implemented')
 
-    def backward(self) -> None:
-        """Update gradients recursively."""
-        inputs, degrees, operations = {self: []}, {self: 0}, [self]
-        front = 0
-        while front < len(operations):
-            current = operations[front]
-            for grad_index, op in enumerate(current.inputs):
-                if op in degrees:
-                    inputs[op].append((current, grad_index))
-                    degrees[op] += 1
-                else:
-                    inputs[op] = [(current, grad_index)]
-                    degrees[op] = 1
-                    operations.append(op)
-            front += 1
-        inv_degrees = {}
-        for op, degree in degrees.items():
-            if degree not in inv_degrees:
-                while len(inv_degrees) <= degree:
-                    inv_degrees[len(inv_degrees)] = set()
-            inv_degrees[degree].add(op)
-        while len(inv_degrees[0]):
-            for op in inv_degrees[0]:
-                inv_degrees[0].remove(op)
-                if op == self:
-                    self._backward(np.ones_like(self.output))
-                else:
-                    gradient = 0.0
-                    for input_op, grad_index in inputs[op]:
-                        gradient += input_op.gradients[grad_index]
-                    op._backward(gradient)
-                for input_op in op.inputs:
-                    inv_degrees[degrees[input_op]].remove(input_op)
-                    degrees[input_op] -= 1
-                    inv_degrees[degrees[input_op]].add(input_op)
-                break
+    def backward(self,
+                 wrt: Optional[Sequence['Operation']] = None,
+                 gradient: Optional[Union[float, np.ndarray]] = None) -> List[Optional[np.ndarray]]:
+        """Update gradients of the operations on the paths from this operation to the targets.
+
+        The reverse topological order is computed once and cached in the execution plan of this operation.
+
+        :param wrt: The targets, all the variables that could be reached are used if it is None.
+        :param gradient: The gradient of this operation, ones are used if it is None.
+        :return: The gradients of the targets.
+        """
+        if self._plan is None:
+            from ..sess.plan import ExecutionPlan
+            self._plan = ExecutionPlan([self])
+        return self._plan.backward(self, wrt, gradient)
 
     def _backward(self, gradient: np.ndarray) -> None:
         """Backward operation to be implemented."""
         raise NotImplementedError('Backward operation not implemented')
 
+    def _requires_grad(self, index: int) -> bool:
+        """Whether the gradient of the input with the index is needed."""
+        return self.grad_mask is None or self.grad_mask[index]
+
     def _broadcast_shape(self, *args: Union[int, float, 'Operation']):
         self.shape = ()
         for x in args:
@@ -144,24 +289,18 @@ class Operation(object):
 
     @staticmethod
     def _broadcast_backward(gradient: np.ndarray, target_shape):
+        """Sum the gradient to the target shape, the axes are computed once for each pair of concrete shapes."""
         gradient_shape = np.shape(gradient)
+        target_shape = tuple(target_shape)
         if target_shape == gradient_shape:
             return gradient
         if target_shape == ():
             gradient = gradient.sum()
             return gradient
-        expand_dim = len(gradient_shape) - len(target_shape)
-        axis = list(range(expand_dim))
-        for i, dim in enumerate(target_shape):
-            if target_shape[i] == 1 and (gradient_shape[i + expand_dim] is None or gradient_shape[i + expand_dim] > 1):
-                axis.append(expand_dim + i)
-        if len(axis) == 1:
-            axis = axis[0]
-        else:
-            axis = tuple(axis)
+        axis, squeeze = _reduction_axes(gradient_shape, target_shape)
         gradient = gradient.sum(axis=axis, keepdims=True)
-        if expand_dim:
-            gradient = gradient.squeeze(axis=tuple(list(range(expand_dim))))
+        if squeeze:
+            gradient = gradient.squeeze(axis=squeeze)
         return gradient
 
     def transpose(self, axes: Optional[Sequence[int]] = None, **kwargs) -> 'Operation':
@@ -330,3 +469,6 @@ class Operation(object):
 
     def __unicode__(self):
         return self.__str__()
+
+
+Operation._run_members = register_run_states(Operation, Operation._run_slots)
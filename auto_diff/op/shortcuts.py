@@ -7,9 +7,9 @@ __all__ = [
     'ones', 'zeros', 'ones_like', 'zeros_like', 'random', 'arange',
     'transpose', 'reshape', 'flatten', 'expand_dims', 'squeeze', 'shape', 'pad',
     'sum', 'prod', 'mean', 'max', 'min', 'argmax',
-    'square', 'sqrt', 'exp', 'log', 'tanh',
+    'square', 'sqrt', 'exp', 'log', 'tanh', 'sigmoid',
     'add', 'subtract', 'multiply', 'divide', 'dot', 'negative', 'equal', 'less', 'greater', 'where', 'power',
-    'maximum', 'minimum',
+    'maximum', 'minimum', 'conv2d', 'max_pool2d', 'avg_pool2d',
     'map_fn', 'while_loop', 'in_train_phase',
 ]
 
@@ -190,6 +190,12 @@ def tanh(x: Operation, **kwargs) -> Operation:
     return OpTanh(x, **kwargs)
 
 
+def sigmoid(x: Operation, **kwargs) -> Operation:
+    """See :class:`OpSigmoid`."""
+    from .op_sigmoid import OpSigmoid
+    return OpSigmoid(x, **kwargs)
+
+
 def add(x: Operation, y: Operation, **kwargs) -> Operation:
     """See :class:`OpAdd`."""
     from .op_add import OpAdd
@@ -268,6 +274,38 @@ def minimum(x: Operation, y: Operation, **kwargs) -> Operation:
     return OpMinimum(x, y, **kwargs)
 
 
+def conv2d(x: Operation,
+           kernel: Operation,
+           kernel_size: Union[int, Sequence[int]],
+           strides: Union[int, Sequence[int]] = 1,
+           dilation_rate: Union[int, Sequence[int]] = 1,
+           pad_width: Union[int, Sequence[int]] = 0,
+           **kwargs) -> Operation:
+    """See :class:`OpConv2D`"""
+    from .op_conv2d import OpConv2D
+    return OpConv2D(x, kernel, kernel_size, strides, dilation_rate, pad_width, **kwargs)
+
+
+def max_pool2d(x: Operation,
+               pool_size: Union[int, Sequence[int]],
+               strides: Optional[Union[int, Sequence[int]]] = None,
+               pad_width: Union[int, Sequence[int]] = 0,
+               **kwargs) -> Operation:
+    """See :class:`OpMaxPool2D`"""
+    from .op_pool2d import OpMaxPool2D
+    return OpMaxPool2D(x, pool_size, strides, pad_width, **kwargs)
+
+
+def avg_pool2d(x: Operation,
+               pool_size: Union[int, Sequence[int]],
+               strides: Optional[Union[int, Sequence[int]]] = None,
+               pad_width: Union[int, Sequence[int]] = 0,
+               **kwargs) -> Operation:
+    """See :class:`OpAvgPool2D`"""
+    from .op_pool2d import OpAvgPool2D
+    return OpAvgPool2D(x, pool_size, strides, pad_width, **kwargs)
+
+
 def map_fn(fn: Callable, elems: Union[Operation, Sequence[Operation]], **kwargs) -> Operation:
     """See :class:`OpMapFn`"""
     from .op_map_fn import OpMapFn
@@ -1,3 +1,4 @@
 from .optim import Optimizer
 from .sgd import SGD
 from .adam import Adam
+from .loss_scale import LossScaleOptimizer
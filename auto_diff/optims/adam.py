@@ -23,12 +23,12 @@ class Adam(Optimizer):
         lr = self.lr
         if self.decay > 0.0:
             lr /= (1.0 + self.decay * self.step_num)
-        lr_t = lr * np.sqrt(1.0 - self.beta_2 ** self.step_num) / (1.0 - self.beta_1 ** self.step_num)
+        lr_t = float(lr * np.sqrt(1.0 - self.beta_2 ** self.step_num) / (1.0 - self.beta_1 ** self.step_num))
         if self.ms is None:
             self.ms = [0.0] * len(weights)
             self.vs = [0.0] * len(weights)
             self.vhs = [0.0] * len(weights)
-        for index, weight in enumerate(weights):
+        for index, weight in self._enumerate(weights):
             self.ms[index] = (self.beta_1 * self.ms[index]) + (1.0 - self.beta_1) * weight.gradient
             self.vs[index] = (self.beta_2 * self.vs[index]) + (1.0 - self.beta_2) * np.square(weight.gradient)
             if self.amsgrad:
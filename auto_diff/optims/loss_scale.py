@@ -0,0 +1,66 @@
+from typing import List
+import numpy as np
+import auto_diff as ad
+from .optim import Optimizer
+
+
+class LossScaleOptimizer(Optimizer):
+    """Wraps an optimizer for mixed precision training.
+
+    The loss is multiplied by :attr:`loss_scale` before the backward pass so that the small gradients do not vanish
+    in low precision. The gradients are then casted to the float types of the weights and divided by the scale. If any
+    of the gradients is infinite or NaN, the step is skipped and the scale is halved; the scale is doubled after
+    `growth_interval` steps without overflow, unless it would exceed `max_scale`.
+    """
+
+    def __init__(self,
+                 optimizer: Optimizer,
+                 initial_scale=2.0 ** 15,
+                 growth_interval=2000,
+                 dynamic=True,
+                 max_scale=None,
+                 **kwargs):
+        """
+        :param optimizer: The optimizer that updates the weights with the unscaled gradients.
+        :param initial_scale: The initial loss scale.
+        :param growth_interval: The number of steps without overflow before the scale is doubled.
+        :param dynamic: Whether to adjust the scale, the scale is fixed if it is False.
+        :param max_scale: The maximum scale reached by doubling. The gradient of the loss is created in the compute
+                          float type, so the scale should be representable in it, see :meth:`max_scale_of`. It is set
+                          by :meth:`Model.build` if it is None.
+        """
+        super(LossScaleOptimizer, self).__init__(**kwargs)
+        self.optimizer = optimizer
+        self.loss_scale = float(initial_scale)
+        self.growth_interval = growth_interval
+        self.dynamic = dynamic
+        self.max_scale = max_scale
+        #: The number of steps since the last overflow.
+        self.good_steps = 0
+        #: The number of steps skipped because of overflow.
+        self.skipped_steps = 0
+
+    def update(self, weights: List[ad.OpVariable], session: ad.Session):
+        gradients = []
+        for weight in weights:
+            gradient = np.asarray(weight.gradient, dtype=weight.dtype) / self.loss_scale
+            if not np.all(np.isfinite(gradient)):
+                self.skipped_steps += 1
+                self.good_steps = 0
+                if self.dynamic:
+                    self.loss_scale = max(1.0, self.loss_scale / 2.0)
+                return
+            gradients.append(gradient)
+        for weight, gradient in zip(weights, gradients):
+            weight.gradient = gradient
+        self.optimizer.update(weights, session)
+        self.good_steps += 1
+        if self.dynamic and self.good_steps >= self.growth_interval:
+            if self.max_scale is None or self.loss_scale * 2.0 <= self.max_scale:
+                self.loss_scale *= 2.0
+            self.good_steps = 0
+
+    @staticmethod
+    def max_scale_of(dtype) -> float:
+        """The largest power of two that could be represented by the float type, e.g. `2 ** 15` for float16."""
+        return 2.0 ** np.floor(np.log2(float(np.finfo(dtype).max)))
@@ -1,11 +1,24 @@
-from typing import List
+from typing import List, Iterator, Tuple
 import auto_diff as ad
 
 
 class Optimizer(object):
 
+    #: The loss is multiplied by the scale before the backward pass.
+    loss_scale = 1.0
+
     def __init__(self, **kwargs):
         pass
 
     def update(self, weights: List[ad.OpVariable], session: ad.Session):
         raise NotImplementedError('Optimizer not implemented.')
+
+    @staticmethod
+    def _enumerate(weights: List[ad.OpVariable]) -> Iterator[Tuple[int, ad.OpVariable]]:
+        """Enumerate the weights, the update of each weight is a span in the active tracers (see :class:`ad.Tracer`)."""
+        if not ad.sess.trace.tracing_enabled():
+            yield from enumerate(weights)
+            return
+        for index, weight in enumerate(weights):
+            with ad.trace_span(ad.Profiler.op_label(weight), 'optimizer'):
+                yield index, weight
@@ -30,7 +30,7 @@ class SGD(Optimizer):
             lr /= (1.0 + self.decay * self.step_num)
         if self.moments is None:
             self.moments = [0.0] * len(weights)
-        for index, weight in enumerate(weights):
+        for index, weight in self._enumerate(weights):
             self.moments[index] = self.momentum * self.moments[index] - lr * weight.gradient
             if self.nesterov:
                 weight.update_add(self.momentum * self.moments[index] - lr * weight.gradient)
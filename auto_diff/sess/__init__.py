@@ -1 +1,4 @@
+from .profiler import *
+from .trace import *
 from .session import *
+from .serialize import *
@@ -0,0 +1,60 @@
+from typing import Sequence, Union
+import numpy as np
+from auto_diff.op.operation import Operation
+
+__all__ = ['GradientAccumulator']
+
+
+class GradientAccumulator(object):
+    """Sums the gradients of operations that have multiple consumers.
+
+    Each operation owns one buffer that is reused across steps, the gradients are added into the buffer in place.
+    The summed gradient is only valid until the next backward pass.
+    """
+
+    def __init__(self):
+        self._buffers = {}
+        #: The number of bytes that would have been allocated by the out-of-place summations.
+        self.saved_bytes = 0
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_buffers'] = {}
+        return state
+
+    def accumulate(self, op: Operation, gradients: Sequence[Union[float, np.ndarray]]) -> Union[float, np.ndarray]:
+        """Sum the gradients from all the consumers of the operation.
+
+        :param op: The operation that receives the gradients.
+        :param gradients: The gradients from the consumers.
+        :return: The summed gradient.
+        """
+        if len(gradients) == 1:
+            return gradients[0]
+        shape = np.shape(gradients[0])
+        if shape == () or any(np.shape(gradient) != shape for gradient in gradients[1:]):
+            gradient = 0.0
+            for g in gradients:
+                gradient = gradient + g
+            return gradient
+        dtype = np.result_type(*gradients)
+        buffer = self._buffers.get(op)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = self._buffers[op] = np.empty(shape, dtype=dtype)
+            self.saved_bytes -= buffer.nbytes
+        np.add(gradients[0], gradients[1], out=buffer)
+        for gradient in gradients[2:]:
+            np.add(buffer, gradient, out=buffer)
+        self.saved_bytes += (len(gradients) - 1) * buffer.nbytes
+        return buffer
+
+    def shares_buffer(self, gradient: Union[float, np.ndarray]) -> bool:
+        """Whether the gradient is, or is a view of, one of the buffers, e.g. a gradient passed through by an addition.
+        """
+        if not isinstance(gradient, np.ndarray):
+            return False
+        return any(np.may_share_memory(gradient, buffer) for buffer in self._buffers.values())
+
+    def clear(self) -> None:
+        """Release all the buffers."""
+        self._buffers = {}
@@ -0,0 +1,263 @@
+from typing import Tuple, List, Sequence, Optional, Iterable, Mapping
+import numpy as np
+from auto_diff.op.operation import Operation
+from auto_diff.op.op_constant import OpConstant
+from auto_diff.op.op_placeholder import OpPlaceholder
+from auto_diff.op.op_variable import OpVariable
+
+__all__ = ['MemoryPlanner']
+
+
+class MemoryPlanner(object):
+    """Releases the intermediate results of an execution plan once they are no longer needed.
+
+    The last forward use of each output is computed from the plan. In training mode, an output is kept until the
+    backward pass if the operation itself or any of its consumers reads the values in backward
+    (see :attr:`Operation.backward_uses_values`); the values, outputs and gradients are then released during the
+    backward pass as soon as all the consumers have been processed.
+
+    The operations referred by the bodies of dynamic operations are unknown before the first run, they are kept until
+    the last dynamic operation in the first run, and the references found after the run are used in later runs.
+
+    With gradient checkpointing, only the outputs of the checkpoints are kept for the backward pass. The other outputs
+    are released after their last forward use (the bodies of dynamic operations are released after the dynamic
+    operations are evaluated) and are recomputed from the nearest available outputs when the backward pass needs them.
+    The outputs of dynamic operations, non-deterministic operations, the inputs of dynamic operations and the loop
+    variables of :class:`OpWhileLoop` are always kept.
+    """
+
+    def __init__(self,
+                 plan: 'ExecutionPlan',
+                 training: bool = True,
+                 checkpoints: Optional[Iterable[Operation]] = None,
+                 checkpoint_every: int = 0):
+        """
+        :param plan: The compiled plan.
+        :param training: Whether backward passes would be performed after the forward passes.
+        :param checkpoints: The operations whose outputs are kept for the backward pass.
+        :param checkpoint_every: Keep one output in every `checkpoint_every` operations if it is positive.
+        """
+        self.plan = plan
+        self.training = training
+        self.checkpoints = set(checkpoints) if checkpoints is not None else set()
+        self.checkpoint_every = checkpoint_every
+        self.checkpointing = training and (checkpoints is not None or checkpoint_every > 0)
+        self._index = {op: i for i, op in enumerate(plan.operations)}
+        self._consumers = {op: [] for op in plan.operations}
+        for op in plan.operations:
+            if op not in plan.feeds:
+                for dependency in op.dependencies:
+                    self._consumers[dependency].append(op)
+        self._persistent = set(plan.feeds) | set(plan.fetches)
+        self._persistent |= {op for op in plan.operations if self._is_persistent(op)}
+        self._dynamic = [op for op in plan.operations if op.dynamic]
+        self._references = None
+        self._releases = None
+        self._schedule()
+
+        self._live, self._held, self._external = {}, {}, set()
+        self._live_bytes = 0
+        self._naive_bytes = 0
+        self._remaining = {}
+        #: The peak bytes of the intermediate results held in the last step with the planner.
+        self.planned_peak_bytes = 0
+        #: The peak bytes of the intermediate results held in the last step if nothing is released.
+        self.naive_peak_bytes = 0
+
+    def __getstate__(self) -> dict:
+        """The results held in the last step are not kept."""
+        state = self.__dict__.copy()
+        state.update(_live={}, _held={}, _external=set(), _remaining={}, _live_bytes=0, _naive_bytes=0)
+        return state
+
+    @staticmethod
+    def _is_persistent(op: Operation) -> bool:
+        """The values of placeholders, constants and variables are not owned by the operations."""
+        return isinstance(op, (OpPlaceholder, OpConstant, OpVariable))
+
+    @staticmethod
+    def _base(value) -> Optional[np.ndarray]:
+        """Views share the memory with their bases, an array is freed only after all its views are freed."""
+        if not isinstance(value, np.ndarray):
+            return None
+        while isinstance(value.base, np.ndarray):
+            value = value.base
+        return value
+
+    def _hold(self, holder, values: Sequence) -> None:
+        """Count the memory referenced by the holder."""
+        keys = []
+        for value in values:
+            base = self._base(value)
+            if base is None or id(base) in self._external:
+                continue
+            key = id(base)
+            if key in self._live:
+                self._live[key][1] += 1
+            else:
+                self._live[key] = [base.nbytes, 1]
+                self._live_bytes += base.nbytes
+                self._naive_bytes += base.nbytes
+            keys.append(key)
+        if keys:
+            self._held.setdefault(holder, []).extend(keys)
+        self.planned_peak_bytes = max(self.planned_peak_bytes, self._live_bytes)
+        self.naive_peak_bytes = max(self.naive_peak_bytes, self._naive_bytes)
+
+    def _drop(self, holder) -> None:
+        """Stop counting the memory referenced by the holder."""
+        for key in self._held.pop(holder, []):
+            self._live[key][1] -= 1
+            if self._live[key][1] == 0:
+                self._live_bytes -= self._live.pop(key)[0]
+
+    def _schedule(self) -> None:
+        """Compute the index of the step after which each operation could be released."""
+        operations = self.plan.operations
+        self._releases = [[] for _ in operations]
+        for op in operations:
+            if op in self._persistent:
+                continue
+            consumers = list(self._consumers[op])
+            for dynamic in self._dynamic:
+                if self._references is None:
+                    if self._index[dynamic] > self._index[op]:
+                        consumers.append(dynamic)
+                elif op in self._references[dynamic]:
+                    consumers.append(dynamic)
+            if self.checkpointing:
+                if self._is_checkpoint(op, self._index[op]):
+                    continue
+            elif self.training:
+                if op.backward_uses_values or any(consumer.backward_uses_values or consumer.dynamic
+                                                  for consumer in consumers):
+                    continue
+            last_use = max([self._index[consumer] for consumer in consumers], default=self._index[op])
+            self._releases[last_use].append(op)
+
+    def _is_checkpoint(self, op: Operation, position: int) -> bool:
+        if op.dynamic or not op.deterministic or op in self.checkpoints:
+            return True
+        return self.checkpoint_every > 0 and position % self.checkpoint_every == self.checkpoint_every - 1
+
+    def _release_body(self, dynamic: Operation) -> None:
+        """Release the values in the body of a dynamic operation except the checkpoints."""
+        kept = set(dynamic.inputs)
+        for loop_vars in getattr(dynamic, 'loop_states', []):
+            kept.update(loop_vars)
+        body, visited = [], set()
+        stack = [(op, iter(op.inputs)) for op in dynamic.inputs]
+        visited.update(dynamic.inputs)
+        while stack:
+            op, inputs = stack[-1]
+            for inp in inputs:
+                if inp not in visited and inp not in self._index and not self._is_persistent(inp):
+                    visited.add(inp)
+                    stack.append((inp, iter(inp.inputs)))
+                    break
+            else:
+                stack.pop()
+                body.append(op)
+        for position, op in enumerate(body):
+            self._hold(op, [op.output])
+            op.values = ()
+            if op not in kept and not self._is_checkpoint(op, position):
+                self._release(op)
+
+    def rematerialize(self, op: Operation, feed_dict: Mapping) -> None:
+        """Recompute the released values that are needed by the backward pass of the operation."""
+        if not op.inputs or not op.backward_uses_values:
+            return
+        visited, order = {op}, []
+        stack = [(op, iter(op.inputs))]
+        while stack:
+            current, inputs = stack[-1]
+            for inp in inputs:
+                if inp not in visited and inp.output is None:
+                    visited.add(inp)
+                    stack.append((inp, iter(inp.inputs)))
+                    break
+            else:
+                stack.pop()
+                order.append(current)
+        for current in order:
+            current.values = [inp.output for inp in current.inputs]
+            if current.output is None:
+                current.output = current._forward(feed_dict)
+                self._hold(current, [current.output])
+
+    def _find_references(self) -> None:
+        """Find the operations in the plan that are used by the bodies of dynamic operations."""
+        self._references = {}
+        for dynamic in self._dynamic:
+            references, visited = set(), set()
+            stack = list(dynamic.inputs) + dynamic.dependencies
+            while stack:
+                op = stack.pop()
+                if op in visited:
+                    continue
+                visited.add(op)
+                if op in self._index:
+                    references.add(op)
+                    continue
+                stack.extend(op.inputs)
+                stack.extend(op.dependencies)
+            self._references[dynamic] = references
+
+    def _release(self, op: Operation) -> None:
+        self._drop(op)
+        op.values = ()
+        op.output = None
+        op._last_step = -1
+        op._last_forward = None
+
+    def before_forward(self) -> None:
+        self._live, self._held, self._external = {}, {}, set()
+        self._live_bytes = self._naive_bytes = 0
+        self.planned_peak_bytes = self.naive_peak_bytes = 0
+
+    def after_forward(self, index: int, op: Operation) -> None:
+        """Called after the operation at the index of the plan is evaluated."""
+        if op in self._persistent and op not in self.plan.fetches:
+            base = self._base(op.output)
+            if base is not None:
+                self._external.add(id(base))
+        else:
+            self._hold(op, [op.output])
+        if not self.training or not op.backward_uses_values or self.checkpointing:
+            op.values = ()
+        if self.checkpointing and op.dynamic:
+            self._release_body(op)
+        for released in self._releases[index]:
+            self._release(released)
+
+    def after_run(self) -> None:
+        """Learn the references of dynamic operations after the first run."""
+        if self._references is None and self._dynamic:
+            self._find_references()
+            self._schedule()
+
+    def before_backward(self) -> None:
+        if not self.training:
+            raise ValueError('The memory is planned for inference, backward is not available')
+        self._remaining = {}
+
+    def after_backward(self, op: Operation, consumers: List[Tuple[Operation, int]]) -> None:
+        """Called after the gradients of the inputs of the operation are calculated."""
+        if op.gradients is not None and op.inputs:
+            self._hold((op, 'gradients'), op.gradients)
+        if op not in self._persistent and not self._is_persistent(op):
+            self._release(op)
+        for consumer, _ in consumers:
+            if consumer not in self._remaining:
+                grad_mask = consumer.grad_mask
+                self._remaining[consumer] = len(consumer.inputs) if grad_mask is None else sum(grad_mask)
+            remaining = self._remaining[consumer] - 1
+            self._remaining[consumer] = remaining
+            if remaining == 0:
+                self._drop((consumer, 'gradients'))
+                consumer.gradients = None
+
+    def report(self) -> Tuple[int, int]:
+        """The planned and naive peak bytes of the last step."""
+        return self.planned_peak_bytes, self.naive_peak_bytes
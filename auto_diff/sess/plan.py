@@ -0,0 +1,434 @@
+import queue
+from typing import Mapping, Union, Sequence, Iterable, List, Tuple, Optional, Set
+from collections import OrderedDict
+from concurrent.futures import Executor
+import numpy as np
+from auto_diff.op.operation import Operation
+from auto_diff.op.context import current_context, run_in_context
+from auto_diff.op.op_variable import OpVariable
+from auto_diff.op.op_placeholder import OpPlaceholder
+from auto_diff.op.op_constant import OpConstant
+from auto_diff.op.op_shape import OpShape
+from auto_diff.op.op_ones_like import OpOnesLike
+from auto_diff.op.op_zeros_like import OpZerosLike
+from auto_diff.op.op_getitem import OpGetitem
+from auto_diff.op.op_setitem import OpSetitem
+from auto_diff.op.op_in_train_phase import OpInTrainPhase
+from .accumulator import GradientAccumulator
+from .memory import MemoryPlanner
+
+__all__ = ['ExecutionPlan']
+
+
+class ExecutionPlan(object):
+    """A flat and topologically sorted list of operations that computes a fixed set of fetches.
+
+    The graph is traversed once when the plan is compiled, then every run evaluates the operations in order without
+    recursions. The fed operations are regarded as leaves, their dependencies are not evaluated.
+
+    The operations that only depend on the shapes of the fed values (e.g. the shapes of the inputs, the results of
+    slicing the shapes and the zeros like the inputs) are specialized for the concrete shapes: their outputs are
+    computed once for each combination of fed shapes and reused in the following runs.
+
+    With an executor, the operations are scheduled by the numbers of their unfinished dependencies, so that the
+    independent branches could be evaluated by multiple threads (see :meth:`run`).
+    """
+
+    #: The operation is evaluated by the workers.
+    TASK_POOL = 0
+    #: The operation is cheap and is evaluated by the thread that runs the plan.
+    TASK_INLINE = 1
+    #: The operation is evaluated by the thread that runs the plan when no other operation is running.
+    TASK_EXCLUSIVE = 2
+
+    def __init__(self, fetches: Sequence[Operation], feeds: Iterable[Operation] = (), max_specializations: int = 8):
+        """
+        :param fetches: The operations to be evaluated.
+        :param feeds: The operations whose values are given in the feed dictionary.
+        :param max_specializations: The maximum number of fed shapes whose specialized results are kept, the least
+                                    recently used one is evicted.
+        """
+        self.fetches = list(fetches)
+        self.feeds = set(feeds)
+        self.operations = self._topological_sort(self.fetches, self.feeds)
+        # Placeholders read the feed dictionary by themselves to cast the values
+        self._steps = [(op, op in self.feeds and not isinstance(op, OpPlaceholder)) for op in self.operations]
+        self.shape_only = self._find_shape_only(self.operations, self.feeds)
+        self._shape_feeds = self._find_shape_feeds(self.operations, self.feeds, self.shape_only)
+        self.max_specializations = max_specializations
+        #: The outputs of the shape-only operations of the recently fed shapes, from the oldest to the newest.
+        self.specializations = OrderedDict()
+        self._backward_orders = {}
+        self.accumulator = GradientAccumulator()
+        self.memory = None
+        self._feed_dict = {}
+        self._schedule = None
+
+    def __getstate__(self) -> dict:
+        """The specialized results and the last feed dictionary are not kept."""
+        state = self.__dict__.copy()
+        state['specializations'] = OrderedDict()
+        state['_feed_dict'] = {}
+        return state
+
+    def plan_memory(self,
+                    training: bool = True,
+                    checkpoints: Optional[Iterable[Operation]] = None,
+                    checkpoint_every: int = 0) -> MemoryPlanner:
+        """Release the intermediate results as soon as they are no longer needed.
+
+        :param training: Whether backward passes would be performed after the forward passes.
+        :param checkpoints: Enable gradient checkpointing and keep only the outputs of these operations.
+        :param checkpoint_every: Enable gradient checkpointing and keep one output in every `checkpoint_every`
+                                 operations.
+        :return: The memory planner.
+        """
+        self.memory = MemoryPlanner(self, training, checkpoints, checkpoint_every)
+        return self.memory
+
+    @staticmethod
+    def _topological_sort(fetches: Sequence[Operation], feeds: Iterable[Operation]) -> List[Operation]:
+        """Post-order traversal with an explicit stack, so that deep graphs would not exceed the recursion limit."""
+        operations, visited = [], set()
+        for fetch in fetches:
+            if fetch in visited:
+                continue
+            visited.add(fetch)
+            stack = [(fetch, iter([] if fetch in feeds else fetch.dependencies))]
+            while stack:
+                op, dependencies = stack[-1]
+                for dependency in dependencies:
+                    if dependency not in visited:
+                        visited.add(dependency)
+                        stack.append((dependency, iter([] if dependency in feeds else dependency.dependencies)))
+                        break
+                else:
+                    stack.pop()
+                    operations.append(op)
+        return operations
+
+    @staticmethod
+    def _find_shape_only(operations: Sequence[Operation], feeds: Set[Operation]) -> Set[Operation]:
+        """Find the operations whose outputs are determined by the shapes of the fed values.
+
+        The shapes of the results are assumed to be determined by the fed shapes unless there are dynamic operations
+        or slicing with dynamic indices on the path. The inputs of in-place operations are never shared. The
+        operations referred by parameters (e.g. the condition of :class:`OpWhere`) are checked as well as the inputs.
+        """
+        fixed_shape, shape_only = set(), set()
+        mutated = {op.inputs[0] for op in operations if isinstance(op, OpSetitem)}
+        for op in operations:
+            if op in feeds or isinstance(op, (OpPlaceholder, OpVariable, OpConstant)):
+                fixed_shape.add(op)
+                continue
+            if op.dynamic or isinstance(op, OpGetitem) and op._static_item is None:
+                continue
+            dependencies = op.dependencies
+            if all(dependency in fixed_shape for dependency in dependencies):
+                fixed_shape.add(op)
+            if isinstance(op, OpSetitem) or op in mutated:
+                continue
+            if isinstance(op, (OpShape, OpOnesLike, OpZerosLike)):
+                if op.inputs[0] in fixed_shape:
+                    shape_only.add(op)
+            elif op.deterministic and not isinstance(op, OpInTrainPhase) and len(dependencies) > 0 and \
+                    all(isinstance(dependency, OpConstant) or dependency in shape_only
+                        for dependency in dependencies) and \
+                    any(dependency in shape_only for dependency in dependencies):
+                shape_only.add(op)
+        return shape_only
+
+    @staticmethod
+    def _find_shape_feeds(operations: Sequence[Operation],
+                          feeds: Set[Operation],
+                          shape_only: Set[Operation]) -> List[Operation]:
+        """The fed operations and placeholders that the shape-only operations depend on."""
+        visited, stack = set(shape_only), list(shape_only)
+        while stack:
+            op = stack.pop()
+            if op in feeds:
+                continue
+            for dependency in op.dependencies:
+                if dependency not in visited:
+                    visited.add(dependency)
+                    stack.append(dependency)
+        return [op for op in operations if op in visited and (op in feeds or isinstance(op, OpPlaceholder))]
+
+    def _specialize(self, feed_dict: Mapping[Union[str, Operation], np.ndarray]) -> Tuple[tuple, Optional[dict]]:
+        """Get the key of the fed shapes and the specialized outputs, the outputs are None if it is not cached."""
+        key = tuple(np.shape(feed_dict[op]) for op in self._shape_feeds)
+        outputs = self.specializations.get(key)
+        if outputs is not None:
+            try:
+                self.specializations.move_to_end(key)
+            except KeyError:  # Evicted by another thread
+                pass
+        return key, outputs
+
+    def run(self,
+            feed_dict: Mapping[Union[str, Operation], np.ndarray],
+            executor: Optional[Executor] = None) -> List[np.ndarray]:
+        """Evaluate all the operations in the plan.
+
+        If an executor is given, the operations whose dependencies are finished are submitted to the executor, and the
+        current thread evaluates one of them as well. The active :class:`ExecutionContext` of the current thread is
+        used by the workers. Dynamic operations evaluate their bodies recursively, they run when no other operation is
+        running; non-deterministic operations and in-place assignments keep their order in the plan. The operations are
+        evaluated in order without the executor if the memory is planned or the feed dictionary has no step.
+
+        :param feed_dict: Contains the real values of placeholders and the step of the session.
+        :param executor: The executor for evaluating independent operations in parallel, usually a thread pool.
+        :return: The outputs of the fetches.
+        """
+        step = feed_dict.get(Operation.KEY_STEP, None)
+        self._feed_dict = feed_dict
+        memory = self.memory
+        if memory is not None:
+            memory.before_forward()
+        specialized, recording = None, None
+        if self.shape_only:
+            key, specialized = self._specialize(feed_dict)
+            if specialized is None:
+                recording = {}
+        if executor is not None and memory is None and step is not None:
+            self._run_parallel(feed_dict, step, specialized, recording, executor)
+        else:
+            for index, (op, fed) in enumerate(self._steps):
+                self._evaluate(op, fed, feed_dict, step, specialized)
+                if recording is not None and op in self.shape_only:
+                    recording[op] = op.output
+                if memory is not None:
+                    memory.after_forward(index, op)
+        if recording is not None:
+            self.specializations[key] = recording
+            while len(self.specializations) > self.max_specializations:
+                try:
+                    self.specializations.popitem(last=False)
+                except KeyError:  # Evicted by another thread
+                    break
+        if memory is not None:
+            memory.after_run()
+        return [fetch.output for fetch in self.fetches]
+
+    @staticmethod
+    def _evaluate(op: Operation,
+                  fed: bool,
+                  feed_dict: Mapping[Union[str, Operation], np.ndarray],
+                  step: Optional[int],
+                  specialized: Optional[dict]) -> None:
+        """Evaluate one operation whose dependencies have been evaluated."""
+        if not op._enable_cache or step is None or op._last_step != step:
+            if fed:
+                op.output = feed_dict[op]
+            elif specialized is not None and op in specialized:
+                op.values = [inp.output for inp in op.inputs]
+                op.output = specialized[op]
+            else:
+                if not op.dynamic:
+                    op.values = [inp.output for inp in op.inputs]
+                op.output = op._forward(feed_dict)
+            if op._enable_cache and step is not None:
+                op._last_step = step
+                op._last_forward = op.output
+
+    def _parallel_schedule(self) -> Tuple[List[int], List[List[int]], List[int]]:
+        """The numbers of dependencies, the consumers and the kinds of tasks of the operations in the plan.
+
+        Besides the dependencies, a non-deterministic operation waits for the previous non-deterministic operation so
+        that the random numbers are drawn in the same order as the serial plan, and an in-place assignment waits for
+        the other consumers of its target that come before it. Variables that are not initialized yet and dynamic
+        operations are chained with the non-deterministic operations since the initializers and the bodies of dynamic
+        operations (e.g. the lazily created weights of recurrent layers) may draw random numbers as well.
+        """
+        if self._schedule is None:
+            index = {op: i for i, op in enumerate(self.operations)}
+            predecessors = [set() for _ in self.operations]
+            users, kinds = {}, []
+            last_random = None
+            for i, op in enumerate(self.operations):
+                if op in self.feeds or isinstance(op, (OpPlaceholder, OpConstant, OpVariable)):
+                    kinds.append(self.TASK_INLINE)
+                elif op.dynamic:
+                    kinds.append(self.TASK_EXCLUSIVE)
+                else:
+                    kinds.append(self.TASK_POOL)
+                if op in self.feeds:
+                    continue
+                for dependency in op.dependencies:
+                    predecessors[i].add(index[dependency])
+                    users.setdefault(dependency, []).append(i)
+                if not op.deterministic or op.dynamic or isinstance(op, OpVariable) and op.x is None:
+                    if last_random is not None:
+                        predecessors[i].add(last_random)
+                    last_random = i
+                if isinstance(op, OpSetitem):
+                    predecessors[i].update(user for user in users[op.inputs[0]] if user != i)
+            consumers = [[] for _ in self.operations]
+            for i, dependencies in enumerate(predecessors):
+                for dependency in dependencies:
+                    consumers[dependency].append(i)
+            self._schedule = [len(dependencies) for dependencies in predecessors], consumers, kinds
+        return self._schedule
+
+    def _run_parallel(self,
+                      feed_dict: Mapping[Union[str, Operation], np.ndarray],
+                      step: int,
+                      specialized: Optional[dict],
+                      recording: Optional[dict],
+                      executor: Executor) -> None:
+        """Evaluate the operations whose dependencies are finished with the executor."""
+        pending, consumers, kinds = self._parallel_schedule()
+        pending = list(pending)
+        ready = [i for i, count in enumerate(pending) if count == 0]
+        ready.reverse()
+        exclusive = []
+        done = queue.SimpleQueue()
+        context = current_context()
+        remaining, running = len(self._steps), 0
+
+        def _finish(i):
+            nonlocal remaining
+            op = self._steps[i][0]
+            if recording is not None and op in self.shape_only:
+                recording[op] = op.output
+            for consumer in consumers[i]:
+                pending[consumer] -= 1
+                if pending[consumer] == 0:
+                    ready.append(consumer)
+            remaining -= 1
+
+        try:
+            while remaining > 0:
+                inline = None
+                while ready:
+                    i = ready.pop()
+                    op, fed = self._steps[i]
+                    kind = kinds[i]
+                    if op._enable_cache and op._last_step == step or specialized is not None and op in specialized:
+                        kind = self.TASK_INLINE
+                    if kind == self.TASK_EXCLUSIVE:
+                        exclusive.append(i)
+                    elif kind == self.TASK_INLINE:
+                        self._evaluate(op, fed, feed_dict, step, specialized)
+                        _finish(i)
+                    elif inline is None:
+                        inline = i
+                    else:
+                        future = executor.submit(run_in_context, context, self._evaluate,
+                                                 op, fed, feed_dict, step, specialized)
+                        future.add_done_callback(lambda f, i=i: done.put((i, f)))
+                        running += 1
+                if inline is None and running == 0:
+                    if not exclusive:
+                        continue
+                    inline = exclusive.pop(0)
+                if inline is not None:
+                    op, fed = self._steps[inline]
+                    self._evaluate(op, fed, feed_dict, step, specialized)
+                    _finish(inline)
+                    if running == 0:
+                        continue
+                    try:
+                        i, future = done.get_nowait()
+                    except queue.Empty:
+                        continue
+                else:
+                    i, future = done.get()
+                running -= 1
+                future.result()
+                _finish(i)
+        except BaseException:
+            while running > 0:
+                done.get()
+                running -= 1
+            raise
+
+    def backward(self,
+                 root: Operation,
+                 wrt: Optional[Sequence[Operation]] = None,
+                 gradient: Optional[Union[float, np.ndarray]] = None) -> List[Optional[Union[float, np.ndarray]]]:
+        """Propagate the gradients from the root in a single pass.
+
+        Only the operations on the paths from the root to the targets are processed, and the gradients of the inputs
+        that could not reach the targets are skipped (see :attr:`Operation.grad_mask`).
+
+        :param root: The operation whose gradient is one, usually the loss.
+        :param wrt: The targets of the gradients, all the variables are used if it is None.
+        :param gradient: The gradient of the root, ones are used if it is None.
+        :return: The gradients of the targets, None if a target could not be reached from the root. The gradients are
+                 never the buffers of the accumulator, so they stay valid after the next backward pass.
+        """
+        order = self._backward_order(root, wrt)
+        targets = {op: None for op in wrt} if wrt is not None else {}
+        memory = self.memory
+        if memory is not None:
+            memory.before_backward()
+            if memory.checkpointing:
+                memory.rematerialize(root, self._feed_dict)
+        root.grad_mask = order[0][2]
+        if gradient is None:
+            gradient = np.ones_like(root.output)
+        root._backward(gradient)
+        if memory is not None:
+            memory.after_backward(root, [])
+        checkpointing = memory is not None and memory.checkpointing
+        for op, consumers, grad_mask in order[1:]:
+            gradient = self.accumulator.accumulate(op, [consumer.gradients[index] for consumer, index in consumers])
+            if isinstance(op, OpVariable) and self.accumulator.shares_buffer(gradient):
+                # The gradients of the variables are kept after the pass, e.g. by the optimizers or the users
+                gradient = gradient.copy()
+            if op in targets:
+                targets[op] = gradient
+            if checkpointing:
+                memory.rematerialize(op, self._feed_dict)
+            op.grad_mask = grad_mask
+            op._backward(gradient)
+            if memory is not None:
+                memory.after_backward(op, consumers)
+        return [gradient.copy() if self.accumulator.shares_buffer(gradient) else gradient
+                for gradient in targets.values()]
+
+    def _backward_order(self,
+                        root: Operation,
+                        wrt: Optional[Sequence[Operation]] = None,
+                        ) -> List[Tuple[Operation, List[Tuple[Operation, int]], List[bool]]]:
+        """Get the reverse topological order of the operations on the paths from the root to the targets.
+
+        Each operation comes with its consumers, the index of itself in the consumers' inputs and whether the gradients
+        of its inputs are needed. The order is cached until a dynamic operation in it rebuilds its inputs.
+        """
+        key = (root, frozenset(wrt) if wrt is not None else None)
+        cached = self._backward_orders.get(key)
+        if cached is not None:
+            order, dynamic_inputs = cached
+            if all(op.inputs is inputs for op, inputs in dynamic_inputs):
+                return order
+        operations, visited = [], {root}
+        stack = [(root, iter(root.inputs))]
+        while stack:
+            op, inputs = stack[-1]
+            for inp in inputs:
+                if inp not in visited:
+                    visited.add(inp)
+                    stack.append((inp, iter(inp.inputs)))
+                    break
+            else:
+                stack.pop()
+                operations.append(op)
+        dynamic_inputs = [(op, op.inputs) for op in operations if op.dynamic]
+        if wrt is None:
+            targets = {op for op in operations if isinstance(op, OpVariable)}
+        else:
+            targets = set(wrt)
+        relevant = {}
+        for op in operations:
+            relevant[op] = op in targets or any(relevant[inp] for inp in op.inputs)
+        operations = [op for op in reversed(operations) if relevant[op] or op is root]
+        consumers = {op: [] for op in operations}
+        for op in operations:
+            for grad_index, inp in enumerate(op.inputs):
+                if relevant[inp]:
+                    consumers[inp].append((op, grad_index))
+        order = [(op, consumers[op], [relevant[inp] for inp in op.inputs]) for op in operations]
+        self._backward_orders[key] = (order, dynamic_inputs)
+        return order
@@ -0,0 +1,277 @@
+import time
+import threading
+import functools
+from typing import List, Optional
+import numpy as np
+from auto_diff.op.operation import Operation
+
+__all__ = ['Profiler', 'OpProfile']
+
+#: The lock for installing the hooks and updating the active profilers.
+_LOCK = threading.Lock()
+#: The active profilers and tracers, the hooks are installed only when there is at least one.
+_ACTIVE = []
+#: The original methods replaced by the hooks: the class, the name and the method.
+_ORIGINALS = []
+#: The operations being evaluated in the threads.
+_LOCAL = threading.local()
+
+
+def _output_bytes(output) -> int:
+    """The bytes of the array if it owns its data, the views of the inputs are not counted as allocations."""
+    if isinstance(output, np.ndarray) and output.flags.owndata:
+        return output.nbytes
+    return 0
+
+
+def _hook(func, phase: str):
+    """Wraps `_forward` or `_backward` to measure each call and report it to the active profilers."""
+
+    @functools.wraps(func)
+    def _hooked(op: Operation, arg):
+        stack = getattr(_LOCAL, 'stack', None)
+        if stack is None:
+            stack = _LOCAL.stack = []
+        elif stack and stack[-1][0] is op:
+            # Calling the method of the parent class
+            return func(op, arg)
+        frame = [op, 0.0]
+        stack.append(frame)
+        result = None
+        start = time.perf_counter()
+        try:
+            result = func(op, arg)
+            return result
+        finally:
+            elapsed = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][1] += elapsed
+            if phase == 'forward':
+                nbytes = _output_bytes(result)
+            else:
+                nbytes = sum(_output_bytes(gradient) for gradient in op.gradients or ())
+            for listener in list(_ACTIVE):
+                listener.record(op, phase, start, elapsed, elapsed - frame[1], nbytes, len(stack))
+
+    return _hooked
+
+
+def _install() -> None:
+    classes, stack = [], [Operation]
+    while stack:
+        cls = stack.pop()
+        classes.append(cls)
+        stack.extend(cls.__subclasses__())
+    for cls in classes:
+        for name, phase in [('_forward', 'forward'), ('_backward', 'backward')]:
+            method = cls.__dict__.get(name)
+            if method is not None:
+                _ORIGINALS.append((cls, name, method))
+                setattr(cls, name, _hook(method, phase))
+
+
+def _uninstall() -> None:
+    for cls, name, method in _ORIGINALS:
+        setattr(cls, name, method)
+    _ORIGINALS.clear()
+
+
+def activate(listener) -> None:
+    """Report the calls of the operations to the listener, see :meth:`Profiler.record` for the arguments."""
+    with _LOCK:
+        if not _ACTIVE:
+            _install()
+        _ACTIVE.append(listener)
+
+
+def deactivate(listener) -> None:
+    with _LOCK:
+        _ACTIVE.remove(listener)
+        if not _ACTIVE:
+            _uninstall()
+
+
+class OpProfile(object):
+    """The measurements of an operation or a class of operations.
+
+    The total time of a call includes the calls of the operations evaluated inside it (e.g. the body of a while loop),
+    the self time excludes them.
+    """
+
+    __slots__ = ('name', 'forward_calls', 'forward_time', 'forward_self_time',
+                 'backward_calls', 'backward_time', 'backward_self_time', 'bytes')
+
+    def __init__(self, name: str):
+        self.name = name
+        self.forward_calls = 0
+        self.forward_time = 0.0
+        self.forward_self_time = 0.0
+        self.backward_calls = 0
+        self.backward_time = 0.0
+        self.backward_self_time = 0.0
+        #: The bytes of the new outputs and gradients.
+        self.bytes = 0
+
+    @property
+    def calls(self) -> int:
+        return self.forward_calls + self.backward_calls
+
+    @property
+    def total_time(self) -> float:
+        return self.forward_time + self.backward_time
+
+    @property
+    def self_time(self) -> float:
+        return self.forward_self_time + self.backward_self_time
+
+    def add(self, phase: str, elapsed: float, self_elapsed: float, nbytes: int) -> None:
+        if phase == 'forward':
+            self.forward_calls += 1
+            self.forward_time += elapsed
+            self.forward_self_time += self_elapsed
+        else:
+            self.backward_calls += 1
+            self.backward_time += elapsed
+            self.backward_self_time += self_elapsed
+        self.bytes += nbytes
+
+    def merge(self, other: 'OpProfile') -> None:
+        for name in self.__slots__[1:]:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+
+class Profiler(object):
+    """Measures the wall time, the number of calls and the allocated bytes of the forward and backward passes of each
+    operation.
+
+    The measurements are taken while the profiler is activated with `with profiler:`, or during the runs of a
+    :class:`Session` whose `profiler` is set. The methods of the operations are replaced only when there are active
+    profilers, so nothing is slowed down when profiling is disabled. The operations evaluated by the worker threads of
+    a session are measured as well, the ones in the processes of data parallel training are not.
+
+    The allocated bytes are the sizes of the new arrays returned by the operations, the temporary arrays are not
+    counted.
+    """
+
+    #: The columns that could be used for sorting.
+    SORT_KEYS = ('total_time', 'self_time', 'calls', 'bytes',
+                 'forward_time', 'backward_time', 'forward_calls', 'backward_calls', 'name')
+
+    def __init__(self):
+        #: The measurements of the operations.
+        self.ops = {}
+        self._lock = threading.Lock()
+        self._depth = 0
+
+    def __getstate__(self) -> dict:
+        """The measurements are not kept."""
+        return {}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+
+    def __enter__(self) -> 'Profiler':
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1:
+                activate(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                deactivate(self)
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    def record(self,
+               op: Operation,
+               phase: str,
+               start: float,
+               elapsed: float,
+               self_elapsed: float,
+               nbytes: int,
+               depth: int) -> None:
+        """Add a call of `_forward` or `_backward`.
+
+        :param op: The operation.
+        :param phase: `'forward'` or `'backward'`.
+        :param start: The start time from :func:`time.perf_counter`.
+        :param elapsed: The duration in seconds.
+        :param self_elapsed: The duration without the calls of the operations evaluated inside it.
+        :param nbytes: The bytes of the new output or gradients.
+        :param depth: The number of enclosing calls in the current thread.
+        """
+        with self._lock:
+            profile = self.ops.get(op)
+            if profile is None:
+                profile = self.ops[op] = OpProfile(self.op_label(op))
+            profile.add(phase, elapsed, self_elapsed, nbytes)
+
+    @staticmethod
+    def op_label(op: Operation) -> str:
+        """The given name of the operation, or its class and index since the built names could be long."""
+        if op._name is not None:
+            return op._name
+        return '%s#%d' % (type(op).__name__, op._op_index)
+
+    def reset(self) -> None:
+        """Drop all the measurements."""
+        with self._lock:
+            self.ops = {}
+
+    def stats(self, by: str = 'op', sort_by: str = 'total_time', descending: bool = True) -> List[OpProfile]:
+        """Get the measurements.
+
+        :param by: `'op'` for each operation or `'class'` for each class of operations.
+        :param sort_by: One of :attr:`SORT_KEYS`.
+        :param descending: Whether the largest values come first.
+        :return: The sorted measurements.
+        """
+        if sort_by not in self.SORT_KEYS:
+            raise ValueError('Unknown sort key: %s' % sort_by)
+        with self._lock:
+            if by == 'op':
+                profiles = list(self.ops.values())
+            elif by == 'class':
+                classes = {}
+                for op, profile in self.ops.items():
+                    name = type(op).__name__
+                    merged = classes.get(name)
+                    if merged is None:
+                        merged = classes[name] = OpProfile(name)
+                    merged.merge(profile)
+                profiles = list(classes.values())
+            else:
+                raise ValueError('Unknown grouping: %s' % by)
+        return sorted(profiles, key=lambda profile: getattr(profile, sort_by), reverse=descending)
+
+    def report(self,
+               by: str = 'op',
+               sort_by: str = 'total_time',
+               descending: bool = True,
+               limit: Optional[int] = 20) -> str:
+        """Format the measurements as a table, the times are in milliseconds.
+
+        :param by: `'op'` for each operation or `'class'` for each class of operations.
+        :param sort_by: One of :attr:`SORT_KEYS`.
+        :param descending: Whether the largest values come first.
+        :param limit: The maximum number of rows, all the rows are shown if it is None.
+        :return: The table.
+        """
+        profiles = self.stats(by, sort_by, descending)
+        if limit is not None:
+            profiles = profiles[:limit]
+        width = max([len(profile.name) for profile in profiles] + [4])
+        header = '%-*s %8s %12s %12s %12s %12s %14s' % (
+            width, 'Name', 'Calls', 'Total (ms)', 'Self (ms)', 'Forward (ms)', 'Backward (ms)', 'Bytes')
+        lines = [header, '-' * len(header)]
+        for profile in profiles:
+            lines.append('%-*s %8d %12.3f %12.3f %12.3f %12.3f %14d' % (
+                width, profile.name, profile.calls, profile.total_time * 1e3, profile.self_time * 1e3,
+                profile.forward_time * 1e3, profile.backward_time * 1e3, profile.bytes))
+        return '\n'.join(lines)
@@ -0,0 +1,122 @@
+import os
+import pickle
+from typing import Any, Optional
+import numpy as np
+from auto_diff.op.operation import Operation
+
+__all__ = ['save', 'load']
+
+#: The name of the file that contains the pickled objects in the saved directory.
+GRAPH_FILE = 'graph.pkl'
+
+
+class _GraphPickler(pickle.Pickler):
+    """Pickles the operations as references and writes the large arrays to `.npy` files.
+
+    The states of the operations are pickled one after another instead of recursively, so that deep graphs would not
+    exceed the recursion limit.
+    """
+
+    def __init__(self, file, directory: str, min_blob_bytes: int):
+        super(_GraphPickler, self).__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.min_blob_bytes = min_blob_bytes
+        self.operations = []
+        self._op_ids = {}
+        self._blob_ids = {}
+        self._blobs = []
+
+    def persistent_id(self, obj: Any) -> Optional[tuple]:
+        if isinstance(obj, Operation):
+            index = self._op_ids.get(id(obj))
+            if index is None:
+                index = self._op_ids[id(obj)] = len(self.operations)
+                self.operations.append(obj)
+            return 'op', index, type(obj)
+        if isinstance(obj, np.ndarray) and obj.dtype != object and obj.nbytes >= self.min_blob_bytes:
+            index = self._blob_ids.get(id(obj))
+            if index is None:
+                index = self._blob_ids[id(obj)] = len(self._blobs)
+                self._blobs.append(obj)
+                np.save(os.path.join(self.directory, '%d.npy' % index), obj)
+            return 'npy', index
+        return None
+
+
+class _GraphUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, directory: str, mmap_mode: Optional[str]):
+        super(_GraphUnpickler, self).__init__(file)
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self.operations = {}
+        self._blobs = {}
+
+    def persistent_load(self, pid: tuple) -> Any:
+        if pid[0] == 'op':
+            _, index, cls = pid
+            op = self.operations.get(index)
+            if op is None:
+                op = self.operations[index] = cls.__new__(cls)
+            return op
+        if pid[0] == 'npy':
+            index = pid[1]
+            blob = self._blobs.get(index)
+            if blob is None:
+                blob = self._blobs[index] = np.load(os.path.join(self.directory, '%d.npy' % index),
+                                                    mmap_mode=self.mmap_mode)
+            return blob
+        raise pickle.UnpicklingError('Unknown persistent id: %s' % str(pid))
+
+
+def save(obj: Any, directory: str, min_blob_bytes: int = 1024) -> None:
+    """Save a graph, a model or any object that contains operations.
+
+    The topology, the parameters of the operations, the weights and the compiled execution plans are kept, while the
+    results of the last step are dropped. The arrays that are not smaller than `min_blob_bytes` are saved as `.npy`
+    files in the directory, so that they could be memory-mapped when loading.
+
+    .. warning::
+       The graph is stored with :mod:`pickle`, the saved directory should be treated like a pickle file and only be
+       shared with parties that trust it, see :func:`load`.
+
+    :param obj: The object to be saved, e.g. an operation or a built :class:`Model`.
+    :param directory: The output directory, it is created if it does not exist.
+    :param min_blob_bytes: The minimum number of bytes of the arrays that are saved as separated files.
+    """
+    os.makedirs(directory, exist_ok=True)
+    with open(os.path.join(directory, GRAPH_FILE), 'wb') as writer:
+        pickler = _GraphPickler(writer, directory, min_blob_bytes)
+        pickler.dump(obj)
+        index = 0
+        while index < len(pickler.operations):
+            pickler.dump(pickler.operations[index].__getstate__())
+            index += 1
+        pickler.dump(None)
+
+
+def load(directory: str, mmap_mode: Optional[str] = None) -> Any:
+    """Load the object saved by :func:`save`.
+
+    The loaded operations get new indices, so they could be used together with the operations in this process.
+
+    .. warning::
+       The graph is restored with :mod:`pickle`, which could execute arbitrary code while loading. Only load the
+       directories from trusted sources.
+
+    :param directory: The directory that contains the saved files.
+    :param mmap_mode: The mode for memory-mapping the array files, see `numpy.load`. The arrays are read into memory
+                      if it is None.
+    :return: The loaded object.
+    """
+    with open(os.path.join(directory, GRAPH_FILE), 'rb') as reader:
+        unpickler = _GraphUnpickler(reader, directory, mmap_mode)
+        obj = unpickler.load()
+        index = 0
+        while True:
+            state = unpickler.load()
+            if state is None:
+                break
+            unpickler.operations[index].__setstate__(state)
+            index += 1
+    return obj
@@ -1,27 +1,192 @@
-from typing import Union, Mapping, List
+import contextlib
+from typing import Union, Mapping, List, Tuple, Optional, Iterable, ContextManager
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 from auto_diff.op.operation import Operation
+from auto_diff.op.context import current_context, next_step
+from .plan import ExecutionPlan
+from .profiler import Profiler
+from .trace import trace_span, tracing
 
 __all__ = ['Session']
 
 
 class Session(object):
+    """Compiles and runs the execution plans.
+
+    The step is shared by all the sessions, it is stored in the active :class:`ExecutionContext` if there is one, so
+    that the sessions could be used by multiple threads with a context in each thread.
+
+    With `num_threads` set, the independent operations in a run are evaluated in parallel by a thread pool, which is
+    helpful for graphs with large independent branches (e.g. the matrix multiplications of the gates in recurrent
+    layers), as numpy releases the GIL in heavy computations.
+    """
 
     __step = [0]
 
-    def __init__(self):
+    def __init__(self,
+                 plan_memory: bool = False,
+                 checkpoints: Optional[Iterable[Operation]] = None,
+                 checkpoint_every: int = 0,
+                 num_threads: int = 0,
+                 profiler: Optional[Profiler] = None):
+        """
+        :param plan_memory: Whether to release intermediate results once they are no longer needed, see
+                            :class:`MemoryPlanner`. The plans are regarded as training plans unless
+                            :attr:`Operation.KEY_TRAINING` is fed with False.
+        :param checkpoints: Enable gradient checkpointing in training plans and keep only the outputs of these
+                            operations for the backward pass.
+        :param checkpoint_every: Enable gradient checkpointing in training plans and keep one output in every
+                                 `checkpoint_every` operations.
+        :param num_threads: The number of worker threads for evaluating independent operations, the operations are
+                            evaluated one by one if it is zero. The runs with memory planning are not parallelized.
+                            Call :meth:`close` after changing it so that a new pool is created.
+        :param profiler: The operations are measured by the profiler during the runs if it is not None.
+        """
+        self.plan_memory = plan_memory
+        self.checkpoints = checkpoints
+        self.checkpoint_every = checkpoint_every
+        self.num_threads = num_threads
+        self.profiler = profiler
+        self._plans = {}
+        self._executor = None
         self.prepare()
 
+    def __getstate__(self) -> dict:
+        """The thread pool is not kept, it is created again in the first run."""
+        state = self.__dict__.copy()
+        state['_executor'] = None
+        return state
+
+    @property
+    def executor(self) -> Optional[ThreadPoolExecutor]:
+        """The thread pool for evaluating independent operations, None if `num_threads` is zero."""
+        if self.num_threads <= 0:
+            return None
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.num_threads, thread_name_prefix='auto_diff')
+        return self._executor
+
+    def close(self):
+        """Shut down the thread pool, a new one is created if a parallel run is started later."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def profiling(self) -> ContextManager:
+        """Activate the profiler if there is one."""
+        if self.profiler is None:
+            return contextlib.nullcontext()
+        return self.profiler
+
     def prepare(self):
-        self.__step[0] += 1
+        """Start a new step, the cached outputs of the last step are no longer used."""
+        context = current_context()
+        if context is None:
+            self.__step[0] = next_step()
+        else:
+            context.step = next_step()
 
-    def run(self, fetches: Union[Operation, List[Operation], Mapping[str, Operation]], feed_dict=None):
+    def _current_step(self) -> int:
+        context = current_context()
+        if context is None:
+            return self.__step[0]
+        return context.step
+
+    def compile(self, fetches: List[Operation], feed_dict=None) -> ExecutionPlan:
+        """Get the execution plan of the fetches, the plan is compiled only once for each signature.
+
+        :param fetches: The operations to be evaluated.
+        :param feed_dict: The feed dictionary, only the operation keys are used for the signature.
+        :return: The compiled plan.
+        """
         if feed_dict is None:
             feed_dict = {}
-        feed_dict[Operation.KEY_STEP] = self.__step[0]
+        feeds = frozenset(key for key in feed_dict if isinstance(key, Operation))
+        training = bool(feed_dict.get(Operation.KEY_TRAINING, True))
+        signature = (tuple(fetches), feeds, training)
+        plan = self._plans.get(signature)
+        if plan is None:
+            with trace_span('compile', 'compile', fetches=len(fetches)):
+                plan = self._plans[signature] = ExecutionPlan(fetches, feeds)
+                if self.plan_memory:
+                    if training:
+                        plan.plan_memory(training, self.checkpoints, self.checkpoint_every)
+                    else:
+                        plan.plan_memory(training)
+            if training or not self.plan_memory:
+                for fetch in fetches:
+                    if fetch._plan is None:
+                        fetch._plan = plan
+        return plan
+
+    def memory_report(self, fetches: Union[Operation, List[Operation]], feed_dict=None) -> Tuple[int, int]:
+        """Run the fetches (and the backward pass of the first fetch in training) with the memory planned.
+
+        :param fetches: The operations to be evaluated.
+        :param feed_dict: The feed dictionary.
+        :return: The planned and the naive peak bytes of the intermediate results.
+        """
         if isinstance(fetches, Operation):
-            return fetches.forward(feed_dict)
-        if isinstance(fetches, list):
-            return [fetch.forward(feed_dict) for fetch in fetches]
-        if isinstance(fetches, dict):
-            return {key: fetch.forward(feed_dict) for key, fetch in fetches.items()}
+            fetches = [fetches]
+        if feed_dict is None:
+            feed_dict = {}
+        plan = self.compile(fetches, feed_dict)
+        memory = plan.memory
+        if memory is None:
+            memory = plan.plan_memory(bool(feed_dict.get(Operation.KEY_TRAINING, True)))
+        self.prepare()
+        self.run(fetches, feed_dict=feed_dict)
+        if memory.training:
+            plan.backward(fetches[0])
+        report = memory.report()
+        if not self.plan_memory:
+            plan.memory = None
+        return report
+
+    def run(self,
+            fetches: Union[Operation, List[Operation], Mapping[str, Operation]],
+            feed_dict=None,
+            trace_file: Optional[str] = None):
+        """Evaluate the fetches.
+
+        :param fetches: An operation, a list of operations or a dictionary of operations.
+        :param feed_dict: The feed dictionary.
+        :param trace_file: Write the timeline of the run to the file if it is not None, see :class:`Tracer`.
+        :return: The outputs in the same structure as the fetches.
+        """
+        if feed_dict is None:
+            feed_dict = {}
+        feed_dict[Operation.KEY_STEP] = self._current_step()
+        executor = self.executor
+        with tracing(trace_file), self.profiling(), trace_span('run', 'session'):
+            if isinstance(fetches, Operation):
+                return self.compile([fetches], feed_dict).run(feed_dict, executor)[0]
+            if isinstance(fetches, list):
+                return self.compile(fetches, feed_dict).run(feed_dict, executor)
+            if isinstance(fetches, dict):
+                keys = list(fetches.keys())
+                outputs = self.compile([fetches[key] for key in keys], feed_dict).run(feed_dict, executor)
+                return dict(zip(keys, outputs))
         raise NotImplementedError('Unknown type of fetches: %s' % type(fetches))
+
+    def gradients(self,
+                  ys: Operation,
+                  wrt: List[Operation],
+                  feed_dict=None,
+                  trace_file: Optional[str] = None) -> List[Optional[np.ndarray]]:
+        """Evaluate the operation and calculate its gradients with respect to the targets.
+
+        :param ys: The operation to be differentiated, usually the loss.
+        :param wrt: The targets of the gradients, could be variables, placeholders or intermediate operations.
+        :param feed_dict: The feed dictionary.
+        :param trace_file: Write the timeline to the file if it is not None, see :class:`Tracer`.
+        :return: The gradients of the targets, None if a target could not be reached from the operation.
+        """
+        if feed_dict is None:
+            feed_dict = {}
+        feed_dict[Operation.KEY_STEP] = self._current_step()
+        with tracing(trace_file), self.profiling(), trace_span('gradients', 'session'):
+            plan = self.compile([ys], feed_dict)
+            plan.run(feed_dict, self.executor)
+            return plan.backward(ys, wrt)
@@ -0,0 +1,166 @@
+import os
+import json
+import time
+import threading
+import contextlib
+from typing import Optional, Iterator, ContextManager
+from auto_diff.op.operation import Operation
+from .profiler import Profiler, activate, deactivate
+
+__all__ = ['Tracer', 'trace_span']
+
+#: The active tracers.
+_TRACERS = []
+
+
+def tracing_enabled() -> bool:
+    """Whether there is an active tracer."""
+    return len(_TRACERS) > 0
+
+
+@contextlib.contextmanager
+def tracing(path: Optional[str]) -> Iterator[Optional['Tracer']]:
+    """Record the trace of the block and save it to the path, nothing is recorded if the path is None."""
+    if path is None:
+        yield None
+        return
+    with Tracer() as tracer:
+        yield tracer
+    tracer.save(path)
+
+
+def trace_span(name: str, category: str, **args) -> ContextManager:
+    """A span in the active tracers, nothing is recorded if there is no active tracer.
+
+    :param name: The name shown in the timeline.
+    :param category: The category of the span, e.g. `'compile'` or `'optimizer'`.
+    :param args: The extra information shown with the span.
+    """
+    if not _TRACERS:
+        return contextlib.nullcontext()
+    return _Span(name, category, args)
+
+
+class _Span(object):
+
+    __slots__ = ('name', 'category', 'args', 'start')
+
+    def __init__(self, name: str, category: str, args: dict):
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start = 0.0
+
+    def __enter__(self) -> '_Span':
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        elapsed = time.perf_counter() - self.start
+        for tracer in list(_TRACERS):
+            tracer.add_event(self.name, self.category, self.start, elapsed, self.args)
+
+
+class Tracer(object):
+    """Records a timeline in the Chrome trace event format, which could be opened by `chrome://tracing` or Perfetto.
+
+    While the tracer is activated with `with tracer:`, the forward and backward passes of the operations are recorded
+    as spans, together with the spans of compiling plans, running sessions, training steps, updating each weight in
+    the optimizers and preparing batches in the background. The spans in a thread are nested by their times.
+
+    `Session.run` and `Model.fit_on_batch` accept a `trace_file` to record a single call.
+    """
+
+    def __init__(self):
+        #: The trace events.
+        self.events = []
+        self._lock = threading.Lock()
+        self._depth = 0
+        self._origin = time.perf_counter()
+        self._threads = {}
+
+    def __getstate__(self) -> dict:
+        """The events are not kept."""
+        return {}
+
+    def __setstate__(self, state: dict) -> None:
+        self.__init__()
+
+    def __enter__(self) -> 'Tracer':
+        with self._lock:
+            self._depth += 1
+            if self._depth == 1:
+                activate(self)
+                _TRACERS.append(self)
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        with self._lock:
+            self._depth -= 1
+            if self._depth == 0:
+                _TRACERS.remove(self)
+                deactivate(self)
+
+    @property
+    def active(self) -> bool:
+        return self._depth > 0
+
+    def _thread_id(self) -> int:
+        """A small id for the current thread, its name is added as a metadata event when it is first seen."""
+        ident = threading.get_ident()
+        tid = self._threads.get(ident)
+        if tid is None:
+            tid = self._threads[ident] = len(self._threads)
+            self.events.append({
+                'name': 'thread_name', 'ph': 'M', 'pid': os.getpid(), 'tid': tid,
+                'args': {'name': threading.current_thread().name},
+            })
+        return tid
+
+    def add_event(self, name: str, category: str, start: float, elapsed: float, args: Optional[dict] = None) -> None:
+        """Add a complete event.
+
+        :param name: The name of the span.
+        :param category: The category of the span.
+        :param start: The start time from :func:`time.perf_counter`.
+        :param elapsed: The duration in seconds.
+        :param args: The extra information.
+        """
+        event = {
+            'name': name,
+            'cat': category,
+            'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'dur': elapsed * 1e6,
+            'pid': os.getpid(),
+        }
+        if args:
+            event['args'] = args
+        with self._lock:
+            event['tid'] = self._thread_id()
+            self.events.append(event)
+
+    def record(self,
+               op: Operation,
+               phase: str,
+               start: float,
+               elapsed: float,
+               self_elapsed: float,
+               nbytes: int,
+               depth: int) -> None:
+        """Add the span of a call of `_forward` or `_backward`, see :meth:`Profiler.record`."""
+        self.add_event(Profiler.op_label(op), phase, start, elapsed, {'class': type(op).__name__, 'bytes': nbytes})
+
+    def clear(self) -> None:
+        with self._lock:
+            self.events = []
+            self._threads = {}
+
+    def to_json(self) -> dict:
+        with self._lock:
+            return {'traceEvents': list(self.events), 'displayTimeUnit': 'ms'}
+
+    def save(self, path: str) -> None:
+        """Write the events to a JSON file."""
+        with open(path, 'w') as writer:
+            json.dump(self.to_json(), writer)
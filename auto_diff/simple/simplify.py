@@ -1,12 +1,18 @@
 from typing import Optional, Sequence, Callable
 from ..op import Operation
 from .sp_const_sub_tree import sp_const_sub_tree
+from .sp_algebraic import sp_algebraic
+from .sp_cse import sp_cse
+from .sp_fuse import sp_fuse
 
 
 def simplify(op: Operation, simplifies: Optional[Sequence[Callable]] = None):
     if simplifies is None:
         simplifies = [
             sp_const_sub_tree,
+            sp_algebraic,
+            sp_cse,
+            sp_fuse,
         ]
     for sim in simplifies:
         op = sim(op)
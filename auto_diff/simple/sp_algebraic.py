@@ -0,0 +1,173 @@
+from typing import Optional, Dict
+import numpy as np
+import auto_diff as ad
+from auto_diff.op.op_add import OpAdd
+from auto_diff.op.op_subtract import OpSubtract
+from auto_diff.op.op_multiply import OpMultiply
+from auto_diff.op.op_divide import OpDivide
+from auto_diff.op.op_negative import OpNegative
+from auto_diff.op.op_exp import OpExp
+from auto_diff.op.op_transpose import OpTranspose
+from auto_diff.op.op_reshape import OpReshape
+from auto_diff.op.op_squeeze import OpSqueeze
+from auto_diff.op.op_expand_dims import OpExpandDims
+from auto_diff.op.op_keepdims import OpKeepdims
+from auto_diff.op.op_sigmoid import OpSigmoid
+from .sp_cse import _replace_param
+
+
+def _is_scalar(op: ad.Operation, value: Optional[float] = None) -> bool:
+    return isinstance(op, ad.OpConstant) and np.isscalar(op.x) and (value is None or op.x == value)
+
+
+def _rule_identity(op: ad.Operation) -> Optional[ad.Operation]:
+    """`x + 0`, `x - 0`, `x * 1`, `x / 1` and the outer operations of non-keepdims reductions."""
+    if isinstance(op, (OpAdd, OpMultiply)):
+        unit = 0.0 if isinstance(op, OpAdd) else 1.0
+        x, y = op.inputs
+        if _is_scalar(y, unit) and x.shape == op.shape:
+            return x
+        if _is_scalar(x, unit) and y.shape == op.shape:
+            return y
+    elif isinstance(op, (OpSubtract, OpDivide)):
+        unit = 0.0 if isinstance(op, OpSubtract) else 1.0
+        x, y = op.inputs
+        if _is_scalar(y, unit) and x.shape == op.shape:
+            return x
+    elif isinstance(op, OpKeepdims) and not op.params['keepdims']:
+        return op.inputs[0]
+    return None
+
+
+def _rule_inverse(op: ad.Operation) -> Optional[ad.Operation]:
+    """Pairs of operations that cancel each other or could be merged into one."""
+    if not op.inputs:
+        return None
+    x = op.inputs[0]
+    if isinstance(op, OpNegative) and isinstance(x, OpNegative):
+        return x.inputs[0]
+    if isinstance(op, OpTranspose) and isinstance(x, OpTranspose):
+        dim = len(op.shape)
+        inner = x.params['axes'] or list(reversed(range(dim)))
+        outer = op.params['axes'] or list(reversed(range(dim)))
+        axes = [inner[axis] for axis in outer]
+        if axes == list(range(dim)):
+            return x.inputs[0]
+        return OpTranspose(x.inputs[0], axes)
+    if isinstance(op, OpReshape):
+        if isinstance(x, OpReshape):
+            return OpReshape(x.inputs[0], op.params['shape'])
+        if x.shape == op.shape and None not in op.shape:
+            return x
+    if isinstance(op, OpSqueeze) and isinstance(x, OpExpandDims):
+        axis = x.params['axis']
+        if axis < 0:
+            axis += x.dim
+        if op.backward_axis == [axis]:
+            return x.inputs[0]
+    if isinstance(op, OpExpandDims) and isinstance(x, OpSqueeze):
+        axis = op.params['axis']
+        if axis < 0:
+            axis += op.dim
+        if x.backward_axis == [axis]:
+            return x.inputs[0]
+    return None
+
+
+def _rule_reassociate(op: ad.Operation) -> Optional[ad.Operation]:
+    """`(x + c1) + c2` to `x + (c1 + c2)` and `(x * c1) * c2` to `x * (c1 * c2)` with scalar constants."""
+    if not isinstance(op, (OpAdd, OpMultiply)):
+        return None
+    inner, outer = op.inputs
+    if _is_scalar(inner):
+        inner, outer = outer, inner
+    if type(inner) is not type(op) or not _is_scalar(outer):
+        return None
+    x, c = inner.inputs
+    if _is_scalar(x):
+        x, c = c, x
+    if not _is_scalar(c) or _is_scalar(x):
+        return None
+    if isinstance(op, OpAdd):
+        return OpAdd(x, ad.OpConstant(c.x + outer.x))
+    return OpMultiply(x, ad.OpConstant(c.x * outer.x))
+
+
+def _rule_sigmoid(op: ad.Operation) -> Optional[ad.Operation]:
+    """`1 / (1 + exp(-x))` to `sigmoid(x)`."""
+    if not isinstance(op, OpDivide) or not _is_scalar(op.inputs[0], 1.0) or not isinstance(op.inputs[1], OpAdd):
+        return None
+    one, e = op.inputs[1].inputs
+    if _is_scalar(e, 1.0):
+        one, e = e, one
+    if not _is_scalar(one, 1.0) or not isinstance(e, OpExp) or not isinstance(e.inputs[0], OpNegative):
+        return None
+    x = e.inputs[0].inputs[0]
+    if x.shape != op.shape:
+        return None
+    return OpSigmoid(x)
+
+
+#: The rules that are applied to each operation until none of them matches.
+RULES = [
+    _rule_identity,
+    _rule_inverse,
+    _rule_reassociate,
+    _rule_sigmoid,
+]
+
+
+def _count_nodes(op: ad.Operation) -> int:
+    visited, stack = {op}, [op]
+    while stack:
+        for dependency in stack.pop().dependencies:
+            if dependency not in visited:
+                visited.add(dependency)
+                stack.append(dependency)
+    return len(visited)
+
+
+def sp_algebraic(op: ad.Operation, report: Optional[Dict[str, int]] = None) -> ad.Operation:
+    """Rewrite the graph with algebraic identities.
+
+    The rules are applied bottom-up, the graph is modified in place, and the operations that are no longer used are
+    dropped from the graph.
+
+    :param op: The output operation.
+    :param report: If a dictionary is given, the number of times each rule is applied is added with the name of the
+                   rule, and the number of operations removed from the graph is added with the key `removed`.
+    :return: The output operation after rewriting.
+    """
+    before = _count_nodes(op) if report is not None else 0
+    replaced = {}
+    visited = {op}
+    stack = [(op, iter(op.dependencies))]
+    while stack:
+        current, dependencies = stack[-1]
+        for dependency in dependencies:
+            if dependency not in visited:
+                visited.add(dependency)
+                stack.append((dependency, iter(dependency.dependencies)))
+                break
+        else:
+            stack.pop()
+            if not current.dynamic and any(replaced[inp] is not inp for inp in current.inputs):
+                current.inputs = [replaced[inp] for inp in current.inputs]
+            if any(isinstance(value, (ad.Operation, list, tuple, slice)) for value in current.params.values()):
+                current.params = {key: _replace_param(value, replaced) for key, value in current.params.items()}
+            result = current
+            while not result.dynamic:
+                for rule in RULES:
+                    rewritten = rule(result)
+                    if rewritten is not None:
+                        if report is not None:
+                            name = rule.__name__[len('_rule_'):]
+                            report[name] = report.get(name, 0) + 1
+                        result = rewritten
+                        break
+                else:
+                    break
+            replaced[current] = result
+    if report is not None:
+        report['removed'] = report.get('removed', 0) + before - _count_nodes(replaced[op])
+    return replaced[op]
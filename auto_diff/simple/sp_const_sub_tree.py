@@ -1,8 +1,50 @@
+import numpy as np
 import auto_diff as ad
+from auto_diff.op.op_shape import OpShape
+from auto_diff.op.op_in_train_phase import OpInTrainPhase
+from .sp_cse import _replace_param
+
+
+def _is_foldable(op: ad.Operation) -> bool:
+    """Whether the operation could be replaced by a constant."""
+    if isinstance(op, OpShape):
+        return None not in op.inputs[0].shape
+    if op.dynamic or not op.deterministic or isinstance(op, (ad.OpPlaceholder, ad.OpVariable, OpInTrainPhase)):
+        return False
+    dependencies = op.dependencies
+    return len(dependencies) > 0 and all(map(lambda x: isinstance(x, ad.OpConstant), dependencies))
 
 
 def sp_const_sub_tree(op: ad.Operation):
-    op.inputs = [sp_const_sub_tree(x) for x in op.inputs]
-    if len(op.inputs) > 0 and all(map(lambda x: isinstance(x, ad.OpConstant), op.inputs)):
-        return ad.OpConstant(op.forward())
-    return op
+    """Replace the sub-graphs that only depend on constants with constants.
+
+    Each operation is visited once in topological order, so the shared sub-graphs are folded only once. The shapes
+    that are fully known are regarded as constants as well.
+
+    :param op: The output operation.
+    :return: The output operation after folding.
+    """
+    folded = {}
+    visited = {op}
+    stack = [(op, iter(op.dependencies))]
+    while stack:
+        current, dependencies = stack[-1]
+        for dependency in dependencies:
+            if dependency not in visited:
+                visited.add(dependency)
+                stack.append((dependency, iter(dependency.dependencies)))
+                break
+        else:
+            stack.pop()
+            if not current.dynamic and any(folded[inp] is not inp for inp in current.inputs):
+                current.inputs = [folded[inp] for inp in current.inputs]
+            if any(isinstance(value, (ad.Operation, list, tuple, slice)) for value in current.params.values()):
+                current.params = {key: _replace_param(value, folded) for key, value in current.params.items()}
+            if isinstance(current, OpShape) and _is_foldable(current):
+                # The same integer array as the forward pass of the shape
+                folded[current] = ad.OpConstant(np.array(current.inputs[0].shape, dtype=np.int64), dtype=current.dtype)
+            elif _is_foldable(current):
+                folded[current] = ad.OpConstant(current.forward(), dtype=current.dtype)
+            else:
+                folded[current] = current
+    return folded[op]
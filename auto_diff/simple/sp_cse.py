@@ -0,0 +1,97 @@
+from typing import Hashable, Mapping, Optional, Set
+import numpy as np
+import auto_diff as ad
+from auto_diff.op.op_setitem import OpSetitem
+
+
+def _param_key(value, canonical: Mapping[ad.Operation, ad.Operation]) -> Hashable:
+    """Convert a parameter to a hashable key, raises `TypeError` if the parameter could not be compared."""
+    if isinstance(value, ad.Operation):
+        return ad.Operation, canonical[value]._op_index
+    if isinstance(value, (list, tuple)):
+        return type(value), tuple(_param_key(v, canonical) for v in value)
+    if isinstance(value, slice):
+        return slice, _param_key((value.start, value.stop, value.step), canonical)
+    if isinstance(value, np.ndarray):
+        raise TypeError('Arrays are not compared')
+    hash(value)
+    return type(value), value
+
+
+def _mutated(op: ad.Operation) -> Set[ad.Operation]:
+    """The operations that are modified in place by :class:`OpSetitem`."""
+    mutated, visited, stack = set(), {op}, [op]
+    while stack:
+        current = stack.pop()
+        if isinstance(current, OpSetitem):
+            mutated.add(current.inputs[0])
+        for dependency in current.dependencies:
+            if dependency not in visited:
+                visited.add(dependency)
+                stack.append(dependency)
+    return mutated
+
+
+def _node_key(op: ad.Operation,
+              canonical: Mapping[ad.Operation, ad.Operation],
+              mutated: Set[ad.Operation]) -> Optional[Hashable]:
+    """The structural key of the operation, None if the operation should never be merged."""
+    if isinstance(op, (ad.OpPlaceholder, ad.OpVariable, OpSetitem)) or op.dynamic or not op.deterministic:
+        return None
+    if op in mutated:
+        return None
+    if isinstance(op, ad.OpConstant):
+        if np.isscalar(op.x):
+            return ad.OpConstant, op.dtype, op.x
+        return None
+    try:
+        params = tuple((key, _param_key(value, canonical)) for key, value in sorted(op.params.items()))
+    except TypeError:
+        return None
+    return type(op), op.dtype, tuple(inp._op_index for inp in op.inputs), params
+
+
+def _replace_param(value, canonical: Mapping[ad.Operation, ad.Operation]):
+    if isinstance(value, ad.Operation):
+        return canonical[value]
+    if isinstance(value, (list, tuple)):
+        return type(value)(_replace_param(v, canonical) for v in value)
+    if isinstance(value, slice):
+        return slice(*_replace_param((value.start, value.stop, value.step), canonical))
+    return value
+
+
+def sp_cse(op: ad.Operation) -> ad.Operation:
+    """Common subexpression elimination.
+
+    The operations with the same type, the same parameters and the same inputs are merged into the first one found
+    in topological order. Placeholders, variables, non-scalar constants, dynamic operations, non-deterministic
+    operations, in-place assignments and their targets are never merged. The graph is modified in place.
+
+    :param op: The output operation.
+    :return: The output operation after merging.
+    """
+    canonical, keys = {}, {}
+    mutated = _mutated(op)
+    visited = {op}
+    stack = [(op, iter(op.dependencies))]
+    while stack:
+        current, dependencies = stack[-1]
+        for dependency in dependencies:
+            if dependency not in visited:
+                visited.add(dependency)
+                stack.append((dependency, iter(dependency.dependencies)))
+                break
+        else:
+            stack.pop()
+            if not current.dynamic and any(canonical[inp] is not inp for inp in current.inputs):
+                current.inputs = [canonical[inp] for inp in current.inputs]
+            params = {key: _replace_param(value, canonical) for key, value in current.params.items()}
+            if any(params[key] is not value for key, value in current.params.items()):
+                current.params = params
+            key = _node_key(current, canonical, mutated)
+            if key is None:
+                canonical[current] = current
+            else:
+                canonical[current] = keys.setdefault(key, current)
+    return canonical[op]
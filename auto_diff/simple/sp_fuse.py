@@ -0,0 +1,119 @@
+import auto_diff as ad
+from auto_diff.op.op_add import OpAdd
+from auto_diff.op.op_subtract import OpSubtract
+from auto_diff.op.op_multiply import OpMultiply
+from auto_diff.op.op_divide import OpDivide
+from auto_diff.op.op_negative import OpNegative
+from auto_diff.op.op_exp import OpExp
+from auto_diff.op.op_log import OpLog
+from auto_diff.op.op_tanh import OpTanh
+from auto_diff.op.op_sqrt import OpSqrt
+from auto_diff.op.op_square import OpSquare
+from auto_diff.op.op_sigmoid import OpSigmoid
+from auto_diff.op.op_maximum import OpMaximum
+from auto_diff.op.op_minimum import OpMinimum
+from auto_diff.op.op_fused import OpFused
+from .sp_cse import _replace_param
+
+#: The element-wise operations that could be fused and their kinds in :class:`OpFused`.
+ELEMENTWISE = {
+    OpAdd: 'add',
+    OpSubtract: 'subtract',
+    OpMultiply: 'multiply',
+    OpDivide: 'divide',
+    OpNegative: 'negative',
+    OpExp: 'exp',
+    OpLog: 'log',
+    OpTanh: 'tanh',
+    OpSqrt: 'sqrt',
+    OpSquare: 'square',
+    OpSigmoid: 'sigmoid',
+    OpMaximum: 'maximum',
+    OpMinimum: 'minimum',
+}
+
+
+def _fuse(root: ad.Operation, absorbed: set, replaced: dict) -> ad.Operation:
+    """Build the fused operation of the group whose output is the root."""
+    inputs, input_slots, instructions, slots = [], {}, [], {}
+    stack = [(root, iter(root.inputs))]
+    while stack:
+        op, op_inputs = stack[-1]
+        for inp in op_inputs:
+            if inp in absorbed and inp not in slots:
+                stack.append((inp, iter(inp.inputs)))
+                break
+        else:
+            stack.pop()
+            args = []
+            for inp in op.inputs:
+                if inp in absorbed:
+                    args.append(slots[inp])
+                elif isinstance(inp, ad.OpConstant) and isinstance(inp.x, float):
+                    args.append(inp.x)
+                else:
+                    inp = replaced[inp]
+                    if inp not in input_slots:
+                        input_slots[inp] = len(inputs)
+                        inputs.append(inp)
+                    args.append(inp)
+            slots[op] = len(instructions)
+            instructions.append((ELEMENTWISE[type(op)], args))
+    if len(instructions) < 2:
+        return root
+    num = len(inputs)
+    instructions = [
+        (kind, [input_slots[arg] if isinstance(arg, ad.Operation) else
+                (num + arg if isinstance(arg, int) else arg) for arg in args])
+        for kind, args in instructions
+    ]
+    return OpFused(inputs, instructions, root.shape)
+
+
+def sp_fuse(op: ad.Operation) -> ad.Operation:
+    """Fuse the adjacent element-wise operations into :class:`OpFused`.
+
+    An element-wise operation is absorbed into its consumer if the consumer is also element-wise and it is the only
+    consumer. Scalar constants become the arguments of the instructions.
+
+    :param op: The output operation.
+    :return: The output operation after fusion.
+    """
+    order, visited = [], {op}
+    stack = [(op, iter(op.dependencies))]
+    while stack:
+        current, dependencies = stack[-1]
+        for dependency in dependencies:
+            if dependency not in visited:
+                visited.add(dependency)
+                stack.append((dependency, iter(dependency.dependencies)))
+                break
+        else:
+            stack.pop()
+            order.append(current)
+    consumers = {current: [] for current in order}
+    for current in order:
+        for dependency in current.dependencies:
+            if current not in consumers[dependency]:
+                consumers[dependency].append(current)
+    absorbed = set()
+    for current in order:
+        users = consumers[current]
+        if current is not op and type(current) in ELEMENTWISE and len(users) == 1 and \
+                type(users[0]) in ELEMENTWISE:
+            absorbed.add(current)
+    replaced = {}
+    for current in order:
+        if current in absorbed:
+            continue
+        if type(current) in ELEMENTWISE:
+            fused = _fuse(current, absorbed, replaced)
+            if fused is not current:
+                replaced[current] = fused
+                continue
+        if not current.dynamic and any(replaced.get(inp, inp) is not inp for inp in current.inputs):
+            current.inputs = [replaced.get(inp, inp) for inp in current.inputs]
+        if any(isinstance(value, (ad.Operation, list, tuple, slice)) for value in current.params.values()):
+            current.params = {key: _replace_param(value, replaced) for key, value in current.params.items()}
+        replaced[current] = current
+    return replaced[op]
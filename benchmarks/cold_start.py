@@ -0,0 +1,41 @@
+import sys
+import time
+import tempfile
+import numpy as np
+import auto_diff as ad
+
+
+def build_model(num_layers: int, input_dim: int = 64, hidden_dim: int = 256) -> ad.models.Model:
+    input_layer = ad.layers.Input(shape=(None, None, input_dim))
+    layer = ad.layers.LSTM(units=hidden_dim, return_sequences=True)(input_layer)
+    layer = ad.layers.LSTM(units=hidden_dim)(layer)
+    for _ in range(num_layers):
+        layer = ad.layers.Dense(output_dim=hidden_dim, activation=ad.acts.relu)(layer)
+    output_layer = ad.layers.Dense(output_dim=10, activation=ad.acts.softmax)(layer)
+    model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+    model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy)
+    return model
+
+
+def main(num_layers: int = 100, repeat: int = 3):
+    """Compare the seconds of building the model and compiling the plan with loading the saved model."""
+    np.random.seed(0xcafe)
+    x = np.random.random((4, 8, 64))
+    model = build_model(num_layers)
+    model.predict_on_batch(x)
+    with tempfile.TemporaryDirectory() as directory:
+        ad.save(model, directory)
+        build_seconds, load_seconds = [], []
+        for _ in range(repeat):
+            start = time.time()
+            build_model(num_layers).predict_on_batch(x)
+            build_seconds.append(time.time() - start)
+            start = time.time()
+            ad.load(directory, mmap_mode='r').predict_on_batch(x)
+            load_seconds.append(time.time() - start)
+    build, load = min(build_seconds), min(load_seconds)
+    print('Rebuild: %.1f ms, load: %.1f ms, speedup %.2fx' % (build * 1e3, load * 1e3, build / load))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,37 @@
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import auto_diff as ad
+
+
+def build_model(input_dim: int = 512, hidden_dim: int = 1024) -> ad.models.Model:
+    input_layer = ad.layers.Input(shape=(None, input_dim))
+    hidden_layer = ad.layers.Dense(output_dim=hidden_dim, activation=ad.acts.relu)(input_layer)
+    hidden_layer = ad.layers.Dense(output_dim=hidden_dim, activation=ad.acts.relu)(hidden_layer)
+    output_layer = ad.layers.Dense(output_dim=10, activation=ad.acts.softmax)(hidden_layer)
+    model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+    model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy)
+    return model
+
+
+def main(num_requests: int = 64, max_workers: int = 4):
+    """Compare serving the requests one by one with serving them from a thread pool."""
+    np.random.seed(0xcafe)
+    model = build_model()
+    requests = [np.random.random((256, 512)) for _ in range(num_requests)]
+    model.predict_on_batch(requests[0])
+    start = time.time()
+    for x in requests:
+        model.predict_on_batch(x)
+    serial = time.time() - start
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        start = time.time()
+        list(executor.map(model.predict_on_batch, requests))
+        parallel = time.time() - start
+    print('Serial: %.1f ms, %d threads: %.1f ms, speedup %.2fx' % (
+        serial * 1e3, max_workers, parallel * 1e3, serial / parallel))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
@@ -0,0 +1,38 @@
+import sys
+import time
+import numpy as np
+import auto_diff as ad
+
+
+def build_model(num_workers: int, input_dim: int = 256, hidden_dim: int = 512) -> ad.models.Model:
+    np.random.seed(0xcafe)
+    input_layer = ad.layers.Input(shape=(None, input_dim))
+    hidden_layer = ad.layers.Dense(output_dim=hidden_dim, activation=ad.acts.relu)(input_layer)
+    hidden_layer = ad.layers.Dense(output_dim=hidden_dim, activation=ad.acts.relu)(hidden_layer)
+    output_layer = ad.layers.Dense(output_dim=10, activation=ad.acts.softmax)(hidden_layer)
+    model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+    model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy, num_workers=num_workers)
+    return model
+
+
+def main(num_steps: int = 16, num_workers: int = 4, batch_size: int = 1024):
+    """Compare the throughputs of training in one process and in multiple processes."""
+    np.random.seed(0xbeef)
+    x = np.random.random((batch_size, 256))
+    y = np.eye(10)[np.random.randint(0, 10, batch_size)]
+    throughputs = []
+    for workers in [0, num_workers]:
+        model = build_model(workers)
+        model.fit_on_batch(x, y)
+        start = time.time()
+        for _ in range(num_steps):
+            model.fit_on_batch(x, y)
+        throughputs.append(num_steps * batch_size / (time.time() - start))
+        model.close()
+    single, parallel = throughputs
+    print('Single process: %.0f samples/s, %d processes: %.0f samples/s, speedup %.2fx' % (
+        single, num_workers, parallel, parallel / single))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
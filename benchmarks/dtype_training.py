@@ -0,0 +1,51 @@
+import sys
+import time
+import numpy as np
+import auto_diff as ad
+
+
+def build_dense(dtype, input_dim: int = 256, hidden_dim: int = 512) -> ad.models.Model:
+    with ad.dtype_scope(dtype):
+        input_layer = ad.layers.Input(shape=(None, input_dim))
+        hidden_layer = ad.layers.Dense(output_dim=hidden_dim, activation=ad.acts.relu)(input_layer)
+        hidden_layer = ad.layers.Dense(output_dim=hidden_dim, activation=ad.acts.relu)(hidden_layer)
+        output_layer = ad.layers.Dense(output_dim=10, activation=ad.acts.softmax)(hidden_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+    model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy)
+    return model
+
+
+def build_lstm(dtype, input_dim: int = 64, units: int = 128) -> ad.models.Model:
+    with ad.dtype_scope(dtype):
+        input_layer = ad.layers.Input(shape=(None, None, input_dim))
+        lstm_layer = ad.layers.LSTM(units=units)(input_layer)
+        output_layer = ad.layers.Dense(output_dim=10, activation=ad.acts.softmax)(lstm_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+    model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy)
+    return model
+
+
+def measure(model: ad.models.Model, x: np.ndarray, y: np.ndarray, steps: int) -> float:
+    """The average seconds of a training step, the first step is excluded."""
+    model.fit_on_batch(x, y)
+    start = time.time()
+    for _ in range(steps):
+        model.fit_on_batch(x, y)
+    return (time.time() - start) / steps
+
+
+def main(steps: int = 10):
+    np.random.seed(0xcafe)
+    labels = np.eye(10)[np.random.randint(0, 10, 256)]
+    cases = [
+        ('Dense', build_dense, np.random.random((256, 256))),
+        ('LSTM', build_lstm, np.random.random((256, 20, 64))),
+    ]
+    for name, build, x in cases:
+        seconds = {dtype: measure(build(dtype), x, labels, steps) for dtype in ['float64', 'float32']}
+        print('%s: float64 %.1f ms/step, float32 %.1f ms/step, speedup %.2fx' % (
+            name, seconds['float64'] * 1e3, seconds['float32'] * 1e3, seconds['float64'] / seconds['float32']))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
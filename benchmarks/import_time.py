@@ -0,0 +1,25 @@
+import sys
+import subprocess
+import time
+
+
+def measure(code: str, repeat: int) -> float:
+    """The minimum seconds of running the code in a new interpreter."""
+    seconds = []
+    for _ in range(repeat):
+        start = time.time()
+        subprocess.check_call([sys.executable, '-c', code])
+        seconds.append(time.time() - start)
+    return min(seconds)
+
+
+def main(repeat: int = 10):
+    baseline = measure('import numpy', repeat)
+    lazy = measure('import auto_diff', repeat)
+    eager = measure('import auto_diff as ad, scipy.stats; ad.inits, ad.losses, ad.layers, ad.optims, ad.models',
+                    repeat)
+    print('numpy: %.1f ms, lazy: %.1f ms, all modules: %.1f ms' % (baseline * 1e3, lazy * 1e3, eager * 1e3))
+
+
+if __name__ == '__main__':
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10)
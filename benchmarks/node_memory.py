@@ -0,0 +1,25 @@
+import sys
+import tracemalloc
+import auto_diff as ad
+
+
+def measure_node_memory(num_nodes: int = 100000) -> float:
+    """Measure the average number of bytes allocated for each node of a chain of element-wise operations.
+
+    :param num_nodes: The number of operations in the chain.
+    :return: Bytes per node, including the inputs lists and the params dicts.
+    """
+    x = ad.placeholder(shape=(None,), name='X')
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    y = x
+    for _ in range(num_nodes):
+        y = ad.exp(y)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / num_nodes
+
+
+if __name__ == '__main__':
+    num = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    print('%.1f bytes per node' % measure_node_memory(num))
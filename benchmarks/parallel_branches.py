@@ -0,0 +1,37 @@
+import sys
+import time
+import numpy as np
+import auto_diff as ad
+
+
+def build_graph(num_branches: int = 4, dim: int = 1024):
+    x = ad.placeholder(shape=(None, dim), name='X')
+    weights = [ad.variable(np.random.random((dim, dim)) / dim) for _ in range(num_branches)]
+    y = ad.sum(ad.tanh(ad.dot(x, weights[0])))
+    for weight in weights[1:]:
+        y = y + ad.sum(ad.tanh(ad.dot(x, weight)))
+    return x, weights, y
+
+
+def main(num_runs: int = 16, num_threads: int = 4):
+    """Compare evaluating independent matrix multiplications one by one with evaluating them on a thread pool."""
+    np.random.seed(0xcafe)
+    x, weights, y = build_graph()
+    val = np.random.random((512, 1024))
+    timings = []
+    for threads in [0, num_threads]:
+        sess = ad.Session(num_threads=threads)
+        sess.gradients(y, weights, feed_dict={x: val})
+        start = time.time()
+        for _ in range(num_runs):
+            sess.prepare()
+            sess.gradients(y, weights, feed_dict={x: val})
+        timings.append(time.time() - start)
+        sess.close()
+    serial, parallel = timings
+    print('Serial: %.1f ms, %d threads: %.1f ms, speedup %.2fx' % (
+        serial * 1e3, num_threads, parallel * 1e3, serial / parallel))
+
+
+if __name__ == '__main__':
+    main(*map(int, sys.argv[1:]))
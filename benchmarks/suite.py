@@ -0,0 +1,365 @@
+"""Benchmarks of the operations, the layers and the demos.
+
+Each case is measured at several sizes, the median forward time, the median backward time and the peak bytes
+allocated in a step are written to a JSON file, e.g.:
+
+    python benchmarks/suite.py --output base.json
+    python benchmarks/suite.py --output head.json --filter op/dot,layer/
+    python benchmarks/suite.py --compare base.json head.json --threshold 0.2
+
+The comparison exits with a non-zero status if any of the times becomes slower by more than the threshold.
+"""
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+import subprocess
+import tracemalloc
+from typing import Callable, List, Optional
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+import auto_diff as ad  # noqa: E402
+
+#: The sizes of the cases, the meaning of the values depends on the cases.
+SIZES = ('small', 'medium', 'large')
+
+
+def _matrix(n: int, positive: bool = False) -> np.ndarray:
+    val = np.random.random((n, n))
+    if positive:
+        val += 0.5
+    return val
+
+
+def _unary(fn: Callable, positive: bool = False, differentiable: bool = True, batch: bool = True):
+    def _build(n: int):
+        x = ad.placeholder(shape=(None if batch else n, n), name='X')
+        return fn(x), {x: _matrix(n, positive)}, [x] if differentiable else None
+    return _build
+
+
+def _binary(fn: Callable, positive: bool = False, differentiable: bool = True):
+    def _build(n: int):
+        x = ad.placeholder(shape=(None, n), name='X')
+        y = ad.placeholder(shape=(None, n), name='Y')
+        return fn(x, y), {x: _matrix(n, positive), y: _matrix(n, positive)}, [x, y] if differentiable else None
+    return _build
+
+
+def _squeeze(n: int):
+    x = ad.placeholder(shape=(None, 1, n), name='X')
+    return ad.squeeze(x, axis=1), {x: np.random.random((n, 1, n))}, [x]
+
+
+def _variable(n: int):
+    w = ad.variable(_matrix(n), name='W')
+    return w * 1.0, {}, [w]
+
+
+def _conv2d(n: int):
+    x = ad.placeholder(shape=(None, n // 4, n // 4, 4), name='X')
+    w = ad.variable(np.random.random((3 * 3 * 4, 8)), name='W')
+    y = ad.conv2d(x, w, kernel_size=3, pad_width=1)
+    return y, {x: np.random.random((2, n // 4, n // 4, 4))}, [x, w]
+
+
+def _pool2d(fn: Callable):
+    def _build(n: int):
+        x = ad.placeholder(shape=(None, n // 2, n // 2, 4), name='X')
+        return fn(x, pool_size=2), {x: np.random.random((2, n // 2, n // 2, 4))}, [x]
+    return _build
+
+
+def _map_fn(n: int):
+    x = ad.placeholder(shape=(n, n), name='X')
+    return ad.map_fn(lambda row: ad.square(row), x), {x: _matrix(n)}, [x]
+
+
+def _while_loop(n: int):
+    x = ad.placeholder(shape=(n, n), name='X')
+    w = ad.variable(_matrix(n) / n, name='W')
+    y = ad.while_loop(
+        cond=lambda inputs: ad.less(inputs[0], ad.constant(8)),
+        body=lambda inputs: [inputs[0] + 1, ad.tanh(ad.dot(inputs[1], w))],
+        loop_vars=[ad.variable(0), x],
+        output_index=1,
+    )
+    return y, {x: _matrix(n)}, [w]
+
+
+#: The operations in `auto_diff.op` and the sizes of the square matrices.
+OP_SIZES = {'small': 16, 'medium': 128, 'large': 512}
+OP_CASES = {
+    'array': lambda n: (ad.array(_matrix(n)) * 1.0, {}, None),
+    'constant': lambda n: (ad.constant(_matrix(n)) * 1.0, {}, None),
+    'placeholder': _unary(lambda x: x),
+    'variable': _variable,
+    'setitem': _unary(lambda x: ad.setitem(ad.zeros_like(x), 0, ad.constant(1.0)), differentiable=False),
+    'ones': lambda n: (ad.ones((n, n)), {}, None),
+    'zeros': lambda n: (ad.zeros((n, n)), {}, None),
+    'ones_like': _unary(ad.ones_like, differentiable=False),
+    'zeros_like': _unary(ad.zeros_like, differentiable=False),
+    'random': lambda n: (ad.random((n, n)), {}, None),
+    'arange': lambda n: (ad.arange(n * n), {}, None),
+    'transpose': _unary(ad.transpose),
+    'reshape': _unary(lambda x: ad.reshape(x, (-1,)), batch=False),
+    'flatten': _unary(ad.flatten),
+    'expand_dims': _unary(lambda x: ad.expand_dims(x, axis=0)),
+    'squeeze': _squeeze,
+    'shape': _unary(ad.shape, differentiable=False),
+    'pad': _unary(lambda x: ad.pad(x, 1)),
+    'sum': _unary(lambda x: ad.sum(x, axis=-1)),
+    'prod': _unary(lambda x: ad.prod(x, axis=-1), positive=True),
+    'mean': _unary(lambda x: ad.mean(x, axis=-1)),
+    'max': _unary(lambda x: ad.max(x, axis=-1)),
+    'min': _unary(lambda x: ad.min(x, axis=-1)),
+    'argmax': _unary(lambda x: ad.argmax(x, axis=-1), differentiable=False),
+    'square': _unary(ad.square),
+    'sqrt': _unary(ad.sqrt, positive=True),
+    'exp': _unary(ad.exp),
+    'log': _unary(ad.log, positive=True),
+    'tanh': _unary(ad.tanh),
+    'sigmoid': _unary(ad.sigmoid),
+    'add': _binary(ad.add),
+    'subtract': _binary(ad.subtract),
+    'multiply': _binary(ad.multiply),
+    'divide': _binary(ad.divide, positive=True),
+    'dot': _binary(ad.dot),
+    'negative': _unary(ad.negative),
+    'equal': _binary(ad.equal, differentiable=False),
+    'less': _binary(ad.less, differentiable=False),
+    'greater': _binary(ad.greater, differentiable=False),
+    'where': _binary(lambda x, y: ad.where(ad.less(x, y), x, y)),
+    'power': _binary(ad.power, positive=True),
+    'maximum': _binary(ad.maximum),
+    'minimum': _binary(ad.minimum),
+    'conv2d': _conv2d,
+    'max_pool2d': _pool2d(ad.max_pool2d),
+    'avg_pool2d': _pool2d(ad.avg_pool2d),
+    'map_fn': _map_fn,
+    'while_loop': _while_loop,
+    'in_train_phase': _unary(lambda x: x * ad.in_train_phase(), differentiable=False),
+}
+
+
+def _layer(build_layer: Callable, input_shape: tuple):
+    def _build(_):
+        input_layer = ad.layers.Input(shape=(None,) + input_shape[1:])
+        layer = build_layer()(input_layer)
+        return layer.outputs, {input_layer.placeholder: np.random.random(input_shape)}, layer.trainable_weights
+    return _build
+
+
+#: The layers and their input shapes.
+LAYER_CASES = {
+    'Dense': {
+        size: _layer(lambda n=n: ad.layers.Dense(output_dim=n, activation=ad.acts.relu), (n, n))
+        for size, n in OP_SIZES.items()
+    },
+    'Conv2D': {
+        size: _layer(lambda n=n: ad.layers.Conv2D(filters=8, kernel_size=3, padding='same'), (2, n, n, 3))
+        for size, n in [('small', 4), ('medium', 8), ('large', 16)]
+    },
+    'MaxPool2D': {
+        size: _layer(lambda: ad.layers.MaxPool2D(pool_size=2), (2, n, n, 8))
+        for size, n in [('small', 8), ('medium', 32), ('large', 128)]
+    },
+    'GlobalAveragePooling2D': {
+        size: _layer(lambda: ad.layers.GlobalAveragePooling2D(), (2, n, n, 8))
+        for size, n in [('small', 8), ('medium', 32), ('large', 128)]
+    },
+    'LSTM': {
+        size: _layer(lambda n=n: ad.layers.LSTM(units=n), (8, n // 2, n))
+        for size, n in [('small', 8), ('medium', 32), ('large', 128)]
+    },
+    'GRU': {
+        size: _layer(lambda n=n: ad.layers.GRU(units=n), (8, n // 2, n))
+        for size, n in [('small', 8), ('medium', 32), ('large', 128)]
+    },
+    'BatchNorm': {
+        size: _layer(lambda: ad.layers.BatchNorm(), (n, n))
+        for size, n in OP_SIZES.items()
+    },
+    'Dropout': {
+        size: _layer(lambda: ad.layers.Dropout(rate=0.5), (n, n))
+        for size, n in OP_SIZES.items()
+    },
+}
+
+
+def _median(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    return statistics.median(values)
+
+
+def measure(y: ad.Operation, feed_dict: dict, wrt: Optional[list], repeat: int) -> dict:
+    """Measure the forward pass of the operation and its backward pass with respect to the targets.
+
+    :param y: The operation to be evaluated.
+    :param feed_dict: The feed dictionary.
+    :param wrt: The targets of the gradients, the backward pass is not measured if it is None.
+    :param repeat: The number of measurements, the medians are reported.
+    :return: The times in seconds and the peak bytes allocated in a step.
+    """
+    feed_dict = dict(feed_dict)
+    feed_dict.setdefault(ad.Operation.KEY_TRAINING, True)
+    sess = ad.Session()
+
+    def _step(forward_times, backward_times):
+        sess.prepare()
+        start = time.perf_counter()
+        sess.run(y, feed_dict=dict(feed_dict))
+        forward_times.append(time.perf_counter() - start)
+        if wrt is not None:
+            start = time.perf_counter()
+            y.backward(wrt)
+            backward_times.append(time.perf_counter() - start)
+
+    _step([], [])
+    forward, backward = [], []
+    for _ in range(repeat):
+        _step(forward, backward)
+    tracemalloc.start()
+    _step([], [])
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'forward': _median(forward), 'backward': _median(backward), 'peak_bytes': peak}
+
+
+def measure_demo(module, steps: int) -> dict:
+    """Train the model of a linear demo with the same loop as the demo for a fixed number of steps."""
+    np.random.seed(0xcafe)
+    config = module.gen_config({'input_len': 10, 'batch_size': 256})
+    _, loss, (x, y_true), variables = module.gen_linear_model(config)
+    sess = ad.Session()
+    forward, backward = [], []
+    batches = module.data_generator(config)
+    for step in range(steps + 2):
+        batch_x, batch_y = next(batches)
+        if step == steps + 1:
+            tracemalloc.start()
+        sess.prepare()
+        start = time.perf_counter()
+        sess.run(loss, feed_dict={x: batch_x, y_true: batch_y})
+        middle = time.perf_counter()
+        loss.backward()
+        for var in variables:
+            var.update_add(-config['learning_rate'] * var.gradient)
+        end = time.perf_counter()
+        if 0 < step <= steps:
+            forward.append(middle - start)
+            backward.append(end - middle)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    step_time = _median(forward) + _median(backward)
+    return {
+        'forward': _median(forward),
+        'backward': _median(backward),
+        'peak_bytes': peak,
+        'samples_per_second': config['batch_size'] / step_time,
+    }
+
+
+def run(filters: Optional[List[str]], sizes: List[str], repeat: int, steps: int) -> dict:
+    cases = []
+    for name, build in OP_CASES.items():
+        for size in sizes:
+            cases.append(('op/' + name, size, lambda build=build, size=size: measure(
+                *build(OP_SIZES[size]), repeat=repeat)))
+    for name, builds in LAYER_CASES.items():
+        for size in sizes:
+            cases.append(('layer/' + name, size, lambda build=builds[size]: measure(*build(None), repeat=repeat)))
+    from demos.basic.linear import classification, regression
+    for name, module in [('classification', classification), ('regression', regression)]:
+        cases.append(('demo/linear/' + name, '256', lambda module=module: measure_demo(module, steps)))
+    results = []
+    for name, size, bench in cases:
+        if filters and not any(pattern in name for pattern in filters):
+            continue
+        np.random.seed(0xbeef)
+        result = {'name': name, 'size': size}
+        result.update(bench())
+        results.append(result)
+        print('%-36s %-8s forward %10.3f ms  backward %10s  peak %12d B' % (
+            name, size, result['forward'] * 1e3,
+            '%.3f ms' % (result['backward'] * 1e3) if result['backward'] is not None else '-',
+            result['peak_bytes']), file=sys.stderr)
+    return {
+        'meta': _meta(),
+        'missing': sorted(set(ad.op.shortcuts.__all__) - set(OP_CASES)),
+        'results': results,
+    }
+
+
+def _meta() -> dict:
+    try:
+        commit = subprocess.check_output(['git', 'rev-parse', 'HEAD'], cwd=ROOT, stderr=subprocess.DEVNULL)
+        commit = commit.decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'machine': platform.machine(),
+        'processor': platform.processor(),
+    }
+
+
+def compare(base_path: str, head_path: str, threshold: float) -> bool:
+    """Print the ratios of the times, the cases slower than `1 + threshold` are marked.
+
+    :return: Whether there is no regression.
+    """
+    with open(base_path) as reader:
+        base = {(result['name'], result['size']): result for result in json.load(reader)['results']}
+    with open(head_path) as reader:
+        head = json.load(reader)['results']
+    passed = True
+    for result in head:
+        old = base.get((result['name'], result['size']))
+        if old is None:
+            continue
+        ratios = []
+        for key in ['forward', 'backward']:
+            if result[key] is not None and old[key]:
+                ratio = result[key] / old[key]
+                mark = ''
+                if ratio > 1.0 + threshold:
+                    mark, passed = ' !', False
+                ratios.append('%s %.2fx%s' % (key, ratio, mark))
+        print('%-36s %-8s %s' % (result['name'], result['size'], '  '.join(ratios)))
+    return passed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmarks of auto_diff')
+    parser.add_argument('--output', default='benchmark.json', help='The path of the JSON results')
+    parser.add_argument('--filter', default='', help='Comma separated substrings of the case names')
+    parser.add_argument('--sizes', default=','.join(SIZES), help='Comma separated sizes')
+    parser.add_argument('--repeat', type=int, default=5, help='The number of measured steps')
+    parser.add_argument('--steps', type=int, default=50, help='The number of training steps of the demos')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'HEAD'), help='Compare two results')
+    parser.add_argument('--threshold', type=float, default=0.2, help='The tolerance of slowdowns')
+    args = parser.parse_args()
+    if args.compare:
+        sys.exit(0 if compare(args.compare[0], args.compare[1], args.threshold) else 1)
+    filters = [pattern for pattern in args.filter.split(',') if pattern]
+    report = run(filters, [size for size in args.sizes.split(',') if size], args.repeat, args.steps)
+    if report['missing']:
+        print('Operations without benchmarks: %s' % ', '.join(report['missing']), file=sys.stderr)
+    with open(args.output, 'w') as writer:
+        json.dump(report, writer, indent=2)
+
+
+if __name__ == '__main__':
+    main()
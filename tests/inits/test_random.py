@@ -22,3 +22,16 @@ class TestRandom(TestCase):
         weights = weights.flatten()
         self.assertTrue(0.1 <= np.min(weights))
         self.assertTrue(np.max(weights) <= 0.3)
+
+    def test_truncated_normal(self):
+        weights = ad.inits.truncated_normal(loc=0.1, scale=0.05, lower=0.0, upper=0.2)(shape=(300, 500))
+        self.assertEqual((300, 500), weights.shape)
+        self.assertTrue(0.0 <= np.min(weights))
+        self.assertTrue(np.max(weights) <= 0.2)
+        self.assertTrue(abs(np.mean(weights) - 0.1) < 1e-3)
+        self.assertTrue(abs(np.std(weights) - 0.05 * 0.8796) < 1e-3)
+
+    def test_truncated_normal_tail(self):
+        weights = ad.inits.truncated_normal(loc=0.0, scale=1.0, lower=3.0, upper=4.0)(shape=(1000,))
+        self.assertTrue(3.0 <= np.min(weights))
+        self.assertTrue(np.max(weights) <= 4.0)
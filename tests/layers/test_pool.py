@@ -0,0 +1,74 @@
+from unittest import TestCase
+import numpy as np
+import auto_diff as ad
+
+
+class TestPool2D(TestCase):
+
+    def _predict(self, layer, val, input_shape=(None, None, None, 3)):
+        input_layer = ad.layers.Input(shape=input_shape)
+        model = ad.models.Model(inputs=input_layer, outputs=layer(input_layer))
+        return layer, model.predict_on_batch(val)
+
+    def test_max_pool_valid(self):
+        val = np.random.random((2, 6, 6, 3))
+        layer, output = self._predict(ad.layers.MaxPool2D(pool_size=2), val)
+        expect = val.reshape((2, 3, 2, 3, 2, 3)).max(axis=(2, 4))
+        self.assertEqual((None, None, None, 3), layer.output_shapes)
+        self.assertTrue(np.allclose(expect, output), (expect, output))
+
+    def test_average_pool_valid(self):
+        val = np.random.random((2, 6, 6, 3))
+        layer, output = self._predict(ad.layers.AveragePooling2D(pool_size=2), val)
+        expect = val.reshape((2, 3, 2, 3, 2, 3)).mean(axis=(2, 4))
+        self.assertTrue(np.allclose(expect, output), (expect, output))
+
+    def test_output_shape_same(self):
+        val = np.random.random((2, 5, 5, 3))
+        layer, output = self._predict(
+            ad.layers.MaxPool2D(pool_size=(3, 3), strides=1, padding='same'),
+            val,
+            input_shape=(None, 5, 5, 3),
+        )
+        self.assertEqual((None, 5, 5, 3), layer.output_shapes)
+        self.assertEqual((2, 5, 5, 3), output.shape)
+        layer, output = self._predict(
+            ad.layers.AveragePooling2D(pool_size=3, strides=2, padding='same'),
+            val,
+            input_shape=(None, 5, 5, 3),
+        )
+        self.assertEqual((None, 3, 3, 3), layer.output_shapes)
+        self.assertEqual((2, 3, 3, 3), output.shape)
+
+    def test_invalid_padding(self):
+        with self.assertRaises(NotImplementedError):
+            ad.layers.MaxPool2D(pool_size=2, padding='invalid')
+
+    def test_global_pool(self):
+        val = np.random.random((2, 5, 4, 3))
+        layer, output = self._predict(ad.layers.GlobalMaxPool2D(), val)
+        self.assertEqual((None, 3), layer.output_shapes)
+        self.assertTrue(np.allclose(val.max(axis=(1, 2)), output))
+        layer, output = self._predict(ad.layers.GlobalAveragePooling2D(), val)
+        self.assertEqual((None, 3), layer.output_shapes)
+        self.assertTrue(np.allclose(val.mean(axis=(1, 2)), output))
+
+    def test_fit(self):
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, 8, 8, 1))
+        conv_layer = ad.layers.Conv2D(kernel_size=3, filters=4, padding='same', activation=ad.acts.relu)(input_layer)
+        pool_layer = ad.layers.MaxPool2D(pool_size=2)(conv_layer)
+        avg_layer = ad.layers.AveragePooling2D(pool_size=2)(pool_layer)
+        global_layer = ad.layers.GlobalAveragePooling2D()(avg_layer)
+        output_layer = ad.layers.Dense(output_dim=1)(global_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(
+            optimizer=ad.optims.Adam(lr=1e-2),
+            losses=ad.losses.mean_square_error,
+        )
+        x = np.random.random((16, 8, 8, 1))
+        y = x.max(axis=(1, 2))
+        first = model.evaluate(x, y)
+        for _ in range(50):
+            model.fit_on_batch(x, y)
+        self.assertLess(model.evaluate(x, y), first)
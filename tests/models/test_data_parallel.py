@@ -0,0 +1,134 @@
+import os
+import tempfile
+from unittest import TestCase
+import numpy as np
+import auto_diff as ad
+
+
+class TestDataParallel(TestCase):
+
+    @staticmethod
+    def _model(num_workers, norm=False, loss_scale=None):
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, 4))
+        hidden_layer = ad.layers.Dense(output_dim=8, activation=ad.acts.sigmoid)(input_layer)
+        if norm:
+            hidden_layer = ad.layers.BatchNorm()(hidden_layer)
+        output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(hidden_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy,
+                    loss_scale=loss_scale, num_workers=num_workers)
+        model.predict_on_batch(np.zeros((1, 4)))
+        return model
+
+    @staticmethod
+    def _data():
+        np.random.seed(0xbeef)
+        x = np.random.random((13, 4))
+        y = np.eye(2)[(x.sum(axis=-1) > 2.0).astype(np.int64)]
+        return x, y
+
+    def test_same_as_serial(self):
+        x, y = self._data()
+        serial, parallel = self._model(0), self._model(3)
+        try:
+            for _ in range(5):
+                serial.fit_on_batch(x, y)
+                parallel.fit_on_batch(x, y)
+            for expect, actual in zip(serial.trainable_weights, parallel.trainable_weights):
+                self.assertTrue(np.allclose(expect.x, actual.x))
+            parallel.fit_on_batch(x[:2], y[:2])
+        finally:
+            parallel.close()
+        self.assertFalse(parallel._parallel.started)
+
+    @staticmethod
+    def _lazy_model(num_workers, recurrent=False):
+        np.random.seed(0xcafe)
+        if recurrent:
+            input_layer = ad.layers.Input(shape=(None, None, 4))
+            hidden_layer = ad.layers.GRU(units=6, return_sequences=True)(input_layer)
+            hidden_layer = ad.layers.LSTM(units=8)(hidden_layer)
+        else:
+            input_layer = ad.layers.Input(shape=(None, 4))
+            hidden_layer = ad.layers.Dense(output_dim=8, activation=ad.acts.sigmoid)(input_layer)
+        output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(hidden_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy, num_workers=num_workers)
+        return model
+
+    def _check_lazy_initialization(self, x, y, recurrent):
+        serial = self._lazy_model(0, recurrent)
+        for _ in range(3):
+            serial.fit_on_batch(x, y)
+        parallel = self._lazy_model(2, recurrent)
+        try:
+            self.assertTrue(parallel._parallel.started)
+            self.assertTrue(all(weight.x is None for weight in parallel.trainable_weights))
+            for _ in range(3):
+                parallel.fit_on_batch(x, y)
+        finally:
+            parallel.close()
+        for expect, actual in zip(serial.trainable_weights, parallel.trainable_weights):
+            self.assertTrue(np.allclose(expect.x, actual.x))
+
+    def test_started_when_built(self):
+        x, y = self._data()
+        self._check_lazy_initialization(x, y, recurrent=False)
+
+    def test_recurrent(self):
+        x, y = self._data()
+        x = np.stack([x, x[::-1], x * 0.5], axis=1)
+        self._check_lazy_initialization(x, y, recurrent=True)
+
+    def test_loss_scale(self):
+        x, y = self._data()
+        serial, parallel = self._model(0, loss_scale='dynamic'), self._model(2, loss_scale='dynamic')
+        try:
+            for _ in range(3):
+                serial.fit_on_batch(x, y)
+                parallel.fit_on_batch(x, y)
+        finally:
+            parallel.close()
+        for expect, actual in zip(serial.trainable_weights, parallel.trainable_weights):
+            self.assertTrue(np.allclose(expect.x, actual.x))
+
+    def test_fit(self):
+        x, y = self._data()
+        model = self._model(2, norm=True)
+        try:
+            for _ in range(500):
+                model.fit_on_batch(x, y)
+        finally:
+            model.close()
+        actual = np.argmax(model.predict_on_batch(x), axis=-1).tolist()
+        self.assertEqual(np.argmax(y, axis=-1).tolist(), actual)
+
+    def test_error(self):
+        model = self._model(2)
+        try:
+            with self.assertRaises(ValueError):
+                model.fit_on_batch(np.ones((4, 3)), np.ones((4, 2)))
+            x, y = self._data()
+            model.fit_on_batch(x, y)
+        finally:
+            model.close()
+
+    def test_save(self):
+        x, y = self._data()
+        model = self._model(2)
+        try:
+            model.fit_on_batch(x, y)
+            with tempfile.TemporaryDirectory() as directory:
+                ad.save(model, os.path.join(directory, 'model'))
+                loaded = ad.load(os.path.join(directory, 'model'))
+        finally:
+            model.close()
+        try:
+            loaded.fit_on_batch(x, y)
+            model.fit_on_batch(x, y)
+        finally:
+            loaded.close()
+            model.close()
+        for expect, actual in zip(model.trainable_weights, loaded.trainable_weights):
+            self.assertTrue(np.allclose(expect.x, actual.x))
@@ -0,0 +1,80 @@
+from unittest import TestCase
+import numpy as np
+import auto_diff as ad
+from auto_diff.models.data import Prefetcher
+
+
+class TestFit(TestCase):
+
+    @staticmethod
+    def _model():
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, 4))
+        hidden_layer = ad.layers.Dense(output_dim=8, activation=ad.acts.sigmoid)(input_layer)
+        output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(hidden_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(optimizer=ad.optims.Adam(lr=1e-2), losses=ad.losses.cross_entropy)
+        model.predict_on_batch(np.zeros((1, 4)))
+        return model
+
+    @staticmethod
+    def _data(num=50):
+        np.random.seed(0xbeef)
+        x = np.random.random((num, 4))
+        y = np.eye(2)[(x.sum(axis=-1) > 2.0).astype(np.int64)]
+        return x, y
+
+    def test_fit(self):
+        x, y = self._data()
+        model = self._model()
+        initial = model.evaluate(x, y, batch_size=7)
+        history = model.fit(x, y, batch_size=8, epochs=30)
+        self.assertEqual(30, len(history))
+        self.assertEqual(50, history[-1]['samples'])
+        self.assertGreater(history[-1]['samples_per_second'], 0.0)
+        self.assertLess(history[-1]['loss'], history[0]['loss'])
+        self.assertLess(model.evaluate(x, y), initial)
+        self.assertTrue(np.allclose(model.predict_on_batch(x), model.predict(x, batch_size=16)))
+
+    def test_same_as_batches(self):
+        x, y = self._data()
+        expect, actual = self._model(), self._model()
+        for begin in range(0, 50, 16):
+            expect.fit_on_batch(x[begin:begin + 16], y[begin:begin + 16])
+        actual.fit(x, y, batch_size=16, shuffle=False, prefetch=2)
+        for expect_weight, actual_weight in zip(expect.trainable_weights, actual.trainable_weights):
+            self.assertTrue(np.allclose(expect_weight.x, actual_weight.x))
+        expect_loss = np.mean([expect.evaluate_on_batch(x[i:i + 1], y[i:i + 1]) for i in range(50)])
+        self.assertAlmostEqual(expect_loss, actual.evaluate(x, y, batch_size=9, prefetch=0))
+
+    def test_generator(self):
+        x, y = self._data()
+        model = self._model()
+
+        def _generate():
+            while True:
+                for begin in range(0, 50, 10):
+                    yield x[begin:begin + 10], y[begin:begin + 10]
+
+        history = model.fit(_generate(), epochs=3, steps_per_epoch=5)
+        self.assertEqual([50, 50, 50], [epoch['samples'] for epoch in history])
+        self.assertGreater(model.evaluate(_generate(), steps=3), 0.0)
+        predicted = model.predict((x[begin:begin + 10] for begin in range(0, 50, 10)))
+        self.assertTrue(np.allclose(model.predict_on_batch(x), predicted))
+
+    def test_prefetch_error(self):
+        def _generate():
+            yield 1
+            raise ValueError('Broken')
+
+        with Prefetcher(_generate(), buffer_size=1) as batches:
+            self.assertEqual(1, next(batches))
+            with self.assertRaises(ValueError):
+                next(batches)
+            with self.assertRaises(StopIteration):
+                next(batches)
+
+    def test_prefetch_close(self):
+        with Prefetcher(iter(range(100)), buffer_size=2) as batches:
+            self.assertEqual([0, 1, 2], [next(batches) for _ in range(3)])
+        self.assertFalse(batches._thread.is_alive())
@@ -0,0 +1,85 @@
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+
+
+class TestDtype(TestCase):
+
+    def test_default(self):
+        self.assertEqual(np.float64, ad.floatx())
+        self.assertEqual(np.float64, ad.variable(np.ones(3, dtype=np.float32)).forward().dtype)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ad.set_floatx('int32')
+        with self.assertRaises(ValueError):
+            with ad.dtype_scope(np.int64):
+                pass
+
+    def test_set_floatx(self):
+        ad.set_floatx('float32')
+        try:
+            self.assertEqual(np.float32, ad.constant([1.0, 2.0, 3.0]).forward().dtype)
+        finally:
+            ad.set_floatx('float64')
+        self.assertEqual(np.float64, ad.constant(np.ones(3, dtype=np.float32)).forward().dtype)
+
+    def test_non_float_constants(self):
+        with ad.dtype_scope('float32'):
+            self.assertEqual(np.int64, ad.constant(np.array([1, 2, 3], dtype=np.int64)).forward().dtype)
+            self.assertEqual(np.bool_, ad.constant(np.array([True, False])).forward().dtype)
+            self.assertEqual(np.float32, ad.constant(np.ones(3, dtype=np.float64)).forward().dtype)
+
+    def test_generated_values(self):
+        with ad.dtype_scope('float32'):
+            x = ad.placeholder(shape=(None, 3))
+            ops = [
+                ad.ones((2, 3)), ad.zeros((2, 3)), ad.random((2, 3)), ad.arange(3), ad.in_train_phase(),
+                ad.equal(x, x), x < 0.5, x > 0.5, ad.sigmoid(x),
+                ad.variable(ad.inits.glorot_normal, shape=(3, 2)), ad.variable(np.ones(2)),
+            ]
+        self.assertEqual(np.float64, ad.floatx())
+        sess = ad.Session()
+        for op in ops:
+            self.assertEqual(np.float32, np.asarray(sess.run(op, feed_dict={x: np.random.random((2, 3))})).dtype, op)
+
+    def test_gradients(self):
+        with ad.dtype_scope('float32'):
+            x = ad.placeholder(shape=(None, 3))
+            w = ad.variable(ad.inits.glorot_normal, shape=(3, 2))
+            b = ad.variable(ad.inits.zeros, shape=(2,))
+            y = ad.max(ad.mean(ad.square(ad.acts.softmax(ad.dot(x, w) + b)), axis=0))
+        sess = ad.Session()
+        self.assertEqual(np.float32, np.asarray(sess.run(y, feed_dict={x: np.random.random((4, 3))})).dtype)
+        y.backward()
+        self.assertEqual(np.float32, w.gradient.dtype)
+        self.assertEqual(np.float32, b.gradient.dtype)
+
+    def test_model(self):
+        with ad.dtype_scope('float32'):
+            input_layer = ad.layers.Input(shape=(None, None, 3))
+            lstm_layer = ad.layers.LSTM(units=4)(input_layer)
+            dense_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.sigmoid)(lstm_layer)
+            model = ad.models.Model(inputs=input_layer, outputs=dense_layer)
+        model.build(optimizer=ad.optims.Adam(), losses=ad.losses.mean_square_error)
+        for _ in range(2):
+            model.fit_on_batch(np.random.random((2, 5, 3)), np.random.random((2, 2)))
+        for weight in model.trainable_weights:
+            self.assertEqual(np.float32, weight.forward().dtype, weight)
+            self.assertEqual(np.float32, weight.gradient.dtype, weight)
+        self.assertEqual(np.float32, model.predict_on_batch(np.random.random((2, 5, 3))).dtype)
+
+    def test_variable_floatx(self):
+        with ad.dtype_scope('float16', 'float32'):
+            self.assertEqual(np.float16, ad.floatx())
+            self.assertEqual(np.float32, ad.variable_floatx())
+            x = ad.placeholder(shape=(None, 3))
+            w = ad.variable(np.random.random((3, 2)))
+            y = ad.sum(ad.dot(x, w))
+        self.assertEqual(np.float64, ad.variable_floatx())
+        sess = ad.Session()
+        self.assertEqual(np.float16, sess.run(y, feed_dict={x: np.random.random((4, 3))}).dtype)
+        self.assertEqual(np.float32, w.x.dtype)
+        self.assertEqual(np.float16, w.output.dtype)
+        y.backward()
+        self.assertEqual(np.float16, w.gradient.dtype)
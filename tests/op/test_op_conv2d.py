@@ -0,0 +1,74 @@
+import numpy as np
+import auto_diff as ad
+from .util import NumGradCheck
+
+
+class TestOpConv2D(NumGradCheck):
+
+    @staticmethod
+    def _naive_conv2d(x, w, kernel_size, strides, dilation_rate, pad_width):
+        padded = np.pad(x, ((0, 0), (pad_width[0],) * 2, (pad_width[1],) * 2, (0, 0)), mode='constant')
+        dilated = [dilation_rate[i] * (kernel_size[i] - 1) + 1 for i in range(2)]
+        new_height = (padded.shape[1] - dilated[0]) // strides[0] + 1
+        new_width = (padded.shape[2] - dilated[1]) // strides[1] + 1
+        output = np.zeros((x.shape[0], new_height, new_width, w.shape[1]))
+        for b in range(x.shape[0]):
+            for r in range(new_height):
+                for c in range(new_width):
+                    block = padded[
+                        b,
+                        r * strides[0]:r * strides[0] + dilated[0]:dilation_rate[0],
+                        c * strides[1]:c * strides[1] + dilated[1]:dilation_rate[1],
+                        :,
+                    ]
+                    output[b, r, c] = np.dot(block.flatten(), w)
+        return output
+
+    def _check(self, input_shape, filters, kernel_size, strides=(1, 1), dilation_rate=(1, 1), pad_width=(0, 0)):
+        x_val = np.random.random(input_shape)
+        w_val = np.random.random((kernel_size[0] * kernel_size[1] * input_shape[-1], filters))
+        x = ad.variable(x_val)
+        w = ad.variable(w_val)
+        y = ad.conv2d(x, w, kernel_size, strides, dilation_rate, pad_width)
+        actual = y.forward()
+        expect = self._naive_conv2d(x_val, w_val, kernel_size, strides, dilation_rate, pad_width)
+        self.assertEqual(expect.shape, y.shape)
+        self.assertEqual(expect.shape, actual.shape)
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+        self.numeric_gradient_check(y, {}, [x, w])
+
+    def test_valid(self):
+        self._check((2, 5, 6, 3), 4, (3, 3))
+
+    def test_same(self):
+        self._check((2, 5, 5, 3), 4, (3, 5), pad_width=(1, 2))
+
+    def test_strides(self):
+        self._check((2, 7, 8, 2), 3, (3, 2), strides=(2, 3), pad_width=(1, 1))
+
+    def test_dilation(self):
+        self._check((1, 9, 8, 2), 3, (3, 2), strides=(2, 1), dilation_rate=(2, 3), pad_width=(2, 1))
+
+    def test_placeholder(self):
+        x_val = np.random.random((3, 6, 6, 2))
+        w_val = np.random.random((2 * 2 * 2, 4))
+        x = ad.placeholder(shape=(None, None, 6, 2))
+        y = ad.conv2d(x, ad.constant(w_val), kernel_size=2, strides=2)
+        self.assertEqual((None, None, 3, 4), y.shape)
+        actual = y.forward({x: x_val})
+        expect = self._naive_conv2d(x_val, w_val, (2, 2), (2, 2), (1, 1), (0, 0))
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+
+    def test_requires_grad(self):
+        x = ad.constant(np.random.random((1, 4, 4, 1)))
+        w = ad.variable(np.random.random((4, 2)))
+        y = ad.conv2d(x, w, kernel_size=2)
+        y.forward()
+        y.backward()
+        self.assertEqual((4, 2), w.gradient.shape)
+
+    def test_invalid_shape(self):
+        with self.assertRaises(ValueError):
+            ad.conv2d(ad.placeholder(shape=(None, 5, 5)), ad.variable(np.zeros((9, 2))), kernel_size=3)
+        with self.assertRaises(ValueError):
+            ad.conv2d(ad.placeholder(shape=(None, 5, 5, 2)), ad.variable(np.zeros((9, 2))), kernel_size=3)
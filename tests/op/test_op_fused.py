@@ -0,0 +1,60 @@
+import numpy as np
+import auto_diff as ad
+from auto_diff.op.op_fused import OpFused
+from .util import NumGradCheck
+
+
+class TestOpFused(NumGradCheck):
+
+    def _build(self, x, y):
+        return OpFused([x, y], [
+            ('subtract', [0, 1]),
+            ('square', [2]),
+            ('multiply', [3, 0.5]),
+            ('exp', [1]),
+            ('add', [4, 5]),
+            ('sigmoid', [6]),
+            ('maximum', [7, 0.6]),
+        ], shape=x.shape)
+
+    def test_forward(self):
+        x_val, y_val = np.random.random((3, 4)), np.random.random(4)
+        x, y = ad.variable(x_val), ad.variable(y_val)
+        z = self._build(x, y)
+        self.assertEqual('maximum(sigmoid(add(multiply(square(subtract(variable(shape=(3, 4)), '
+                         'variable(shape=(4,)))), 0.5), exp(variable(shape=(4,))))), 0.6)', z.name)
+        expect = np.maximum(1.0 / (1.0 + np.exp(-(0.5 * np.square(x_val - y_val) + np.exp(y_val)))), 0.6)
+        sess = ad.Session()
+        outputs = []
+        for _ in range(2):
+            sess.prepare()
+            outputs.append(sess.run(z))
+            self.assertEqual(expect.shape, z.shape)
+            self.assertTrue(np.allclose(expect, outputs[-1]), (expect, outputs[-1]))
+        self.assertIsNot(outputs[0], outputs[1])
+
+    def test_backward(self):
+        x, y = ad.variable(np.random.random((3, 4))), ad.variable(np.random.random(4))
+        self.numeric_gradient_check(self._build(x, y), {}, [x, y])
+
+    def test_backward_wrt(self):
+        x, y = ad.variable(np.random.random((3, 4))), ad.variable(np.random.random(4))
+        z = self._build(x, y)
+        z.forward()
+        z.backward(wrt=[x])
+        self.assertIsNone(z.gradients[1])
+
+    def test_dtype(self):
+        with ad.dtype_scope('float32'):
+            x, y = ad.placeholder(shape=(None, 4)), ad.placeholder(shape=(4,))
+            z = OpFused([x, y], [('add', [0, 1]), ('multiply', [2, 1]), ('exp', [3])], shape=x.shape)
+        x_val, y_val = np.arange(12, dtype=np.int64).reshape((3, 4)), np.arange(4, dtype=np.int64)
+        self.assertTrue(np.allclose(np.exp((x_val + y_val) * y_val), z.forward({x: x_val, y: y_val})))
+        self.assertEqual(np.int64, z._results[2].dtype)
+        self.assertEqual(np.int64, z._results[3].dtype)
+        self.assertEqual(np.float32, z.forward({x: x_val.astype(np.float64), y: y_val.astype(np.float64)}).dtype)
+        self.assertEqual(np.float32, z._results[2].dtype)
+
+    def test_not_supported(self):
+        with self.assertRaises(NotImplementedError):
+            OpFused([ad.variable(1.0)], [('dot', [0, 0])], shape=())
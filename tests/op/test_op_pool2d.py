@@ -0,0 +1,74 @@
+import numpy as np
+import auto_diff as ad
+from .util import NumGradCheck
+
+
+class TestOpPool2D(NumGradCheck):
+
+    @staticmethod
+    def _naive_pool2d(x, reduce, pool_size, strides, pad_width):
+        padded = np.pad(x, ((0, 0), (pad_width[0],) * 2, (pad_width[1],) * 2, (0, 0)),
+                        mode='constant', constant_values=np.nan)
+        new_height = (padded.shape[1] - pool_size[0]) // strides[0] + 1
+        new_width = (padded.shape[2] - pool_size[1]) // strides[1] + 1
+        output = np.zeros((x.shape[0], new_height, new_width, x.shape[3]))
+        for r in range(new_height):
+            for c in range(new_width):
+                block = padded[:, r * strides[0]:r * strides[0] + pool_size[0],
+                               c * strides[1]:c * strides[1] + pool_size[1], :]
+                output[:, r, c] = reduce(block, axis=(1, 2))
+        return output
+
+    def _check(self, func, reduce, input_shape, pool_size, strides=None, pad_width=(0, 0)):
+        x_val = np.random.random(input_shape)
+        x = ad.variable(x_val)
+        y = func(x, pool_size, strides, pad_width)
+        actual = y.forward()
+        expect = self._naive_pool2d(x_val, reduce, pool_size, strides or pool_size, pad_width)
+        self.assertEqual(expect.shape, y.shape)
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+        self.numeric_gradient_check(y, {}, [x])
+
+    def test_max_pool2d(self):
+        self._check(ad.max_pool2d, np.nanmax, (2, 6, 6, 3), (2, 2))
+        self._check(ad.max_pool2d, np.nanmax, (2, 7, 6, 3), (3, 2), strides=(2, 1))
+        self._check(ad.max_pool2d, np.nanmax, (2, 5, 5, 2), (3, 3), strides=(1, 1), pad_width=(1, 1))
+        self._check(ad.max_pool2d, np.nanmax, (1, 6, 7, 2), (2, 3), strides=(2, 2), pad_width=(1, 1))
+
+    def test_avg_pool2d(self):
+        self._check(ad.avg_pool2d, np.nanmean, (2, 6, 6, 3), (2, 2))
+        self._check(ad.avg_pool2d, np.nanmean, (2, 7, 6, 3), (3, 2), strides=(2, 1))
+        self._check(ad.avg_pool2d, np.nanmean, (2, 5, 5, 2), (3, 3), strides=(1, 1), pad_width=(1, 1))
+        self._check(ad.avg_pool2d, np.nanmean, (1, 6, 7, 2), (2, 3), strides=(2, 2), pad_width=(1, 1))
+
+    def test_max_pool2d_overlap(self):
+        x_val = np.zeros((1, 3, 3, 1))
+        x_val[0, 1, 1, 0] = 1.0
+        x = ad.variable(x_val)
+        y = ad.max_pool2d(x, pool_size=2, strides=1)
+        self.assertTrue(np.allclose(np.ones((1, 2, 2, 1)), y.forward()))
+        y.backward()
+        expect = np.zeros((1, 3, 3, 1))
+        expect[0, 1, 1, 0] = 4.0
+        self.assertTrue(np.allclose(expect, x.gradient), x.gradient)
+
+    def test_max_pool2d_integer(self):
+        x_val = -np.arange(1, 26, dtype=np.int64).reshape((1, 5, 5, 1))
+        x = ad.placeholder(shape=(None, 5, 5, 1))
+        y = ad.max_pool2d(x, pool_size=3, strides=2, pad_width=1)
+        actual = y.forward({x: x_val})
+        expect = self._naive_pool2d(x_val.astype(np.float64), np.nanmax, (3, 3), (2, 2), (1, 1))
+        self.assertEqual(np.int64, actual.dtype)
+        self.assertTrue(np.array_equal(expect, actual), (expect, actual))
+
+    def test_placeholder(self):
+        x = ad.placeholder(shape=(None, None, 8, 3))
+        y = ad.max_pool2d(x, pool_size=2)
+        self.assertEqual((None, None, 4, 3), y.shape)
+        self.assertEqual((2, 3, 4, 3), y.forward({x: np.random.random((2, 6, 8, 3))}).shape)
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            ad.max_pool2d(ad.placeholder(shape=(None, 5, 5)), pool_size=2)
+        with self.assertRaises(ValueError):
+            ad.avg_pool2d(ad.placeholder(shape=(None, 5, 5, 1)), pool_size=2, pad_width=2)
@@ -0,0 +1,26 @@
+import numpy as np
+import auto_diff as ad
+from .util import NumGradCheck
+
+
+class TestOpSigmoid(NumGradCheck):
+
+    def test_forward(self):
+        x_val = np.random.random((3, 4)) * 10.0 - 5.0
+        x = ad.variable(x_val)
+        y = ad.sigmoid(x)
+        actual = y.forward()
+        expect = 1.0 / (1.0 + np.exp(-x_val))
+        self.assertEqual(expect.shape, y.shape)
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+
+    def test_forward_large(self):
+        x = ad.variable([-1000.0, 0.0, 1000.0])
+        actual = ad.sigmoid(x).forward()
+        self.assertTrue(np.allclose([0.0, 0.5, 1.0], actual), actual)
+
+    def test_backward(self):
+        x_val = np.random.random((3, 4))
+        x = ad.variable(x_val)
+        y = ad.sigmoid(x)
+        self.numeric_gradient_check(y, {}, [x])
@@ -33,3 +33,36 @@ class TestOperation(TestCase):
         op = ad.constant(np.array(1.0))
         sess.run(op)
         sess.run(op)
+
+    def test_slots(self):
+        import importlib
+        import pkgutil
+        for module in pkgutil.iter_modules(ad.op.__path__):
+            importlib.import_module('auto_diff.op.' + module.name)
+        classes = [ad.Operation]
+        while classes:
+            cls = classes.pop()
+            classes.extend(cls.__subclasses__())
+            if cls.__module__.startswith('auto_diff.'):
+                self.assertIn('__slots__', cls.__dict__, cls)
+        x = ad.placeholder(shape=(None,))
+        for op in [x, ad.sum(ad.exp(x)), ad.variable(1.0), ad.constant(1.0)]:
+            self.assertFalse(hasattr(op, '__dict__'), op)
+
+    def test_name_cached(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = ad.exp(x) + 1.0
+        self.assertEqual('add(exp(X), 1.0)', str(y))
+        self.assertIs(y.name, y.name)
+        x.name = 'Z'
+        self.assertEqual('add(exp(Z), 1.0)', str(y))
+        y.inputs[0].inputs = [ad.square(x)]
+        self.assertEqual('add(exp(square(Z)), 1.0)', str(y))
+
+    def test_name_deep_graph(self):
+        import sys
+        x = ad.placeholder(shape=(), name='X')
+        y = x
+        for _ in range(sys.getrecursionlimit() * 2):
+            y = ad.exp(y)
+        self.assertTrue(y.name.endswith('(X' + ')' * sys.getrecursionlimit() * 2))
@@ -0,0 +1,78 @@
+from unittest import TestCase
+import numpy as np
+import auto_diff as ad
+
+
+class TestLossScale(TestCase):
+
+    @staticmethod
+    def _create_model():
+        with ad.dtype_scope('float16', 'float32'):
+            input_layer = ad.layers.Input(shape=(None, 5))
+            dense_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.sigmoid)(input_layer)
+            model = ad.models.Model(inputs=input_layer, outputs=dense_layer)
+        return model
+
+    def test_mixed_precision(self):
+        np.random.seed(0xcafe)
+        model = self._create_model()
+        model.build(
+            optimizer=ad.optims.Adam(lr=1e-2),
+            losses=ad.losses.mean_square_error,
+            loss_scale='dynamic',
+        )
+        input_vals = np.random.random((4, 5))
+        output_vals = np.array([[0.8, 0.2]] * 4)
+        for _ in range(300):
+            model.fit_on_batch(input_vals, output_vals)
+        outputs = model.predict_on_batch(input_vals)
+        self.assertEqual(np.float16, outputs.dtype)
+        self.assertTrue(np.allclose(output_vals, outputs, atol=0.1), outputs)
+        for weight in model.trainable_weights:
+            self.assertEqual(np.float32, weight.x.dtype)
+        self.assertEqual(0, model._optimizer.skipped_steps)
+
+    def test_overflow(self):
+        np.random.seed(0xcafe)
+        model = self._create_model()
+        optimizer = ad.optims.LossScaleOptimizer(ad.optims.SGD(lr=1e-1), initial_scale=2.0 ** 20, growth_interval=2)
+        model.build(optimizer=optimizer, losses=ad.losses.mean_square_error)
+        input_vals = np.random.random((4, 5))
+        output_vals = np.array([[0.8, 0.2]] * 4)
+        model.predict_on_batch(input_vals)
+        weights = [weight.x.copy() for weight in model.trainable_weights]
+        model.fit_on_batch(input_vals, output_vals)
+        self.assertEqual(1, optimizer.skipped_steps)
+        self.assertEqual(2.0 ** 19, optimizer.loss_scale)
+        for weight, old in zip(model.trainable_weights, weights):
+            self.assertTrue(np.array_equal(old, weight.x))
+        for _ in range(4):
+            model.fit_on_batch(input_vals, output_vals)
+        self.assertEqual(5, optimizer.skipped_steps)
+        self.assertEqual(2.0 ** 15, optimizer.loss_scale)
+        model.fit_on_batch(input_vals, output_vals)
+        model.fit_on_batch(input_vals, output_vals)
+        self.assertEqual(5, optimizer.skipped_steps)
+        self.assertEqual(2.0 ** 15, optimizer.loss_scale)
+        for weight, old in zip(model.trainable_weights, weights):
+            self.assertFalse(np.array_equal(old, weight.x))
+
+    def test_max_scale(self):
+        np.random.seed(0xcafe)
+        self.assertEqual(2.0 ** 15, ad.optims.LossScaleOptimizer.max_scale_of(np.float16))
+        model = self._create_model()
+        optimizer = ad.optims.LossScaleOptimizer(ad.optims.SGD(lr=1e-2), growth_interval=1)
+        model.build(optimizer=optimizer, losses=ad.losses.mean_square_error)
+        self.assertEqual(2.0 ** 15, optimizer.max_scale)
+        input_vals = np.random.random((4, 5))
+        output_vals = np.array([[0.8, 0.2]] * 4)
+        for _ in range(5):
+            model.fit_on_batch(input_vals, output_vals)
+        self.assertEqual(0, optimizer.skipped_steps)
+        self.assertEqual(2.0 ** 15, optimizer.loss_scale)
+
+    def test_fixed_scale(self):
+        model = self._create_model()
+        model.build(optimizer=ad.optims.SGD(), losses=ad.losses.mean_square_error, loss_scale=128)
+        self.assertEqual(128.0, model._optimizer.loss_scale)
+        self.assertFalse(model._optimizer.dynamic)
@@ -39,7 +39,7 @@ class TestSGD(TestCase):
         self._test_fitting(model)
 
     def test_decay(self):
-        np.random.seed(0xcafe)
+        np.random.seed(0xbeef)
         model = self._create_model()
         model.build(
             optimizer=ad.optims.SGD(decay=1e-3, lr=1e-3),
@@ -0,0 +1,92 @@
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+from auto_diff.sess.accumulator import GradientAccumulator
+
+
+class TestGradientAccumulator(TestCase):
+
+    def test_single(self):
+        accumulator = GradientAccumulator()
+        gradient = np.ones((2, 3))
+        self.assertIs(gradient, accumulator.accumulate(ad.constant(0.0), [gradient]))
+        self.assertEqual(0, accumulator.saved_bytes)
+
+    def test_reuse(self):
+        accumulator = GradientAccumulator()
+        op = ad.constant(0.0)
+        gradients = [np.ones((2, 3)) * i for i in range(4)]
+        first = accumulator.accumulate(op, gradients)
+        self.assertTrue(np.allclose(np.ones((2, 3)) * 6.0, first), first)
+        self.assertEqual(2 * 48, accumulator.saved_bytes)
+        second = accumulator.accumulate(op, gradients[:2])
+        self.assertIs(first, second)
+        self.assertTrue(np.allclose(np.ones((2, 3)), second), second)
+        self.assertEqual(3 * 48, accumulator.saved_bytes)
+
+    def test_shape_changed(self):
+        accumulator = GradientAccumulator()
+        op = ad.constant(0.0)
+        first = accumulator.accumulate(op, [np.ones((2, 3)), np.ones((2, 3))])
+        second = accumulator.accumulate(op, [np.ones((4, 3)), np.ones((4, 3))])
+        self.assertEqual((4, 3), second.shape)
+        self.assertIsNot(first, second)
+
+    def test_broadcast(self):
+        accumulator = GradientAccumulator()
+        actual = accumulator.accumulate(ad.constant(0.0), [1.0, np.ones(3), 2.0])
+        self.assertTrue(np.allclose(np.ones(3) * 4.0, actual), actual)
+
+    def test_shared_weights(self):
+        x = ad.placeholder(shape=(None, 3))
+        w = ad.variable(np.ones((3, 3)))
+        y = x
+        for _ in range(5):
+            y = ad.dot(y, w)
+        y = ad.sum(y)
+        sess = ad.Session()
+        sess.run(y, feed_dict={x: np.ones((2, 3))})
+        y.backward()
+        saved = y._plan.accumulator.saved_bytes
+        self.assertEqual(3 * 72, saved)
+        sess.prepare()
+        sess.run(y, feed_dict={x: np.ones((2, 3))})
+        y.backward()
+        self.assertEqual(saved + 4 * 72, y._plan.accumulator.saved_bytes)
+
+    def test_shares_buffer(self):
+        accumulator = GradientAccumulator()
+        buffer = accumulator.accumulate(ad.constant(0.0), [np.ones((2, 3)), np.ones((2, 3))])
+        self.assertTrue(accumulator.shares_buffer(buffer))
+        self.assertTrue(accumulator.shares_buffer(buffer[0]))
+        self.assertFalse(accumulator.shares_buffer(buffer.copy()))
+        self.assertFalse(accumulator.shares_buffer(1.0))
+
+    def test_gradients_not_overwritten(self):
+        x = ad.variable(np.ones((2, 3)))
+        z = ad.placeholder(shape=(2, 3))
+        y = ad.sum(x * z + ad.square(x))
+        sess = ad.Session()
+        first, = sess.gradients(y, [x], feed_dict={z: np.ones((2, 3))})
+        expect = first.copy()
+        sess.prepare()
+        second, = sess.gradients(y, [x], feed_dict={z: np.ones((2, 3)) * 5.0})
+        self.assertIsNot(first, second)
+        self.assertTrue(np.allclose(expect, first), (expect, first))
+        self.assertTrue(np.allclose(np.ones((2, 3)) * 7.0, second), second)
+
+    def test_variable_gradient_not_overwritten(self):
+        w = ad.variable(np.array([1.0, 2.0]))
+        x = ad.placeholder(shape=(2,))
+        y = ad.sum(w * x + w * w)
+        sess = ad.Session()
+        sess.run(y, feed_dict={x: np.ones(2)})
+        y.backward()
+        first = w.gradient
+        self.assertTrue(np.allclose([3.0, 5.0], first), first)
+        sess.prepare()
+        sess.run(y, feed_dict={x: np.ones(2) * 5.0})
+        y.backward()
+        self.assertIsNot(first, w.gradient)
+        self.assertTrue(np.allclose([3.0, 5.0], first), first)
+        self.assertTrue(np.allclose([7.0, 9.0], w.gradient), w.gradient)
@@ -0,0 +1,56 @@
+import numpy as np
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import auto_diff as ad
+from auto_diff.op.operation import Operation
+
+
+class TestExecutionContext(TestCase):
+
+    def test_isolated(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        w = ad.variable([1.0, 2.0])
+        hidden = x * w
+        y = ad.sum(ad.square(hidden))
+        sess = ad.Session()
+        sess.run(y, feed_dict={x: np.array([1.0, 1.0])})
+        with ad.ExecutionContext() as context_a:
+            sess.prepare()
+            self.assertEqual(20.0, sess.run(y, feed_dict={x: np.array([2.0, 2.0])}))
+            y.backward()
+            self.assertEqual([8.0, 16.0], w.gradient.tolist())
+        with ad.ExecutionContext() as context_b:
+            sess.prepare()
+            self.assertEqual(45.0, sess.run(y, feed_dict={x: np.array([3.0, 3.0])}))
+        self.assertEqual([1.0, 2.0], hidden.output.tolist())
+        self.assertIsNone(w.gradient)
+        with context_a:
+            self.assertEqual([2.0, 4.0], hidden.output.tolist())
+            self.assertEqual([8.0, 16.0], w.gradient.tolist())
+            with context_b:
+                self.assertEqual([3.0, 6.0], hidden.output.tolist())
+            self.assertEqual([2.0, 4.0], hidden.output.tolist())
+        self.assertNotIsInstance(Operation.__dict__['output'], ad.op.context.RunState)
+
+    def test_new_operations(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        with ad.ExecutionContext():
+            y = ad.sum(x[1:] * 2.0)
+            self.assertEqual(10.0, ad.Session().run(y, feed_dict={x: np.array([1.0, 2.0, 3.0])}))
+        self.assertIsNone(y.output)
+        self.assertEqual(12.0, ad.Session().run(y, feed_dict={x: np.array([1.0, 2.0, 4.0])}))
+
+    def test_concurrent_predict(self):
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, None, 3))
+        lstm_layer = ad.layers.LSTM(units=4, return_sequences=True)(input_layer)
+        gru_layer = ad.layers.GRU(units=4)(lstm_layer)
+        dense_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(gru_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=dense_layer)
+        model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy)
+        inputs = [np.random.random((i % 3 + 1, i % 4 + 2, 3)) for i in range(24)]
+        expected = [model.predict_on_batch(x) for x in inputs]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            actual = list(executor.map(model.predict_on_batch, inputs))
+        for e, a in zip(expected, actual):
+            self.assertTrue(np.allclose(e, a), (e, a))
@@ -0,0 +1,128 @@
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+
+
+class TestMemoryPlanner(TestCase):
+
+    @staticmethod
+    def _build_graph(w_val=None):
+        if w_val is None:
+            w_val = np.random.random((10, 10))
+        x = ad.placeholder(shape=(None, 10), name='X')
+        w = ad.variable(w_val, name='W')
+        y = x
+        for _ in range(5):
+            y = ad.transpose(ad.transpose(ad.tanh(ad.dot(y, w))))
+        return x, w, ad.sum(y)
+
+    def test_inference(self):
+        x, w, y = self._build_graph()
+        sess = ad.Session(plan_memory=True)
+        val = np.random.random((100, 10))
+        actual = sess.run(y, feed_dict={x: val, ad.Operation.KEY_TRAINING: False})
+        expect = ad.Session().run(y, feed_dict={x: val})
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+        planned, naive = sess.memory_report(y, feed_dict={x: val, ad.Operation.KEY_TRAINING: False})
+        self.assertEqual(10 * 8000 + 8, naive)
+        self.assertEqual(2 * 8000, planned)
+
+    def test_training(self):
+        w_val = np.random.random((10, 10))
+        x, w, y = self._build_graph(w_val)
+        val = np.random.random((100, 10))
+        sess = ad.Session()
+        sess.run(y, feed_dict={x: val})
+        y.backward()
+        expect = w.gradient.copy()
+
+        x, w, y = self._build_graph(w_val)
+        sess = ad.Session(plan_memory=True)
+        sess.run(y, feed_dict={x: val})
+        y.backward()
+        self.assertTrue(np.allclose(expect, w.gradient), (expect, w.gradient))
+        planned, naive = sess.memory_report(y, feed_dict={x: val})
+        self.assertLess(planned, naive)
+
+    def test_backward_inference_plan(self):
+        x, w, y = self._build_graph()
+        sess = ad.Session()
+        plan = sess.compile([y], {x: None})
+        plan.plan_memory(training=False)
+        sess.run(y, feed_dict={x: np.random.random((3, 10))})
+        with self.assertRaises(ValueError):
+            plan.backward(y)
+
+    def test_dynamic(self):
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, None, 3))
+        lstm_layer = ad.layers.LSTM(units=7, return_sequences=True)(input_layer)
+        lstm_layer = ad.layers.LSTM(units=2)(lstm_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=lstm_layer)
+        model.build(
+            optimizer=ad.optims.SGD(lr=1e-3),
+            losses=ad.losses.mean_square_error,
+            plan_memory=True,
+        )
+        input_vals = np.random.random((2, 4, 3))
+        expect = model.predict_on_batch(input_vals)
+        for _ in range(3):
+            actual = model.predict_on_batch(input_vals)
+            self.assertTrue(np.allclose(expect, actual), (expect, actual))
+            model.fit_on_batch(input_vals, np.random.random((2, 2)))
+            expect = model.predict_on_batch(input_vals)
+
+    def test_checkpoint_every(self):
+        w_val = np.random.random((10, 10)) * 0.1
+        val = np.random.random((100, 10))
+        x, w, y = self._build_graph(w_val)
+        sess = ad.Session()
+        sess.run(y, feed_dict={x: val})
+        y.backward()
+        expect = w.gradient.copy()
+        planned_without, _ = sess.memory_report(y, feed_dict={x: val})
+
+        x, w, y = self._build_graph(w_val)
+        sess = ad.Session(plan_memory=True, checkpoint_every=6)
+        sess.run(y, feed_dict={x: val})
+        y.backward()
+        self.assertTrue(np.allclose(expect, w.gradient), (expect, w.gradient))
+        planned_with, _ = sess.memory_report(y, feed_dict={x: val})
+        self.assertLess(planned_with, planned_without)
+
+    def test_checkpoint_random(self):
+        x = ad.placeholder(shape=(None, 10), name='X')
+        w = ad.variable(np.random.random((10, 10)), name='W')
+        y = ad.sum(ad.tanh(ad.dot(x, w)) * ad.random(ad.shape(x)))
+        val = np.random.random((100, 10))
+        sess = ad.Session(plan_memory=True, checkpoints=[])
+        np.random.seed(0xcafe)
+        sess.run(y, feed_dict={x: val})
+        y.backward()
+        np.random.seed(0xcafe)
+        noise = np.random.random((100, 10))
+        expect = np.dot(val.T, (1.0 - np.square(np.tanh(np.dot(val, w.x)))) * noise)
+        self.assertTrue(np.allclose(expect, w.gradient), (expect, w.gradient))
+
+    def _fit_model(self, checkpoint, layer_checkpoint=False):
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, None, 3))
+        lstm_layer = ad.layers.LSTM(units=7, return_sequences=True, checkpoint=layer_checkpoint)(input_layer)
+        lstm_layer = ad.layers.LSTM(units=2)(lstm_layer)
+        dense_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.relu)(lstm_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=dense_layer)
+        model.build(
+            optimizer=ad.optims.SGD(lr=1e-2),
+            losses=ad.losses.mean_square_error,
+            checkpoint=checkpoint,
+        )
+        input_vals = np.random.random((3, 5, 3))
+        for _ in range(3):
+            model.fit_on_batch(input_vals, np.random.random((3, 2)))
+        return model.predict_on_batch(input_vals)
+
+    def test_checkpoint_model(self):
+        expect = self._fit_model(checkpoint=None)
+        for checkpoint, layer_checkpoint in [('layers', False), (True, True), (3, False)]:
+            actual = self._fit_model(checkpoint=checkpoint, layer_checkpoint=layer_checkpoint)
+            self.assertTrue(np.allclose(expect, actual), (checkpoint, expect, actual))
@@ -0,0 +1,138 @@
+import numpy as np
+from unittest import TestCase
+from concurrent.futures import ThreadPoolExecutor
+import auto_diff as ad
+from auto_diff.sess.plan import ExecutionPlan
+
+
+class TestParallelExecutor(TestCase):
+
+    @staticmethod
+    def _branches():
+        x = ad.placeholder(shape=(None, 8), name='X')
+        ws = [ad.variable(np.random.random((8, 8))) for _ in range(6)]
+        hidden = [ad.tanh(ad.dot(x, w)) for w in ws]
+        y = ad.sum(hidden[0] * hidden[1] + hidden[2] * hidden[3] - ad.sigmoid(hidden[4] + hidden[5]))
+        return x, ws, y
+
+    def test_branches(self):
+        np.random.seed(0xdead)
+        x, ws, y = self._branches()
+        val = np.random.random((3, 8))
+        serial = ad.Session()
+        expect = serial.run(y, feed_dict={x: val})
+        expect_grads = serial.gradients(y, ws, feed_dict={x: val})
+        sess = ad.Session(num_threads=3)
+        for _ in range(3):
+            sess.prepare()
+            self.assertTrue(np.allclose(expect, sess.run(y, feed_dict={x: val})))
+            for grad, expect_grad in zip(sess.gradients(y, ws, feed_dict={x: val}), expect_grads):
+                self.assertTrue(np.allclose(expect_grad, grad))
+        sess.close()
+        self.assertIsNone(sess._executor)
+
+    def test_random_order(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        shape = ad.shape(x)
+        y = [ad.random(shape) * x for _ in range(8)]
+        np.random.seed(0xbeef)
+        expect = ad.Session().run(y, feed_dict={x: np.ones(4)})
+        np.random.seed(0xbeef)
+        actual = ad.Session(num_threads=4).run(y, feed_dict={x: np.ones(4)})
+        for e, a in zip(expect, actual):
+            self.assertTrue(np.allclose(e, a), (e, a))
+
+    def test_setitem_order(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        zeros = ad.zeros_like(x)
+        added = zeros + x
+        assigned = ad.setitem(zeros, 0, ad.constant(5.0))
+        y = ad.sum(added) + assigned
+        plan = ExecutionPlan([y], [x])
+        pending, consumers, _ = plan._parallel_schedule()
+        index = {op: i for i, op in enumerate(plan.operations)}
+        self.assertIn(index[assigned], consumers[index[added]])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            actual = plan.run({x: np.ones(3), ad.Operation.KEY_STEP: 1}, executor)[0]
+        self.assertEqual([8.0, 3.0, 3.0], actual.tolist())
+
+    def test_dynamic(self):
+        x = ad.variable([[1, 1], [1, 0]])
+        y = ad.while_loop(
+            cond=lambda inputs: ad.less(inputs[0], ad.constant(64)),
+            body=lambda inputs: [inputs[0] * 2, ad.dot(inputs[1], x)],
+            loop_vars=[ad.variable(1), ad.variable([[1, 0], [0, 1]])],
+            output_index=1,
+        )
+        z = ad.sum(y) + ad.sum(ad.dot(x, x))
+        expect = ad.Session().run(z)
+        sess = ad.Session(num_threads=2)
+        for _ in range(2):
+            sess.prepare()
+            self.assertEqual(expect, sess.run(z))
+
+    def test_exception(self):
+        x = ad.placeholder(shape=(None, 2), name='X')
+        y = ad.dot(x, ad.variable(np.ones((2, 2)))) + ad.dot(x, ad.variable(np.ones((2, 2))))
+        sess = ad.Session(num_threads=2)
+        with self.assertRaises(ValueError):
+            sess.run(y, feed_dict={x: np.ones((2, 3))})
+        sess.prepare()
+        self.assertEqual([[4.0, 4.0]], sess.run(y, feed_dict={x: np.ones((1, 2))}).tolist())
+
+    def test_context(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        hidden = [ad.square(x) * float(i) for i in range(4)]
+        y = ad.sum(hidden[0] + hidden[1] + hidden[2] + hidden[3])
+        sess = ad.Session(num_threads=2)
+        sess.run(y, feed_dict={x: np.array([1.0])})
+        with ad.ExecutionContext():
+            sess.prepare()
+            self.assertEqual(24.0, sess.run(y, feed_dict={x: np.array([2.0])}))
+            self.assertEqual([12.0], hidden[3].output.tolist())
+        self.assertEqual([3.0], hidden[3].output.tolist())
+
+    @staticmethod
+    def _model(num_threads):
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, 4))
+        dense_layer = ad.layers.Dense(output_dim=8, activation=ad.acts.sigmoid)(input_layer)
+        norm_layer = ad.layers.BatchNorm()(dense_layer)
+        output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(norm_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy, num_threads=num_threads)
+        model.predict_on_batch(np.zeros((1, 4)))
+        return model
+
+    def test_model(self):
+        np.random.seed(0xbeef)
+        x = np.random.random((16, 4))
+        y = np.eye(2)[np.random.randint(0, 2, 16)]
+        serial, parallel = self._model(0), self._model(2)
+        for _ in range(3):
+            serial.fit_on_batch(x, y)
+            parallel.fit_on_batch(x, y)
+        self.assertTrue(np.allclose(serial.predict_on_batch(x), parallel.predict_on_batch(x)))
+
+    def test_model_lazy_initialization(self):
+        def _train(num_threads):
+            np.random.seed(0xcafe)
+            input_layer = ad.layers.Input(shape=(None, None, 4))
+            gru_layer = ad.layers.GRU(units=6, return_sequences=True)(input_layer)
+            lstm_layer = ad.layers.LSTM(units=6)(gru_layer)
+            dropout_layer = ad.layers.Dropout(rate=0.3)(lstm_layer)
+            norm_layer = ad.layers.BatchNorm()(dropout_layer)
+            output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(norm_layer)
+            model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+            model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy, num_threads=num_threads)
+            for _ in range(3):
+                model.fit_on_batch(x, y)
+            return model
+
+        rng = np.random.RandomState(0xbeef)
+        x = rng.random_sample((16, 5, 4))
+        y = np.eye(2)[rng.randint(0, 2, 16)]
+        serial, parallel = _train(0), _train(3)
+        for expect, actual in zip(serial.trainable_weights, parallel.trainable_weights):
+            self.assertTrue(np.allclose(expect.x, actual.x), (expect.x, actual.x))
+        self.assertTrue(np.allclose(serial.predict_on_batch(x), parallel.predict_on_batch(x)))
@@ -0,0 +1,193 @@
+import sys
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+from auto_diff.sess.plan import ExecutionPlan
+
+
+class TestExecutionPlan(TestCase):
+
+    def test_topological_order(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = ad.exp(x) + x
+        z = y * y
+        plan = ExecutionPlan([z, y])
+        self.assertEqual(4, len(plan.operations))
+        positions = {op: i for i, op in enumerate(plan.operations)}
+        for op in plan.operations:
+            for inp in op.inputs:
+                self.assertLess(positions[inp], positions[op])
+
+    def test_parameter_dependencies(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        index = ad.shape(x)[0] - 1.0
+        y = x[index]
+        plan = ExecutionPlan([y])
+        self.assertIn(index, plan.operations)
+        self.assertLess(plan.operations.index(index), plan.operations.index(y))
+        sess = ad.Session()
+        val = np.random.random((4, 3))
+        actual = sess.run(y, feed_dict={x: val})
+        self.assertTrue(np.allclose(val[3], actual), (val[3], actual))
+
+    def test_deep_graph(self):
+        x = ad.placeholder(shape=(), name='X')
+        y = x
+        for _ in range(sys.getrecursionlimit() * 2):
+            y = y + 1.0
+        sess = ad.Session()
+        actual = sess.run(y, feed_dict={x: 1.0})
+        self.assertEqual(1.0 + sys.getrecursionlimit() * 2, actual)
+
+    def test_cache(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = ad.square(x)
+        sess = ad.Session()
+        sess.run(y, feed_dict={x: np.array([1.0, 2.0])})
+        plan = sess.compile([y], {x: None})
+        sess.prepare()
+        actual = sess.run(y, feed_dict={x: np.array([3.0, 4.0])})
+        self.assertIs(plan, sess.compile([y], {x: None}))
+        self.assertTrue(np.allclose([9.0, 16.0], actual), actual)
+
+    def test_feed_intermediate(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = ad.square(x)
+        z = y + 1.0
+        sess = ad.Session()
+        actual = sess.run(z, feed_dict={y: np.array([1.0, 2.0])})
+        self.assertTrue(np.allclose([2.0, 3.0], actual), actual)
+
+    def test_dynamic(self):
+        x = ad.variable([[1, 1], [1, 0]])
+        y = ad.while_loop(
+            cond=lambda inputs: ad.less(inputs[0], ad.constant(64)),
+            body=lambda inputs: [inputs[0] * 2, ad.dot(inputs[1], x)],
+            loop_vars=[ad.variable(1), ad.variable([[1, 0], [0, 1]])],
+            output_index=1,
+        )
+        sess = ad.Session()
+        for _ in range(2):
+            sess.prepare()
+            actual = sess.run(y)
+            self.assertTrue(np.allclose([1, 2, 3, 5, 8, 13], actual[:, 0, 0]), actual)
+
+    def test_backward_fan_out(self):
+        x = ad.variable([1.0, 2.0])
+        y = x * x + ad.exp(x) * x
+        y.forward()
+        y.backward()
+        expect = 2.0 * np.array([1.0, 2.0]) + np.exp([1.0, 2.0]) * (1.0 + np.array([1.0, 2.0]))
+        self.assertTrue(np.allclose(expect, x.gradient), (expect, x.gradient))
+
+    def test_backward_deep_graph(self):
+        x = ad.variable(1.0)
+        y = x
+        for _ in range(sys.getrecursionlimit() * 2):
+            y = y * 1.0 + 1.0
+        sess = ad.Session()
+        sess.run(y)
+        y.backward()
+        self.assertEqual(1.0, x.gradient)
+
+    def test_backward_order_cached(self):
+        x = ad.variable([1.0, 2.0])
+        y = ad.sum(ad.square(x))
+        sess = ad.Session()
+        sess.run(y)
+        y.backward()
+        order = y._plan._backward_order(y)
+        sess.prepare()
+        sess.run(y)
+        y.backward()
+        self.assertIs(order, y._plan._backward_order(y))
+        self.assertEqual(y, order[0][0])
+        self.assertEqual(x, order[-1][0])
+
+    def test_backward_wrt(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        w = ad.variable(np.random.random((3, 2)))
+        b = ad.variable(np.zeros(2))
+        dot = ad.dot(x, w)
+        y = ad.sum(ad.square(dot + b))
+        sess = ad.Session()
+        x_val = np.random.random((4, 3))
+        sess.run(y, feed_dict={x: x_val})
+        gradients = y.backward(wrt=[w])
+        expect = np.dot(x_val.T, 2.0 * (np.dot(x_val, w.output) + b.output))
+        self.assertEqual(1, len(gradients))
+        self.assertTrue(np.allclose(expect, gradients[0]), (expect, gradients[0]))
+        self.assertTrue(np.allclose(expect, w.gradient))
+        self.assertIsNone(b.gradient)
+        self.assertIsNone(dot.gradients[0])
+
+    def test_backward_gradient(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        w = ad.variable([1.0, 2.0])
+        y = ad.sum(x * w)
+        sess = ad.Session()
+        sess.run(y, feed_dict={x: np.array([3.0, 4.0])})
+        gradients = y.backward(wrt=[w], gradient=np.array(8.0))
+        self.assertTrue(np.allclose([24.0, 32.0], gradients[0]), gradients[0])
+
+    def test_session_gradients(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        w = ad.variable([1.0, 2.0])
+        y = ad.sum(x * w)
+        sess = ad.Session()
+        grad_x, grad_w = sess.gradients(y, [x, w], feed_dict={x: np.array([3.0, 4.0])})
+        self.assertTrue(np.allclose([1.0, 2.0], grad_x), grad_x)
+        self.assertTrue(np.allclose([3.0, 4.0], grad_w), grad_w)
+        z = ad.variable(1.0)
+        self.assertEqual([None], sess.gradients(y, [z], feed_dict={x: np.array([3.0, 4.0])}))
+
+    def test_backward_skip_non_differentiable(self):
+        x = ad.variable([[1.0, 3.0], [4.0, 2.0]])
+        z = ad.placeholder(shape=(None, 2))
+        mask = ad.equal(ad.argmax(z, axis=-1), ad.constant(1))
+        y = ad.sum(ad.where(mask, x, ad.zeros_like(x)))
+        sess = ad.Session()
+        sess.run(y, feed_dict={z: np.array([[0.0, 1.0], [1.0, 0.0]])})
+        y.backward()
+        self.assertTrue(np.allclose([[1.0, 0.0], [1.0, 0.0]], x.gradient), x.gradient)
+
+    def test_shape_specialization(self):
+        x = ad.placeholder(shape=(None, None), name='X')
+        w = ad.variable(np.random.random((3, 2)))
+        length = ad.shape(x)[1]
+        zeros = ad.zeros_like(x)[:, 0]
+        y = ad.sum(ad.dot(x + ad.expand_dims(zeros, axis=-1), w)) * length
+        plan = ExecutionPlan([y], [x])
+        self.assertEqual(5, len(plan.shape_only))
+        for batch_size in [2, 4, 2]:
+            x_val = np.random.random((batch_size, 3))
+            output = plan.run({x: x_val})
+            self.assertTrue(np.allclose(np.sum(np.dot(x_val, w.x)) * 3, output[0]))
+            grad_x, = plan.backward(y, [x])
+            self.assertTrue(np.allclose(np.tile(np.sum(w.x, axis=-1) * 3, (batch_size, 1)), grad_x))
+        self.assertEqual([((4, 3),), ((2, 3),)], list(plan.specializations.keys()))
+
+    def test_shape_specialization_eviction(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = x + ad.ones_like(x)
+        plan = ExecutionPlan([y], [x], max_specializations=2)
+        for size in [1, 2, 3, 2, 1]:
+            self.assertTrue(np.allclose(np.arange(size) + 1.0, plan.run({x: np.arange(size, dtype=np.float64)})[0]))
+        self.assertEqual([((2,),), ((1,),)], list(plan.specializations.keys()))
+
+    def test_shape_specialization_skipped(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        k = ad.placeholder(shape=(), name='K')
+        zeros = ad.zeros_like(x[:k])
+        y = ad.setitem(ad.zeros_like(x), 0, ad.constant(1.0)) + ad.sum(zeros)
+        plan = ExecutionPlan([y], [x, k])
+        self.assertEqual(set(), plan.shape_only)
+        self.assertEqual([], plan._shape_feeds)
+
+    def test_shape_specialization_parameter_dependencies(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = ad.where(x > 0.5, ad.ones_like(x), ad.zeros_like(x))
+        plan = ExecutionPlan([y], [x])
+        self.assertNotIn(y, plan.shape_only)
+        self.assertTrue(np.allclose([0.0, 1.0], plan.run({x: np.array([0.2, 0.8])})[0]))
+        self.assertTrue(np.allclose([1.0, 0.0], plan.run({x: np.array([0.8, 0.2])})[0]))
@@ -0,0 +1,73 @@
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+from auto_diff.op.op_dot import OpDot
+
+
+class TestProfiler(TestCase):
+
+    def test_session(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        w = ad.variable(np.ones((3, 4)), name='W')
+        y = ad.sum(ad.tanh(ad.dot(x, w, name='Dot')))
+        profiler = ad.Profiler()
+        sess = ad.Session(profiler=profiler)
+        for _ in range(3):
+            sess.prepare()
+            sess.gradients(y, [w], feed_dict={x: np.ones((2, 3))})
+        self.assertFalse(profiler.active)
+        self.assertNotIn('__wrapped__', OpDot.__dict__['_forward'].__dict__)
+        stats = {profile.name: profile for profile in profiler.stats()}
+        self.assertEqual(3, stats['Dot'].forward_calls)
+        self.assertEqual(3, stats['Dot'].backward_calls)
+        self.assertGreaterEqual(stats['Dot'].bytes, 3 * (2 * 4 + 3 * 4) * 8)
+        self.assertGreater(stats['Dot'].total_time, 0.0)
+        self.assertEqual(3, stats['W'].forward_calls)
+        classes = {profile.name: profile for profile in profiler.stats(by='class')}
+        self.assertEqual(3, classes['OpTanh'].forward_calls)
+        self.assertEqual(6, classes['OpSum'].forward_calls)
+        by_calls = profiler.stats(sort_by='calls', descending=False)
+        self.assertEqual(sorted(profile.calls for profile in by_calls), [profile.calls for profile in by_calls])
+        report = profiler.report(by='class', limit=2)
+        self.assertEqual(4, len(report.split('\n')))
+        profiler.reset()
+        self.assertEqual([], profiler.stats())
+        with self.assertRaises(ValueError):
+            profiler.stats(sort_by='unknown')
+        with self.assertRaises(ValueError):
+            profiler.stats(by='unknown')
+
+    def test_nested(self):
+        x = ad.variable([[1, 1], [1, 0]], name='X')
+        y = ad.while_loop(
+            cond=lambda inputs: ad.less(inputs[0], ad.constant(64)),
+            body=lambda inputs: [inputs[0] * 2, ad.dot(inputs[1], x)],
+            loop_vars=[ad.variable(1), ad.variable([[1, 0], [0, 1]])],
+            output_index=1,
+        )
+        with ad.Profiler() as profiler:
+            y.forward()
+            with profiler:
+                self.assertTrue(profiler.active)
+            self.assertTrue(profiler.active)
+        classes = {profile.name: profile for profile in profiler.stats(by='class')}
+        loop, dot = classes['OpWhileLoop'], classes['OpDot']
+        self.assertGreater(dot.forward_calls, 0)
+        self.assertLessEqual(dot.forward_time, loop.forward_time)
+        self.assertLess(loop.forward_self_time, loop.forward_time)
+
+    def test_model(self):
+        input_layer = ad.layers.Input(shape=(None, 4))
+        output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(input_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(optimizer=ad.optims.SGD(), losses=ad.losses.cross_entropy)
+        model.fit_on_batch(np.ones((3, 4)), np.ones((3, 2)))
+        self.assertIsNone(model._session.profiler)
+        profiler = model.profile()
+        self.assertIs(profiler, model.profile())
+        model.fit_on_batch(np.ones((3, 4)), np.ones((3, 2)))
+        model.predict_on_batch(np.ones((3, 4)))
+        classes = {profile.name: profile for profile in profiler.stats(by='class')}
+        self.assertEqual(2, classes['OpDot'].forward_calls)
+        self.assertEqual(1, classes['OpDot'].backward_calls)
+        self.assertIsNone(model.profile(False))
@@ -0,0 +1,68 @@
+import os
+import pickle
+import tempfile
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+
+
+class TestSerialize(TestCase):
+
+    def test_operation(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        w = ad.variable(np.random.random((3, 200)), name='W')
+        y = ad.sum(ad.acts.sigmoid(ad.dot(x, w)), axis=-1)
+        x_val = np.random.random((4, 3))
+        expect = ad.Session().run(y, feed_dict={x: x_val})
+        with tempfile.TemporaryDirectory() as directory:
+            ad.save([x, y], directory)
+            self.assertEqual(['0.npy', 'graph.pkl'], sorted(os.listdir(directory)))
+            x_loaded, y_loaded = ad.load(directory, mmap_mode='r')
+            self.assertEqual(y.name, y_loaded.name)
+            self.assertNotEqual(y._op_index, y_loaded._op_index)
+            self.assertIsNone(y_loaded.output)
+            actual = ad.Session().run(y_loaded, feed_dict={x_loaded: x_val})
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+
+    def test_deep_graph(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = x
+        for _ in range(5000):
+            y = y + 1.0
+        with tempfile.TemporaryDirectory() as directory:
+            ad.save(y, directory)
+            y = ad.load(directory)
+        x = y
+        while x.inputs:
+            x = x.inputs[0]
+        self.assertEqual([5000.0, 5001.0], ad.Session().run(y, feed_dict={x: np.array([0.0, 1.0])}).tolist())
+
+    def _test_model(self, rnn_layer):
+        np.random.seed(0xcafe)
+        input_layer = ad.layers.Input(shape=(None, None, 3))
+        dense_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(rnn_layer(input_layer))
+        model = ad.models.Model(inputs=input_layer, outputs=dense_layer)
+        model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy)
+        input_vals = np.random.random((2, 5, 3))
+        output_vals = np.array([[0.0, 1.0], [1.0, 0.0]])
+        model.fit_on_batch(input_vals, output_vals)
+        with tempfile.TemporaryDirectory() as directory:
+            ad.save(model, directory, min_blob_bytes=0)
+            loaded = ad.load(directory, mmap_mode='r')
+        self.assertEqual(len(model._session._plans), len(loaded._session._plans))
+        self.assertTrue(np.allclose(model.predict_on_batch(input_vals), loaded.predict_on_batch(input_vals)))
+        for _ in range(3):
+            model.fit_on_batch(input_vals, output_vals)
+            loaded.fit_on_batch(input_vals, output_vals)
+        self.assertTrue(np.allclose(model.predict_on_batch(input_vals), loaded.predict_on_batch(input_vals)))
+
+    def test_lstm(self):
+        self._test_model(ad.layers.LSTM(units=4, kernel_initializer=ad.inits.random_normal()))
+
+    def test_gru(self):
+        self._test_model(ad.layers.GRU(units=4))
+
+    def test_initializers(self):
+        for initializer in [ad.inits.constants(2.0), ad.inits.random_normal(), ad.inits.random_uniform(),
+                            ad.inits.truncated_normal(0.0, 1.0, -2.0, 2.0)]:
+            self.assertEqual((3, 2), pickle.loads(pickle.dumps(initializer))((3, 2)).shape)
@@ -0,0 +1,69 @@
+import os
+import json
+import tempfile
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+from auto_diff.sess.trace import tracing_enabled
+
+
+class TestTracer(TestCase):
+
+    @staticmethod
+    def _load(path):
+        with open(path) as reader:
+            return json.load(reader)['traceEvents']
+
+    def test_session(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        y = ad.sum(ad.tanh(ad.dot(x, ad.variable(np.ones((3, 4))), name='Dot')))
+        sess = ad.Session()
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            sess.run(y, feed_dict={x: np.ones((2, 3))}, trace_file=path)
+            events = self._load(path)
+        self.assertFalse(tracing_enabled())
+        spans = {event['name']: event for event in events if event['ph'] == 'X'}
+        run, compile_span, dot = spans['run'], spans['compile'], spans['Dot']
+        self.assertEqual('forward', dot['cat'])
+        self.assertEqual('OpDot', dot['args']['class'])
+        for span in [compile_span, dot]:
+            self.assertLessEqual(run['ts'], span['ts'])
+            self.assertLessEqual(span['ts'] + span['dur'], run['ts'] + run['dur'] + 1e-3)
+        self.assertLessEqual(compile_span['ts'] + compile_span['dur'], dot['ts'] + 1e-3)
+        self.assertTrue(any(event['ph'] == 'M' for event in events))
+
+    def test_model(self):
+        input_layer = ad.layers.Input(shape=(None, 4))
+        output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(input_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(optimizer=ad.optims.Adam(), losses=ad.losses.cross_entropy)
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            model.fit_on_batch(np.ones((3, 4)), np.ones((3, 2)), trace_file=path)
+            events = self._load(path)
+        categories = {}
+        for event in events:
+            if event['ph'] == 'X':
+                categories.setdefault(event['cat'], []).append(event['name'])
+        self.assertEqual(['fit_on_batch'], categories['model'])
+        self.assertIn('compile', categories['compile'])
+        self.assertIn('backward', categories)
+        self.assertEqual(1 + len(model.trainable_weights), len(categories['optimizer']))
+
+    def test_prefetch(self):
+        input_layer = ad.layers.Input(shape=(None, 4))
+        output_layer = ad.layers.Dense(output_dim=2, activation=ad.acts.softmax)(input_layer)
+        model = ad.models.Model(inputs=input_layer, outputs=output_layer)
+        model.build(optimizer=ad.optims.SGD(), losses=ad.losses.cross_entropy)
+        with ad.Tracer() as tracer:
+            model.fit(np.ones((10, 4)), np.ones((10, 2)), batch_size=4)
+        self.assertFalse(tracer.active)
+        spans = [event for event in tracer.events if event['ph'] == 'X']
+        steps = [span for span in spans if span['name'] == 'fit_on_batch']
+        self.assertEqual(3, len(steps))
+        prefetch = [span for span in spans if span['name'] == 'prefetch']
+        self.assertEqual(4, len(prefetch))
+        self.assertNotEqual(steps[0]['tid'], prefetch[0]['tid'])
+        tracer.clear()
+        self.assertEqual([], tracer.events)
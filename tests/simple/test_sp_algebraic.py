@@ -0,0 +1,64 @@
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+from auto_diff.simple.sp_algebraic import sp_algebraic
+
+
+class TestSpAlgebraic(TestCase):
+
+    def _check(self, y, feed_dict, expect_name, expect_removed):
+        expect = ad.Session().run(y, feed_dict=dict(feed_dict))
+        report = {}
+        z = sp_algebraic(y, report)
+        self.assertEqual(expect_name, z.name)
+        self.assertEqual(expect_removed, report['removed'], report)
+        actual = ad.Session().run(z, feed_dict=dict(feed_dict))
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+
+    def test_identity(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        y = (x * 1.0 + 0.0) / 1.0 - 0.0
+        self._check(y, {x: np.random.random((2, 3))}, 'X', 8)
+
+    def test_identity_broadcast(self):
+        x = ad.placeholder(shape=(), name='X')
+        y = x + ad.zeros(shape=(3,)) * 1.0
+        self._check(y, {x: 1.0}, 'add(X, zeros(shape=(3,)))', 2)
+
+    def test_inverse(self):
+        x = ad.placeholder(shape=(2, 3, 4), name='X')
+        y = -(-ad.transpose(ad.transpose(x, axes=[1, 2, 0]), axes=[2, 0, 1]))
+        y = ad.squeeze(ad.expand_dims(y, axis=-1), axis=3)
+        y = ad.reshape(ad.reshape(y, (6, 4)), (4, 6))
+        self._check(y, {x: np.random.random((2, 3, 4))}, 'reshape(X, shape=(4, 6))', 7)
+
+    def test_transpose_merged(self):
+        x = ad.placeholder(shape=(2, 3, 4), name='X')
+        y = ad.transpose(ad.transpose(x, axes=[1, 2, 0]), axes=[1, 0, 2])
+        self._check(y, {x: np.random.random((2, 3, 4))}, 'transpose(X, axes=[2, 1, 0])', 1)
+
+    def test_keepdims(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        y = ad.expand_dims(ad.sum(x, axis=-1), axis=-1)
+        self._check(y, {x: np.random.random((2, 3))}, 'sum(X, axis=-1, keepdims=True)', 3)
+
+    def test_reassociate(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = ((x + 1.0) + 2.0) * 2.0 * 3.0
+        self._check(y, {x: np.random.random(3)}, 'multiply(add(X, 3.0), 6.0)', 4)
+
+    def test_sigmoid(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = 1.0 / (1.0 + ad.exp(-x)) + 1.0 / (ad.exp(-x) + 1.0)
+        self._check(y, {x: np.random.random(3)}, 'add(sigmoid(X), sigmoid(X))', 10)
+
+    def test_gradient(self):
+        w = ad.variable(np.random.random(3))
+        y = ad.sum(1.0 / (1.0 + ad.exp(-(w * 1.0))))
+        y.forward()
+        y.backward()
+        expect = w.gradient
+        z = sp_algebraic(y)
+        z.forward()
+        z.backward()
+        self.assertTrue(np.allclose(expect, w.gradient), (expect, w.gradient))
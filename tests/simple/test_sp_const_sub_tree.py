@@ -13,3 +13,38 @@ class TestSpConstSubTree(TestCase):
     def test_placeholder(self):
         x = OpPlaceholder(shape=(12,), name='X').reshape((3, 4)).transpose().simplify()
         self.assertEqual('transpose(reshape(X, shape=(3, 4)))', x.name)
+
+    def test_shared_sub_graph(self):
+        x = ad.constant(1.0)
+        for _ in range(100):
+            x = x + x
+        y = x.simplify()
+        self.assertIsInstance(y, ad.OpConstant)
+        self.assertEqual(2.0 ** 100, y.forward())
+
+    def test_shape(self):
+        x = OpPlaceholder(shape=(3, 4), name='X')
+        y = (x * ad.arange(ad.shape(x)[1])).simplify()
+        self.assertEqual('multiply(X, constant(shape=(4,)))', y.name)
+        self.assertEqual((4,), y.inputs[1].shape)
+        actual = ad.Session().run(y, feed_dict={x: np.ones((3, 4))})
+        self.assertTrue(np.allclose(np.tile(np.arange(4), (3, 1)), actual), actual)
+
+    def test_shape_integer(self):
+        with ad.dtype_scope('float32'):
+            x = OpPlaceholder(shape=(3, 4), name='X')
+            y = ad.shape(x).simplify()
+        self.assertIsInstance(y, ad.OpConstant)
+        self.assertTrue(np.issubdtype(y.forward().dtype, np.integer), y.forward().dtype)
+        self.assertEqual([3, 4], y.forward().tolist())
+
+    def test_unknown_shape(self):
+        x = OpPlaceholder(shape=(None, 4), name='X')
+        y = x[ad.shape(x)[0] - 1].simplify()
+        self.assertEqual('getitem(X, item=subtract(getitem(shape(X), item=0), 1.0))', y.name)
+
+    def test_not_folded(self):
+        x = (ad.in_train_phase() + 1.0).simplify()
+        self.assertEqual('add(in_train_phase(), 1.0)', x.name)
+        x = (ad.random(shape=(3,)) + 1.0).simplify()
+        self.assertNotIsInstance(x, ad.OpConstant)
@@ -0,0 +1,51 @@
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+from auto_diff.simple.sp_cse import sp_cse
+
+
+class TestSpCse(TestCase):
+
+    def test_merge(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        y = ad.exp(x[:, :2]) + ad.exp(x[:, :2])
+        z = sp_cse(y)
+        self.assertIs(z.inputs[0], z.inputs[1])
+        val = np.random.random((4, 3))
+        actual = ad.Session().run(z, feed_dict={x: val})
+        self.assertTrue(np.allclose(2.0 * np.exp(val[:, :2]), actual))
+
+    def test_merge_params(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        y = x[ad.shape(x)[0] - 1.0] * x[ad.shape(x)[0] - 1.0]
+        z = sp_cse(y)
+        self.assertIs(z.inputs[0], z.inputs[1])
+        self.assertIs(z.inputs[0].params['item'], y.inputs[1].params['item'])
+        val = np.random.random((4, 3))
+        actual = ad.Session().run(z, feed_dict={x: val})
+        self.assertTrue(np.allclose(val[3] * val[3], actual))
+
+    def test_not_merged(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        y = ad.placeholder(shape=(None, 3), name='Y')
+        w = ad.variable(np.ones(3))
+        v = ad.variable(np.ones(3))
+        r = ad.random(shape=(3,))
+        z = ad.sum(x, axis=0) + ad.sum(x, axis=1, keepdims=True) + ad.sum(y, axis=0) + w + v + r + ad.random(shape=(3,))
+        self.assertEqual(z.name, sp_cse(z).name)
+        nodes = ad.Session().compile([z]).operations
+        self.assertEqual(len(nodes), len(ad.Session().compile([sp_cse(z)]).operations))
+
+    def test_setitem_not_merged(self):
+        y = ad.setitem(ad.zeros((3,)), 0, ad.constant(1.0)) + ad.setitem(ad.zeros((3,)), 1, ad.constant(2.0))
+        z = sp_cse(y)
+        self.assertIsNot(z.inputs[0].inputs[0], z.inputs[1].inputs[0])
+        self.assertTrue(np.allclose([1.0, 2.0, 0.0], ad.Session().run(z)))
+
+    def test_simplify(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        y = ad.exp(x) * 2.0 + ad.exp(x) * 2.0
+        self.assertEqual(8, len(ad.Session().compile([y]).operations))
+        z = y.simplify()
+        self.assertEqual(2, len(ad.Session().compile([z]).operations))
+        self.assertEqual(['exp', 'multiply', 'add'], [kind for kind, _ in z.params['instructions']])
@@ -0,0 +1,42 @@
+import numpy as np
+from unittest import TestCase
+import auto_diff as ad
+from auto_diff.op.op_fused import OpFused
+from auto_diff.simple.sp_fuse import sp_fuse
+
+
+class TestSpFuse(TestCase):
+
+    def test_batch_norm(self):
+        x = ad.placeholder(shape=(None, 3), name='X')
+        mean, var = ad.variable(np.random.random(3)), ad.variable(np.random.random(3))
+        gamma, beta = ad.variable(np.random.random(3)), ad.variable(np.random.random(3))
+        y = ad.sum((x - mean) / ad.sqrt(var + 1e-3) * gamma + beta)
+        name = y.name
+        x_val = np.random.random((5, 3))
+        expect = ad.Session().run(y, feed_dict={x: x_val})
+        y.backward()
+        expect_gradients = [w.gradient for w in [mean, var, gamma, beta]]
+        z = sp_fuse(y)
+        self.assertEqual(name, z.name)
+        fused = [op for op in ad.Session().compile([z]).operations if isinstance(op, OpFused)]
+        self.assertEqual(1, len(fused))
+        self.assertEqual(6, len(fused[0].params['instructions']))
+        actual = ad.Session().run(z, feed_dict={x: x_val})
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
+        z.backward()
+        for expect, w in zip(expect_gradients, [mean, var, gamma, beta]):
+            self.assertTrue(np.allclose(expect, w.gradient), (expect, w.gradient))
+
+    def test_shared(self):
+        x = ad.placeholder(shape=(None,), name='X')
+        e = ad.exp(x * 2.0)
+        y = ad.sum(ad.tanh(e)) + ad.sum(e)
+        z = sp_fuse(y)
+        fused = [op for op in ad.Session().compile([z]).operations if isinstance(op, OpFused)]
+        self.assertEqual(1, len(fused))
+        self.assertEqual(['multiply', 'exp'], [kind for kind, _ in fused[0].params['instructions']])
+        x_val = np.random.random(4)
+        actual = ad.Session().run(z, feed_dict={x: x_val})
+        expect = np.sum(np.tanh(np.exp(x_val * 2.0))) + np.sum(np.exp(x_val * 2.0))
+        self.assertTrue(np.allclose(expect, actual), (expect, actual))
@@ -0,0 +1,20 @@
+import sys
+import subprocess
+from unittest import TestCase
+import auto_diff as ad
+
+
+class TestInit(TestCase):
+
+    def test_lazy_modules(self):
+        code = 'import sys, auto_diff; print(sorted(name for name in sys.modules ' \
+               'if name.split(".")[0] == "scipy" or name.count(".") == 1 and name.startswith("auto_diff.")))'
+        output = subprocess.check_output([sys.executable, '-c', code]).decode().strip()
+        self.assertEqual("['auto_diff.acts', 'auto_diff.op', 'auto_diff.sess', 'auto_diff.simple']", output)
+
+    def test_access(self):
+        for name in ['inits', 'losses', 'layers', 'optims', 'models']:
+            self.assertIn(name, dir(ad))
+            self.assertEqual('auto_diff.' + name, getattr(ad, name).__name__)
+        with self.assertRaises(AttributeError):
+            ad.not_a_module